@@ -1,9 +1,42 @@
 import pygame
 
-# Window settings
+# World size: the simulation's coordinates, whatever the display resolution
 WINDOW_WIDTH = 800
 WINDOW_HEIGHT = 600
-FPS = 60
+FPS = 60  # Display frame cap; the simulation runs at its own fixed rate
+
+# Fixed-timestep simulation: ticks per second, and how many ticks one
+# displayed frame may run to catch up after a stall before dropping time
+SIMULATION_RATE = 60
+MAX_CATCH_UP_STEPS = 5
+
+# Step the simulation on its own thread and draw the latest snapshot of it
+# on the main thread, instead of alternating both on one thread
+THREADED_SIMULATION = False
+
+# Frame profiler: frames kept in its ring buffer, and the export file name
+# (F3 toggles the timing graph, F4 writes <name>.csv and <name>.json)
+PROFILER_FRAMES = 600
+PROFILE_EXPORT_FILE = "frame_profile"
+
+# Target time from the end of the imports to the first frame on screen, checked by
+# tools.benchmark. Importing pygame and numpy is reported apart, it isn't ours to speed up
+STARTUP_BUDGET_MS = 100
+
+# Only redraw and push changed screen areas instead of flipping the whole window
+DIRTY_RECT_RENDERING = False
+
+# The game is drawn into a render target RENDER_SCALE times the world size
+# (0.5 is 400x300), which DISPLAY_SCALING then brings to the screen:
+#   None       the target is the window itself
+#   'scaled'   pygame.SCALED: SDL stretches it to the window, or the whole
+#              screen in fullscreen, on the GPU where it can
+#   'integer'  the largest whole multiple that fits a DISPLAY_SIZE window, centered
+#   'smooth'   smoothscaled to fit a DISPLAY_SIZE window, keeping the aspect ratio
+RENDER_SCALE = 1.0
+DISPLAY_SCALING = None
+DISPLAY_SIZE = (WINDOW_WIDTH, WINDOW_HEIGHT)
+SCALING_MODES = (None, 'scaled', 'integer', 'smooth')
 
 # Game elements
 ROAD_WIDTH = 300
@@ -19,16 +52,39 @@ PLAYER_SPEED_MULTIPLIER = 1.1  # Speed increase for player per level
 # Timing
 INITIAL_SPAWN_RATE = 2000  # milliseconds between spawns
 DIFFICULTY_INCREASE_RATE = 5000  # Increase difficulty every 5 seconds
+POWER_UP_SPAWN_RATE = 10000  # milliseconds between power-ups, from level 3
 
 # File paths
-HIGH_SCORE_FILE = "highscore.json"
-def get_background_music(level):
-    # After level 20, use the level 20 music
-    adjusted_level = min(level - 1, 20)
-    return f"assets/sound/cat_speed_{adjusted_level}.mp3"
+HIGH_SCORE_FILE = "highscore.json"  # Old single high score, read once if there's no leaderboard yet
+LEADERBOARD_FILE = "leaderboard.json"  # Compacted snapshot of the leaderboard
+SCORE_LOG_FILE = "scores.log"  # Append-only log of scores since the last snapshot
+LEADERBOARD_SIZE = 10  # Scores kept per level
+SCORE_LOG_COMPACT_EVERY = 50  # Scores logged between snapshot rewrites
+SCORE_WRITE_RETRY_SECONDS = 1.0  # Wait before retrying a score write the disk refused
+REPLAY_FILE = "last_game.replay"  # Seed and inputs of the last finished game
+
+# Rewind: seconds of play kept, the memory they may use, and how often a
+# whole savestate is kept rather than a delta against the one before
+REWIND_SECONDS = 10
+REWIND_BUDGET_BYTES = 16 * 1024 * 1024
+REWIND_KEYFRAME_INTERVAL = 60
+
+# Network races and spectating
+NET_PORT = 7777
+NET_POSITION_SCALE = 8  # Positions and speeds are sent in 1/8 px
+NET_HISTORY_TICKS = 120  # Sent states kept as delta baselines, about 2 s
+NET_MAX_BUFFERED = 64 * 1024  # Bytes queued for a client before it's skipped for a tick
+NET_ROUND_RESTART_MS = 3000  # Pause after every track has finished before the next round
+NET_LATENCY_SAMPLES = 600  # Latest snapshot latencies a client keeps, about 10 s
 
-# Sound settings
-SOUND_SPEED_MULTIPLIER = 1.25  # Speed increase for background music per level
+# Sound settings: every level's music is the one base track, played faster
+MUSIC_FILE = "assets/sound/cat.mp3"
+SOUND_SPEED_MULTIPLIER = 1.02  # Speed increase for background music per level
+MUSIC_CACHE_BYTES = 8 * 1024 * 1024  # Memory cap for decoded background music tracks
+MUSIC_PCM_CACHE = "music.pcm"  # Decoded base track kept on disk for later launches; None to always decode
+
+def get_music_speed(level):
+    return SOUND_SPEED_MULTIPLIER ** (level - 1)
 
 # Colors
 WHITE = (255, 255, 255)
@@ -47,7 +103,39 @@ METEOR_MAX_SPEED = 7
 METEOR_SIZE = 30
 METEOR_SPAWN_RATE = 3000  # milliseconds between meteor spawns
 
+# Collision broadphase
+SPATIAL_HASH_CELL_SIZE = 64  # Grid cell size in pixels, about one car
+SPATIAL_HASH_MIN_ENTITIES = 16  # Below this many entities a linear scan beats hashing
+
+# Particles
+MAX_PARTICLES = 1024  # Size of the shared particle pool
+PARTICLE_LIFE_BUCKETS = 20  # Distinct life levels pre-rendered per particle size
+
+# Explosions
+EXPLOSION_CACHE_BYTES = 8 * 1024 * 1024  # Memory cap for pre-rendered explosion animations
+
+# Text rendering
+TEXT_CACHE_SIZE = 128  # Rendered text surfaces kept for reuse
+
 # Game states
 GAME_RUNNING = 'running'
 GAME_OVER = 'game_over'
 GAME_WIN = 'win'
+
+# Input actions (bitmask passed to Simulation.step)
+ACTION_UP = 1
+ACTION_DOWN = 2
+ACTION_LEFT = 4
+ACTION_RIGHT = 8
+ACTION_SHOOT = 16  # Set only on the tick SPACE was pressed
+
+# Simulation events (reported in Simulation.events after each step)
+EVENT_LEVEL_UP = 'level_up'
+EVENT_GAME_OVER = 'game_over'
+EVENT_WIN = 'win'
+EVENT_REWIND = 'rewind'  # Raised by GameManager when it restores an earlier state
+
+# What ended a game (Simulation.death_cause)
+DEATH_CPU_CAR = 'cpu_car'
+DEATH_METEOR = 'meteor'
+DEATH_METEOR_BLAST = 'meteor_blast'
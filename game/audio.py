@@ -0,0 +1,223 @@
+import os
+import struct
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import numpy as np
+import pygame
+from config.settings import MUSIC_FILE, MUSIC_CACHE_BYTES, MUSIC_PCM_CACHE, get_music_speed
+
+# PCM cache file: header, then the decoded samples as written by ndarray.tofile().
+# The source file's size and modification time, and the mixer format, must
+# match for the cache to be used
+PCM_MAGIC = b'PCMC'
+PCM_VERSION = 1
+_PCM_HEADER = struct.Struct('<4sB4sIBqqQ')
+
+
+def resample(samples, speed):
+    """samples (frames, channels) played speed times as fast, like a tape.
+
+    Linear interpolation; the end wraps to the start, so a looping track
+    stays seamless.
+    """
+    frames = len(samples)
+    position = np.arange(0.0, frames, speed)
+    index = position.astype(np.int64)
+    fraction = (position - index)[:, None]
+    after = samples[(index + 1) % frames].astype(np.float32)
+    before = samples[index].astype(np.float32)
+    return np.rint(before + (after - before) * fraction).astype(samples.dtype)
+
+
+def _source_key(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def load_pcm_cache(cache_path, source_path):
+    # The decoded track as a read-only memory map, or None if the cache is missing or stale
+    try:
+        with open(cache_path, 'rb') as f:
+            header = f.read(_PCM_HEADER.size)
+        magic, version, dtype, frequency, channels, size, mtime, frames = _PCM_HEADER.unpack(header)
+    except (OSError, struct.error):
+        return None
+    try:
+        source = _source_key(source_path)
+    except OSError:
+        return None
+    mixer = pygame.mixer.get_init()
+    if magic != PCM_MAGIC or version != PCM_VERSION or (size, mtime) != source or mixer is None:
+        return None
+    if (frequency, channels) != (mixer[0], mixer[2]):
+        return None
+    dtype = np.dtype(dtype.rstrip(b' ').decode())
+    if dtype.itemsize * 8 != abs(mixer[1]):
+        return None
+    try:
+        return np.memmap(cache_path, dtype=dtype, mode='r', offset=_PCM_HEADER.size, shape=(frames, channels))
+    except (OSError, ValueError):
+        return None
+
+
+def save_pcm_cache(cache_path, source_path, samples):
+    # Written beside the cache and renamed over it, so a crash never leaves half a cache
+    frequency, _, channels = pygame.mixer.get_init()
+    size, mtime = _source_key(source_path)
+    header = _PCM_HEADER.pack(
+        PCM_MAGIC, PCM_VERSION, samples.dtype.str.encode().ljust(4), frequency, channels, size, mtime, len(samples)
+    )
+    tmp_path = cache_path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        np.ascontiguousarray(samples).tofile(f)
+    os.replace(tmp_path, cache_path)
+
+
+class AudioManager:
+    """Background music generated from one base track, off the game thread.
+
+    The base track is decoded once, or memory-mapped from the PCM cache
+    that the first decode writes, and each level's music is resampled from
+    it to play get_music_speed(level) times as fast. All of that happens on
+    a worker thread, never on the caller's. play_level() switches
+    immediately when the level's track is already made; otherwise the
+    current track keeps playing and update() swaps as soon as it's ready.
+    The next level's track is always prefetched while the current one
+    plays. Finished tracks are kept least-recently-used first up to
+    memory_cap bytes; level 1 is never evicted so restarts are instant.
+
+    Without a channel, the mixer is opened on the worker thread too, ahead
+    of everything else, and music starts once it's ready. If there's no
+    audio device the game just runs silently.
+    """
+
+    def __init__(self, channel=None, memory_cap=MUSIC_CACHE_BYTES, path=MUSIC_FILE, pcm_cache=MUSIC_PCM_CACHE):
+        self.channel = channel
+        self.memory_cap = memory_cap
+        self.path = path
+        self.pcm_cache = pcm_cache
+        self.base = None  # Decoded base track, (frames, channels); only touched on the worker
+        self.sounds = OrderedDict()  # level -> (Sound, bytes)
+        self.cached_bytes = 0
+        self.pending = {}  # level -> Future
+        self.failed = False  # The base track can't be decoded, so there's no music
+        self.pinned = {1}
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='music')
+        self.wanted = None
+        self.playing = None
+        self.mixer_ready = channel is not None
+        if channel is None:
+            self.executor.submit(self._open_mixer)
+
+    def _open_mixer(self):
+        # Opening the audio device can take a while; tracks queue up behind it
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+        except pygame.error:
+            # Loading the base track will fail too, and then there's no music
+            return
+        self.mixer_ready = True
+
+    def _load_base(self):
+        if self.pcm_cache is not None:
+            self.base = load_pcm_cache(self.pcm_cache, self.path)
+            if self.base is not None:
+                return
+        samples = pygame.sndarray.array(pygame.mixer.Sound(self.path))
+        self.base = samples.reshape(len(samples), -1)
+        if self.pcm_cache is not None:
+            try:
+                save_pcm_cache(self.pcm_cache, self.path, self.base)
+            except OSError:
+                # Only slows the next launch down
+                pass
+
+    def _generate(self, level):
+        sound = None
+        try:
+            if self.base is None:
+                self._load_base()
+            samples = resample(self.base, get_music_speed(level))
+            if samples.shape[1] == 1:
+                samples = samples[:, 0]
+            sound = pygame.sndarray.make_sound(samples)
+        except Exception:
+            # Whatever went wrong (no mixer, unreadable file, bad cache,
+            # out of memory), the game goes on without music
+            pass
+        finally:
+            # Always settled, so update() never waits on a level that will never come
+            with self.lock:
+                del self.pending[level]
+                if sound is None:
+                    self.failed = True
+                else:
+                    self._store(level, sound, samples.nbytes)
+
+    def _store(self, level, sound, size):
+        self.sounds[level] = (sound, size)
+        self.cached_bytes += size
+        # Evict least recently used tracks, but never a pinned or playing one
+        for old_level in list(self.sounds):
+            if self.cached_bytes <= self.memory_cap:
+                break
+            if old_level in self.pinned or old_level == self.playing or old_level == level:
+                continue
+            _, old_size = self.sounds.pop(old_level)
+            self.cached_bytes -= old_size
+
+    def _cached(self, level):
+        with self.lock:
+            entry = self.sounds.get(level)
+            if entry is None:
+                return None
+            self.sounds.move_to_end(level)
+            return entry[0]
+
+    def prefetch(self, level):
+        with self.lock:
+            if level in self.sounds or level in self.pending or self.failed:
+                return
+            self.pending[level] = self.executor.submit(self._generate, level)
+
+    def play_level(self, level):
+        if level == self.playing and self.wanted is None:
+            return
+        self.wanted = level
+        self.prefetch(level)
+        self.prefetch(level + 1)
+        self.update()
+
+    def update(self):
+        # Called once per frame: start the wanted track once it's made
+        if self.wanted is None:
+            return
+        if self.failed:
+            # Leave the current music alone, if any
+            self.wanted = None
+            return
+        if self.channel is None:
+            if not self.mixer_ready:
+                return
+            self.channel = pygame.mixer.Channel(0)
+        sound = self._cached(self.wanted)
+        if sound is None:
+            return
+        self.channel.stop()
+        self.channel.play(sound, loops=-1)
+        self.playing = self.wanted
+        self.wanted = None
+
+    def stop(self):
+        self.wanted = None
+        self.playing = None
+        if self.channel is not None:
+            self.channel.stop()
+
+    def shutdown(self):
+        self.stop()
+        self.executor.shutdown(wait=False, cancel_futures=True)
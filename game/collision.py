@@ -0,0 +1,64 @@
+import numpy as np
+
+
+def swept_bounds(store, rows):
+    # Box covering each row's motion over the last step, from (x - vx, y - vy) to (x, y)
+    x = store.x[rows]
+    y = store.y[rows]
+    x0 = x - store.vx[rows]
+    y0 = y - store.vy[rows]
+    return (
+        np.minimum(x0, x), np.minimum(y0, y),
+        np.maximum(x0, x) + store.w[rows], np.maximum(y0, y) + store.h[rows]
+    )
+
+
+def _slab(a_min, a_size, b_min, b_size, d):
+    # Entry and exit times along one axis for box a moving by d against a still box b
+    with np.errstate(divide='ignore', invalid='ignore'):
+        near = (b_min - (a_min + a_size)) / d
+        far = (b_min + b_size - a_min) / d
+    entry = np.where(d > 0, near, far)
+    exit_ = np.where(d > 0, far, near)
+    # No motion on this axis: overlapping for the whole step or never
+    still = d == 0
+    overlapping = (a_min < b_min + b_size) & (b_min < a_min + a_size)
+    entry = np.where(still, np.where(overlapping, -np.inf, np.inf), entry)
+    exit_ = np.where(still, np.where(overlapping, np.inf, -np.inf), exit_)
+    return entry, exit_
+
+
+def time_of_impact(ax, ay, aw, ah, avx, avy, bx, by, bw, bh, bvx, bvy):
+    """Earliest time in [0, 1] of the step at which box a first overlaps box b.
+
+    Positions are the boxes' top-left corners at the start of the step and
+    velocities are the displacement over the whole step. Works element-wise
+    on arrays; pairs that never touch during the step get inf, pairs already
+    overlapping at the start get 0.
+    """
+    # Move in b's frame, so only a moves
+    x_entry, x_exit = _slab(ax, aw, bx, bw, avx - bvx)
+    y_entry, y_exit = _slab(ay, ah, by, bh, avy - bvy)
+    entry = np.maximum(x_entry, y_entry)
+    exit_ = np.minimum(x_exit, y_exit)
+    hit = (entry < exit_) & (entry < 1) & (exit_ > 0)
+    return np.where(hit, np.maximum(entry, 0), np.inf)
+
+
+def sweep_pairs(a, a_rows, b, b_rows):
+    # Time of impact between row pairs of two stores whose positions are end-of-step
+    return time_of_impact(
+        a.x[a_rows] - a.vx[a_rows], a.y[a_rows] - a.vy[a_rows], a.w[a_rows], a.h[a_rows],
+        a.vx[a_rows], a.vy[a_rows],
+        b.x[b_rows] - b.vx[b_rows], b.y[b_rows] - b.vy[b_rows], b.w[b_rows], b.h[b_rows],
+        b.vx[b_rows], b.vy[b_rows]
+    )
+
+
+def sweep_against_box(store, rows, left, top, width, height):
+    # Time of impact between moving rows and a box that holds still for the step
+    return time_of_impact(
+        store.x[rows] - store.vx[rows], store.y[rows] - store.vy[rows],
+        store.w[rows], store.h[rows], store.vx[rows], store.vy[rows],
+        left, top, width, height, 0.0, 0.0
+    )
@@ -0,0 +1,143 @@
+import numpy as np
+
+# Columns every entity kind has. x, y is the top-left corner of the
+# entity's bounding box and w, h its size, so all kinds share one AABB layout.
+BASE_COLUMNS = {
+    'id': np.int64,
+    'x': np.float64,
+    'y': np.float64,
+    'vx': np.float64,
+    'vy': np.float64,
+    'w': np.float64,
+    'h': np.float64,
+    'alive': np.bool_,
+}
+
+
+class EntityStore:
+    """Structure-of-arrays storage for every live entity of one kind.
+
+    Each column is a preallocated NumPy array; rows [0, count) are in use.
+    Entities are killed by clearing their alive flag and removed in bulk by
+    compact(), which moves rows from the tail into the holes (swap-and-pop),
+    so row order is not stable but the id column is.
+    """
+
+    def __init__(self, capacity=32, **extra_columns):
+        self.capacity = capacity
+        self.count = 0
+        self.next_id = 0
+        self.dtypes = dict(BASE_COLUMNS)
+        self.dtypes.update(extra_columns)
+        self.columns = {}
+        for name, dtype in self.dtypes.items():
+            self._set_column(name, np.zeros(capacity, dtype=dtype))
+
+    def _set_column(self, name, array):
+        self.columns[name] = array
+        setattr(self, name, array)
+
+    def __len__(self):
+        return self.count
+
+    def _grow(self):
+        self.capacity *= 2
+        for name, array in list(self.columns.items()):
+            grown = np.zeros(self.capacity, dtype=array.dtype)
+            grown[:self.count] = array[:self.count]
+            self._set_column(name, grown)
+
+    def spawn(self, x, y, vx=0.0, vy=0.0, w=0.0, h=0.0, **extra):
+        if self.count == self.capacity:
+            self._grow()
+        i = self.count
+        self.id[i] = self.next_id
+        self.x[i] = x
+        self.y[i] = y
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.w[i] = w
+        self.h[i] = h
+        self.alive[i] = True
+        for name in self.dtypes:
+            if name not in BASE_COLUMNS:
+                self.columns[name][i] = extra.get(name, 0)
+        self.next_id += 1
+        self.count += 1
+        return i
+
+    def reserve(self, n):
+        # Make room for at least n rows
+        while self.capacity < n:
+            self._grow()
+
+    def load(self, ids, **columns):
+        # Replace every row with the given ids and column values, all alive
+        n = len(ids)
+        self.reserve(n)
+        self.id[:n] = ids
+        self.alive[:n] = True
+        for name, values in columns.items():
+            self.columns[name][:n] = values
+        self.count = n
+
+    def view(self, name):
+        return self.columns[name][:self.count]
+
+    def kill(self, rows):
+        # rows may be a single index, an index array or a boolean mask over [0, count)
+        if isinstance(rows, np.ndarray) and rows.dtype == np.bool_:
+            self.alive[:self.count][rows] = False
+        else:
+            self.alive[rows] = False
+
+    def integrate(self):
+        n = self.count
+        if not n:
+            return
+        self.x[:n] += self.vx[:n]
+        self.y[:n] += self.vy[:n]
+
+    def overlaps(self, left, top, right, bottom):
+        # Boolean mask of live rows whose box overlaps the given box
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        return (
+            self.alive[:n]
+            & (x < right) & (x + self.w[:n] > left)
+            & (y < bottom) & (y + self.h[:n] > top)
+        )
+
+    def compact(self):
+        n = self.count
+        if not n:
+            return
+        alive = self.alive[:n]
+        survivors = int(np.count_nonzero(alive))
+        if survivors == n:
+            return
+        # Holes below the new end are filled from live rows above it
+        holes = np.flatnonzero(~alive[:survivors])
+        fillers = survivors + np.flatnonzero(alive[survivors:])
+        for array in self.columns.values():
+            array[holes] = array[fillers]
+        self.count = survivors
+
+    def snapshot(self, names):
+        # Read-only copy of the live rows of the named columns, as a store of
+        # the same kind sized to fit; safe to read while this one changes
+        copy = object.__new__(type(self))
+        copy.capacity = copy.count = self.count
+        copy.next_id = self.next_id
+        copy.dtypes = {name: self.dtypes[name] for name in names}
+        copy.columns = {}
+        for name in names:
+            array = self.columns[name][:self.count].copy()
+            array.flags.writeable = False
+            copy._set_column(name, array)
+        return copy
+
+    def clear(self):
+        self.alive[:self.count] = False
+        self.count = 0
@@ -0,0 +1,246 @@
+import numpy as np
+import pygame
+from config.settings import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, GAME_RUNNING, GAME_DURATION, PLAYER_SPEED
+)
+from game.simulation import Simulation, TICK_MS
+from game.sprite_cache import SpriteCache
+from game.renderer import RoadLayer, DisplayList, queue_entities
+
+# Every combination of ACTION_* flags is one discrete action
+ACTION_COUNT = 32
+
+# Observation vector: player features, then for each kind of entity the
+# nearest few to the player, closest first, as (dx, dy, vx, vy, present).
+# Positions are relative to the player's center and scaled by the window;
+# empty slots are all zeros.
+PLAYER_FEATURES = 6
+NEAREST = (
+    ('cpu_cars', 8),
+    ('meteors', 4),
+    ('power_ups', 2),
+    ('bullets', 4),
+)
+SLOT_FEATURES = 5
+OBSERVATION_SIZE = PLAYER_FEATURES + SLOT_FEATURES * sum(k for _, k in NEAREST)
+VELOCITY_SCALE = 10.0
+
+
+def _nearest(stores, px, py, k, out):
+    # Fill out (n, k, SLOT_FEATURES) with each game's k nearest rows, for all games at once
+    counts = np.array([store.count for store in stores])
+    total = int(counts.sum())
+    out[:] = 0
+    if not total:
+        return
+    game = np.repeat(np.arange(len(stores)), counts)
+    x = np.concatenate([store.x[:store.count] + store.w[:store.count] / 2 for store in stores])
+    y = np.concatenate([store.y[:store.count] + store.h[:store.count] / 2 for store in stores])
+    vx = np.concatenate([store.vx[:store.count] for store in stores])
+    vy = np.concatenate([store.vy[:store.count] for store in stores])
+    dx = x - px[game]
+    dy = y - py[game]
+
+    # Sort by game, then distance; a row's rank within its game picks its slot
+    order = np.lexsort((dx * dx + dy * dy, game))
+    starts = np.cumsum(counts) - counts
+    rank = np.arange(total) - np.repeat(starts, counts)
+    keep = rank < k
+    rows = order[keep]
+    games = game[rows]
+    slots = rank[keep]
+    out[games, slots, 0] = dx[rows] / WINDOW_WIDTH
+    out[games, slots, 1] = dy[rows] / WINDOW_HEIGHT
+    out[games, slots, 2] = vx[rows] / VELOCITY_SCALE
+    out[games, slots, 3] = vy[rows] / VELOCITY_SCALE
+    out[games, slots, 4] = 1.0
+
+
+def observe(sims, out):
+    """Write the observation of every simulation in sims into the rows of out.
+
+    All games are handled together with array operations, so the cost per
+    extra game is a few concatenated slices rather than a Python loop over
+    its entities.
+    """
+    players = [sim.player for sim in sims]
+    px = np.array([p.x + p.width / 2 for p in players])
+    py = np.array([p.y + p.height / 2 for p in players])
+    out[:, 0] = px / WINDOW_WIDTH
+    out[:, 1] = py / WINDOW_HEIGHT
+    out[:, 2] = [p.speed / PLAYER_SPEED for p in players]
+    out[:, 3] = [
+        max(0.0, 1 - (sim.time - sim.player.power_up_time) / sim.player.power_up_duration)
+        if sim.player.has_power_up else 0.0
+        for sim in sims
+    ]
+    out[:, 4] = [sim.current_level / 10 for sim in sims]
+    out[:, 5] = [(sim.time - sim.start_time) / GAME_DURATION for sim in sims]
+    column = PLAYER_FEATURES
+    for name, k in NEAREST:
+        width = k * SLOT_FEATURES
+        slots = out[:, column:column + width].reshape(len(sims), k, SLOT_FEATURES)
+        _nearest([getattr(sim, name) for sim in sims], px, py, k, slots)
+        column += width
+
+
+class PixelRenderer:
+    """Draws a simulation into an offscreen surface for pixel observations.
+
+    frame() returns a pygame.surfarray.pixels3d view, shaped (width, height,
+    3), straight onto the surface's memory rather than a copy. A view locks
+    its surface. If the caller still holds the previous frame's view, the
+    next frame is drawn into a fresh surface instead of the locked one.
+    """
+
+    def __init__(self, sprites=None):
+        self.sprites = sprites or SpriteCache()
+        self.road = RoadLayer()
+        self.display = DisplayList()
+        self.surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+
+    def frame(self, sim):
+        if self.surface.get_locked():
+            self.surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.display.clear()
+        queue_entities(self.display, sim, self.sprites)
+        self.road.draw(self.surface, sim.road_offset)
+        self.display.draw(self.surface)
+        return pygame.surfarray.pixels3d(self.surface)
+
+
+class RacingEnv:
+    """Gym-style environment around one headless game.
+
+    reset() returns (observation, info) and step(action) returns
+    (observation, reward, terminated, truncated, info), as in Gymnasium.
+    The action is an int bitmask of ACTION_* flags (0 .. ACTION_COUNT - 1),
+    the observation a float32 vector of OBSERVATION_SIZE and the reward the
+    change in score. A game ends on game over or win, and is truncated
+    after max_steps if given. With pixels=True, info['pixels'] holds a
+    zero-copy view of the rendered frame.
+    """
+
+    action_count = ACTION_COUNT
+    observation_size = OBSERVATION_SIZE
+
+    def __init__(self, seed=None, tuning=None, max_steps=None, pixels=False):
+        self.seeds = np.random.default_rng(seed)
+        self.sim = Simulation(self._next_seed(), tuning)
+        self.max_steps = max_steps
+        self.renderer = PixelRenderer() if pixels else None
+        self.observation = np.zeros((1, OBSERVATION_SIZE), dtype=np.float32)
+        self.steps = 0
+
+    def _next_seed(self):
+        return int(self.seeds.integers(2 ** 63))
+
+    def _info(self):
+        sim = self.sim
+        info = {
+            'score': sim.current_score,
+            'level': sim.current_level,
+            'death_cause': sim.death_cause,
+        }
+        if self.renderer is not None:
+            info['pixels'] = self.renderer.frame(sim)
+        return info
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.seeds = np.random.default_rng(seed)
+        self.sim.reset(self._next_seed())
+        self.steps = 0
+        observe([self.sim], self.observation)
+        return self.observation[0].copy(), self._info()
+
+    def step(self, action):
+        sim = self.sim
+        score = sim.current_score
+        sim.step(int(action), TICK_MS)
+        self.steps += 1
+        observe([sim], self.observation)
+        terminated = sim.game_state != GAME_RUNNING
+        truncated = not terminated and self.max_steps is not None and self.steps >= self.max_steps
+        return self.observation[0].copy(), float(sim.current_score - score), terminated, truncated, self._info()
+
+
+class VectorRacingEnv:
+    """n games stepped in lockstep in one process, with batched observations.
+
+    step(actions) takes one action per game and returns arrays: observations
+    (n, OBSERVATION_SIZE), rewards, terminated and truncated flags (n,),
+    plus an info dict of per-game arrays. Observations for all games are
+    built together by observe(), and games that end are reset on the spot
+    (their final score and level, and with pixels their last frame, are in
+    info). The returned observation array is reused by the next step; copy
+    it to keep it.
+    """
+
+    action_count = ACTION_COUNT
+    observation_size = OBSERVATION_SIZE
+
+    def __init__(self, n, seed=None, tuning=None, max_steps=None, pixels=False):
+        self.seeds = np.random.default_rng(seed)
+        self.sims = [Simulation(self._next_seed(), tuning) for _ in range(n)]
+        self.max_steps = max_steps
+        self.observations = np.zeros((n, OBSERVATION_SIZE), dtype=np.float32)
+        self.steps = np.zeros(n, dtype=np.int64)
+        self.scores = np.zeros(n, dtype=np.int64)
+        if pixels:
+            sprites = SpriteCache()
+            self.renderers = [PixelRenderer(sprites) for _ in range(n)]
+        else:
+            self.renderers = None
+
+    @property
+    def n(self):
+        return len(self.sims)
+
+    def _next_seed(self):
+        return int(self.seeds.integers(2 ** 63))
+
+    def _pixels(self, info):
+        if self.renderers is not None:
+            info['pixels'] = [renderer.frame(sim) for renderer, sim in zip(self.renderers, self.sims)]
+        return info
+
+    def reset(self, seed=None):
+        if seed is not None:
+            self.seeds = np.random.default_rng(seed)
+        for sim in self.sims:
+            sim.reset(self._next_seed())
+        self.steps[:] = 0
+        self.scores[:] = 0
+        observe(self.sims, self.observations)
+        return self.observations, self._pixels({})
+
+    def step(self, actions):
+        actions = np.asarray(actions, dtype=np.int64).tolist()
+        sims = self.sims
+        for sim, action in zip(sims, actions):
+            sim.step(action, TICK_MS)
+        self.steps += 1
+
+        scores = np.array([sim.current_score for sim in sims])
+        rewards = (scores - self.scores).astype(np.float32)
+        terminated = np.array([sim.game_state != GAME_RUNNING for sim in sims])
+        truncated = ~terminated
+        if self.max_steps is not None:
+            truncated &= self.steps >= self.max_steps
+        else:
+            truncated[:] = False
+        info = self._pixels({
+            'score': scores,
+            'level': np.array([sim.current_level for sim in sims]),
+        })
+
+        # Start a new game wherever one just ended; info keeps how it ended
+        self.scores = scores.copy()
+        for i in np.flatnonzero(terminated | truncated):
+            sims[i].reset(self._next_seed())
+            self.steps[i] = 0
+            self.scores[i] = 0
+
+        observe(sims, self.observations)
+        return self.observations, rewards, terminated, truncated, info
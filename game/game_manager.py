@@ -1,336 +1,353 @@
+import time
 import pygame
 from config.settings import (
-    WINDOW_WIDTH, WINDOW_HEIGHT, FPS, BASE_CPU_SPEED,
-    INITIAL_SPAWN_RATE, DIFFICULTY_INCREASE_RATE, GAME_DURATION,
-    GAME_RUNNING, GAME_OVER, GAME_WIN, WHITE, ROAD_SPEED,
-    WORLD_SPEED_MULTIPLIER, PLAYER_SPEED_MULTIPLIER, PLAYER_SPEED,
-    SOUND_SPEED_MULTIPLIER, get_background_music, METEOR_SPAWN_RATE
+    FPS, GAME_RUNNING, MAX_CATCH_UP_STEPS, RENDER_SCALE, DISPLAY_SCALING,
+    ACTION_UP, ACTION_DOWN, ACTION_LEFT, ACTION_RIGHT,
+    ACTION_SHOOT, EVENT_LEVEL_UP, EVENT_GAME_OVER, EVENT_WIN, EVENT_REWIND, DIRTY_RECT_RENDERING,
+    REPLAY_FILE, PROFILE_EXPORT_FILE, THREADED_SIMULATION
 )
-from models.player import Player
-from models.cpu_car import CPUCar
-from models.explosion import Explosion
-from models.blue_explosion import BlueExplosion
-from models.power_up import PowerUp
-from models.meteor import Meteor
-from utils.score_manager import load_high_score, save_high_score
-from game.renderer import draw_road
+from game.simulation import Simulation, TICK_MS
+from game.sprite_cache import SpriteCache
+from game.hud import Hud
+from game.audio import AudioManager
+from game.replay import Replay
+from game.savestate import save_state, load_state, RewindBuffer
+from game.profiler import FrameProfiler, GRAPH_WIDTH, NULL_PROFILER
+from game.sim_thread import SimulationThread
+from utils.leaderboard import Leaderboard
+from game.renderer import RoadLayer, DisplayList, DirtyRectPresenter, RenderTarget, queue_entities
+
+class GameEnd:
+    # What a finished game left behind, taken on the thread that stepped it
+    # and queued right after its EVENT_GAME_OVER or EVENT_WIN, so the front-end
+    # never reads state a later rewind or reset may already have changed
+    def __init__(self, score, level, replay, assisted):
+        self.score = score
+        self.level = level
+        self.replay = replay
+        self.assisted = assisted
 
 class GameManager:
-    def __init__(self):
-        pygame.init()
-        pygame.mixer.init()
+    def __init__(self, playback=None, persist=True, started=None,
+                 render_scale=RENDER_SCALE, scaling=DISPLAY_SCALING):
+        # Only the display is started here. Fonts start when text is first
+        # drawn and the audio device is opened on the music thread, so the
+        # first frame waits for neither
+        pygame.display.init()
         
-        self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        # Frames are drawn at render_scale times the world size and scaled
+        # to the window as the scaling mode says; screen is that render target
+        self.target = RenderTarget(render_scale, scaling)
+        self.screen = self.target.surface
         pygame.display.set_caption("2D Car Racing")
         self.clock = pygame.time.Clock()
+        self.sprites = SpriteCache(scale=render_scale)
+        self.hud = Hud(render_scale)
+        self.road = RoadLayer(render_scale)
+        # Optional: only redraw and push the parts of the screen that changed
+        self.dirty_rects = DirtyRectPresenter(self.target.update) if DIRTY_RECT_RENDERING else None
         
-        # Initialize background music
-        self.background_music = None
-        self.background_music_channel = pygame.mixer.Channel(0)
+        # Background music is decoded off the game thread
+        self.audio = AudioManager()
         
+        # All game state lives in the headless simulation; this class only
+        # adds the window, keyboard and audio around it
+        self.sim = Simulation()
+        # What the front-end draws and reacts to: the simulation itself, or
+        # its latest snapshot when it runs on its own thread
+        self.view = self.sim
+        self.sim_thread = None
+        # Per-phase frame timings; F3 shows the graph, F4 exports the history
+        self.profiler = FrameProfiler()
+        self.sim.profiler = self.profiler
+        # When set, inputs come from this Replay instead of the keyboard
+        self.playback = playback
+        # Whether the leaderboard and replay files are read and written
+        self.persist = persist
+        self.leaderboard = Leaderboard() if persist else None
+        self.high_score = 0
+        # Movement keys held as of the last poll_keys(), and whether rewind is
+        self.held_actions = 0
+        self.rewinding = False
+        # Recent savestates for rewinding, and (tick, state) at the start of
+        # each level reached so far
+        self.rewind = RewindBuffer()
+        self.level_starts = []
+        # One display list, refilled every frame
+        self.display = DisplayList()
         self.reset_game()
+        
+        # Show the first frame as soon as there is one; started is the
+        # perf_counter() reading at process start, if the caller took one
+        self.render()
+        self.profiler.end_frame()
+        self.time_to_first_frame = None
+        if started is not None:
+            self.time_to_first_frame = (time.perf_counter() - started) * 1000
     
     def reset_game(self):
-        self.player = Player(WINDOW_WIDTH)
-        self.cpu_cars = []
-        self.explosions = []
-        self.bullets = []
-        self.power_ups = []
-        self.meteors = []
-        self.last_spawn_time = pygame.time.get_ticks()
-        self.last_power_up_spawn = pygame.time.get_ticks()
-        self.last_meteor_spawn = pygame.time.get_ticks()
-        self.power_up_spawn_rate = 10000  # 10 seconds
-        self.last_difficulty_increase = pygame.time.get_ticks()
-        self.game_state = GAME_RUNNING
-        self.start_time = pygame.time.get_ticks()
-        self.high_score = load_high_score()
-        self.current_score = 0
-        self.road_offset = 0
-        self.current_level = 1
-        self.level_up_time = 0
-        self.show_level_up = False
+        self.reset_simulation()
+        self.reset_front_end()
+    
+    def reset_simulation(self):
+        if self.playback is not None:
+            self.sim.reset(self.playback.seed)
+            self.playback_step = 0
+        else:
+            self.sim.reset()
+        # Every game is recorded so it can be replayed exactly
+        self.replay = Replay(self.sim.seed)
+        # Savestates are keyed by the number of recorded steps, so going
+        # back to one also cuts the replay back to match it
+        self.rewind.clear()
+        self.level_starts = [(0, save_state(self.sim))]
+        self.rewind.push(*self.level_starts[0])
+        # Set once the game is rewound or retried; such games don't make the leaderboard
+        self.assisted = False
+        # A shot pressed but not yet taken by a step; like the replay, only
+        # touched on the thread that steps the simulation
+        self.shoot_pressed = False
+    
+    def reset_front_end(self):
+        if self.leaderboard is not None:
+            self.high_score = self.leaderboard.high_score()
         
-        # Load and play background music for current level
-        if self.background_music:
-            self.background_music_channel.stop()
-        self.background_music = pygame.mixer.Sound(get_background_music(self.current_level))
-        self.background_music_channel.play(self.background_music, loops=-1)
+        # Play background music for level 1; after the first game the track
+        # is already decoded
+        self.audio.play_level(1)
     
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 return False
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_r and self.game_state != GAME_RUNNING:
-                    self.reset_game()
-                elif event.key == pygame.K_SPACE and self.game_state == GAME_RUNNING:
-                    new_bullets = self.player.shoot()
-                    if new_bullets:
-                        self.bullets.extend(new_bullets)
+                if event.key == pygame.K_r and self.view.game_state != GAME_RUNNING:
+                    self.request(self.reset_simulation)
+                    self.reset_front_end()
+                elif event.key == pygame.K_l and self.playback is None:
+                    self.request(self.retry_level)
+                elif event.key == pygame.K_SPACE and self.view.game_state == GAME_RUNNING:
+                    self.request(self.press_shoot)
+                elif event.key == pygame.K_F3:
+                    self.profiler.toggle()
+                elif event.key == pygame.K_F4:
+                    self.profiler.export(PROFILE_EXPORT_FILE + '.csv')
+                    self.profiler.export(PROFILE_EXPORT_FILE + '.json')
         return True
     
-    def update(self):
-        if self.game_state != GAME_RUNNING:
-            return
-        
-        current_time = pygame.time.get_ticks()
-        
-        # Update player and power-up status
+    def poll_keys(self):
+        # Once per frame, after the event queue is pumped; steps read held_actions
         keys = pygame.key.get_pressed()
-        self.player.move(keys, WINDOW_WIDTH)
-        self.player.update_power_up(current_time)
-        
-        # Update bullets
-        for bullet in self.bullets[:]:
-            bullet.move()
-            if bullet.is_off_screen():
-                self.bullets.remove(bullet)
-            else:
-                # Check for collisions with CPU cars
-                for car in self.cpu_cars[:]:
-                    if bullet.get_rect().colliderect(car.get_rect()):
-                        # Use car size for explosion
-                        target_size = max(car.get_rect().width, car.get_rect().height)
-                        self.explosions.append(Explosion(
-                            car.get_rect().centerx,
-                            car.get_rect().centery,
-                            target_size
-                        ))
-                        self.cpu_cars.remove(car)
-                        if bullet in self.bullets:
-                            self.bullets.remove(bullet)
-                        self.current_score += 2  # More points for shooting a car
-                        break
-        
-        # Only handle power-ups after level 3
-        if self.current_level >= 3:
-            # Spawn power-ups if none active
-            if not self.player.has_power_up and current_time - self.last_power_up_spawn >= self.power_up_spawn_rate:
-                self.power_ups.append(PowerUp())
-                self.last_power_up_spawn = current_time
-            
-            # Update power-ups
-            for power_up in self.power_ups[:]:
-                power_up.move()
-                if power_up.is_off_screen(WINDOW_HEIGHT):
-                    self.power_ups.remove(power_up)
-                elif power_up.get_rect().colliderect(self.player.get_rect()):
-                    self.player.has_power_up = True
-                    self.player.power_up_time = current_time
-                    self.power_ups.remove(power_up)
-        else:
-            # Clear any existing power-ups if below level 3
-            self.power_ups.clear()
-            self.bullets.clear()
-            self.player.has_power_up = False
-        
-        elapsed_time = current_time - self.start_time
-        
-        # Check for level completion
-        if elapsed_time >= GAME_DURATION:
-            self.current_level += 1
-            self.start_time = current_time
-            self.show_level_up = True
-            self.level_up_time = current_time
-            self.increase_level_music()
-
-            # Clear existing CPU cars for the next level
-            self.cpu_cars.clear()
-            # Update player speed for new level
-            self.player.speed = PLAYER_SPEED * (PLAYER_SPEED_MULTIPLIER ** (self.current_level - 1))
+        actions = 0
+        if keys[pygame.K_UP]:
+            actions |= ACTION_UP
+        if keys[pygame.K_DOWN]:
+            actions |= ACTION_DOWN
+        if keys[pygame.K_LEFT]:
+            actions |= ACTION_LEFT
+        if keys[pygame.K_RIGHT]:
+            actions |= ACTION_RIGHT
+        self.held_actions = actions
+        self.rewinding = keys[pygame.K_BACKSPACE] and self.playback is None
+    
+    def press_shoot(self):
+        # Taken by the next step
+        self.shoot_pressed = True
+    
+    def read_actions(self):
+        if self.playback is not None:
+            inputs = self.playback.inputs
+            step = self.playback_step
+            self.playback_step += 1
+            return inputs[step] if step < len(inputs) else 0
+        actions = self.held_actions
+        if self.shoot_pressed:
+            actions |= ACTION_SHOOT
+            self.shoot_pressed = False
+        return actions
+    
+    def request(self, action):
+        # Run action() against the simulation on whichever thread steps it
+        if self.sim_thread is not None:
+            self.sim_thread.request(action)
             return
-        
-        # Calculate level-based speeds
-        world_multiplier = WORLD_SPEED_MULTIPLIER ** (self.current_level - 1)
-        current_road_speed = ROAD_SPEED * world_multiplier
-        current_cpu_speed = BASE_CPU_SPEED * world_multiplier
-        
-        # Spawn new CPU cars
-        if current_time - self.last_spawn_time >= INITIAL_SPAWN_RATE:
-            speed = current_cpu_speed + (elapsed_time // DIFFICULTY_INCREASE_RATE) * 0.5
-            self.cpu_cars.append(CPUCar(WINDOW_WIDTH, speed))
-            self.last_spawn_time = current_time
-        
-        # Spawn meteors after level 5
-        if self.current_level >= 5:
-            if current_time - self.last_meteor_spawn >= METEOR_SPAWN_RATE:
-                self.meteors.append(Meteor())
-                self.last_meteor_spawn = current_time
-
-        # Update meteors
-        for meteor in self.meteors[:]:
-            meteor.move()
-            
-            # Check collision with player
-            if meteor.get_rect().colliderect(self.player.get_rect()):
-                self.explosions.append(BlueExplosion(meteor.x, meteor.y, 70))  # Bigger explosion
-                self.meteors.remove(meteor)
-                self.game_state = GAME_OVER
-                self.background_music_channel.stop()
-                break
-            
-            # Check collision with bullets
-            for bullet in self.bullets[:]:
-                if meteor.get_rect().colliderect(bullet.get_rect()):
-                    self.explosions.append(BlueExplosion(meteor.x, meteor.y, 60))
-                    if meteor in self.meteors:
-                        self.meteors.remove(meteor)
-                    if bullet in self.bullets:
-                        self.bullets.remove(bullet)
-                    self.current_score += 100  # More points for shooting meteors
-                    break
-            
-            # Check for road explosions
-            if meteor.should_create_explosion():
-                self.explosions.append(BlueExplosion(meteor.x, meteor.y, 80))  # Even bigger explosion
-                if meteor in self.meteors:
-                    self.meteors.remove(meteor)
-                # Check if any cars are caught in the explosion
-                explosion_rect = pygame.Rect(meteor.x - 80, meteor.y - 80, 160, 160)  # Bigger explosion area
-                for car in self.cpu_cars[:]:
-                    if explosion_rect.colliderect(car.get_rect()):
-                        self.cpu_cars.remove(car)
-                        self.current_score += 30
-                if explosion_rect.colliderect(self.player.get_rect()):
-                    self.game_state = GAME_OVER
-                    self.background_music_channel.stop()
-            
-            # Remove off-screen meteors
-            if meteor.is_off_screen(WINDOW_HEIGHT):
-                if meteor in self.meteors:
-                    self.meteors.remove(meteor)
-        
-        # Update CPU cars
-        for car in self.cpu_cars[:]:
-            car.move()
-            if car.is_off_screen():
-                self.cpu_cars.remove(car)
-                self.current_score += 1
-        
-        # Update explosions
-        for explosion in self.explosions[:]:
-            if not explosion.update():
-                self.explosions.remove(explosion)
-        
-        # Check collisions between player and CPU cars
-        player_rect = self.player.get_rect()
-        for car in self.cpu_cars:
-            if player_rect.colliderect(car.get_rect()):
-                # Use car size for explosion
-                target_size = max(car.get_rect().width, car.get_rect().height)
-                self.explosions.append(Explosion(
-                    player_rect.centerx,
-                    player_rect.centery,
-                    target_size
-                ))
-                self.game_state = GAME_OVER
-                self.background_music_channel.stop()
-                if self.current_score > self.high_score:
-                    self.high_score = self.current_score
-                    save_high_score(self.high_score)
-                break
-        
-        # Update road offset with fixed speed
-        self.road_offset = (self.road_offset + current_road_speed) % 90
-        
-        # Update level up display
-        if self.show_level_up and current_time - self.level_up_time >= 2000:  # Show for 2 seconds
-            self.show_level_up = False
-        
-        # Check win condition
-        if elapsed_time >= GAME_DURATION:
-            self.game_state = GAME_WIN
-            if self.current_score > self.high_score:
-                self.high_score = self.current_score
-                save_high_score(self.high_score)
+        self.sim.events = []
+        action()
+        self.handle_sim_events(self.sim.events)
+    
+    def step_simulation(self):
+        # One fixed simulation step, or one step back while rewind is held;
+        # only steps that can change the game are recorded and saved
+        if self.rewinding:
+            self.rewind_step()
+            return
+        sim = self.sim
+        running = sim.game_state == GAME_RUNNING
+        actions = 0
+        if running:
+            actions = self.read_actions()
+            self.replay.record(actions)
+        sim.step(actions, TICK_MS)
+        if running:
+            state = save_state(sim)
+            self.rewind.push(len(self.replay.inputs), state)
+            if EVENT_LEVEL_UP in sim.events:
+                self.level_starts.append((len(self.replay.inputs), state))
+            sim.profiler.lap('savestate')
+            if sim.game_state != GAME_RUNNING:
+                replay = Replay(self.replay.seed, list(self.replay.inputs))
+                sim.events.append(GameEnd(sim.current_score, sim.current_level, replay, self.assisted))
+    
+    def restore(self, tick, state):
+        # Go back to a savestate taken after tick recorded steps
+        load_state(self.sim, state)
+        self.replay.truncate(tick)
+        while self.level_starts[-1][0] > tick:
+            self.level_starts.pop()
+        self.assisted = True
+        self.sim.events = [EVENT_REWIND]
+    
+    def rewind_step(self):
+        # Back one step; stops at the oldest state still held
+        self.sim.events = []
+        if len(self.rewind) < 2:
+            return
+        self.restore(*self.rewind.pop())
+    
+    def retry_level(self):
+        # Straight back to the start of the current level, without a reset
+        tick, state = self.level_starts[-1]
+        self.restore(tick, state)
+        self.rewind.discard_after(tick)
+        if not len(self.rewind):
+            self.rewind.push(tick, state)
+    
+    def handle_sim_events(self, events):
+        # Levels are read from the view, which is at or after the step that raised the events
+        view = self.view
+        for event in events:
+            if event == EVENT_LEVEL_UP:
+                self.increase_level_music()
+            elif event == EVENT_REWIND:
+                # Back into a game that may have ended, or on an earlier level
+                if view.game_state == GAME_RUNNING:
+                    self.audio.play_level(view.current_level)
+            elif event in (EVENT_GAME_OVER, EVENT_WIN):
+                self.audio.stop()
+            elif isinstance(event, GameEnd):
+                if self.persist and self.playback is None:
+                    event.replay.save(REPLAY_FILE)
+                # Queued for the leaderboard's writer thread; no disk access here
+                if self.leaderboard is not None and self.playback is None and not event.assisted:
+                    self.leaderboard.submit(event.score, event.level)
+                self.high_score = max(self.high_score, event.score)
+    
+    def update(self):
+        self.step_simulation()
+        self.handle_sim_events(self.sim.events)
+        self.profiler.lap('sim_events')
     
     def increase_level_music(self):
-        # Update background music for new level
-        self.background_music_channel.stop()
-        self.background_music = pygame.mixer.Sound(get_background_music(self.current_level))
-        self.background_music_channel.play(self.background_music, loops=-1)
+        # Update background music for new level; it was prefetched during the previous level
+        self.audio.play_level(self.view.current_level)
     
-    def render(self):
-        self.screen.fill(WHITE)
-        
-        # Draw road
-        draw_road(self.screen, self.road_offset)
+    def render(self, alpha=1.0):
+        # alpha is how far the display is between the previous and the latest simulation step
+        sim = self.view
+        profiler = self.profiler
         
-        # Draw game objects
-        self.player.draw(self.screen)
-        for car in self.cpu_cars:
-            car.draw(self.screen)
-        for explosion in self.explosions:
-            explosion.draw(self.screen)
-        for bullet in self.bullets:
-            bullet.draw(self.screen)
-        for power_up in self.power_ups:
-            power_up.draw(self.screen)
-        for meteor in self.meteors:
-            meteor.draw(self.screen)
-        
-        # Draw HUD
-        font = pygame.font.Font(None, 36)
-        score_text = font.render(f'Score: {self.current_score}', True, (0, 0, 0))
-        high_score_text = font.render(f'High Score: {self.high_score}', True, (0, 0, 0))
-        level_text = font.render(f'Level: {self.current_level}', True, (0, 0, 0))
-        time_left = max(0, (GAME_DURATION - (pygame.time.get_ticks() - self.start_time)) // 1000)
-        time_text = font.render(f'Time: {time_left}s', True, (0, 0, 0))
-        
-        self.screen.blit(score_text, (10, 10))
-        self.screen.blit(high_score_text, (10, 40))
-        self.screen.blit(level_text, (10, 70))
-        self.screen.blit(time_text, (10, 100))
-        
-        # Draw level up message
-        if self.show_level_up:
-            level_up_font = pygame.font.Font(None, 72)
-            level_up_text = level_up_font.render(f'LEVEL UP!', True, (255, 0, 0))
-            level_num_text = level_up_font.render(f'Level {self.current_level}', True, (255, 0, 0))
-            
-            x = WINDOW_WIDTH // 2 - level_up_text.get_width() // 2
-            y = WINDOW_HEIGHT // 2 - level_up_text.get_height() 
-            self.screen.blit(level_up_text, (x, y))
-            
-            x = WINDOW_WIDTH // 2 - level_num_text.get_width() // 2
-            y = WINDOW_HEIGHT // 2 + 20
-            self.screen.blit(level_num_text, (x, y))
-            
-            # Add "Meteor Time!" message at level 5
-            if self.current_level == 5:
-                meteor_font = pygame.font.Font(None, 60)
-                meteor_text = meteor_font.render('Meteor Time!', True, (139, 69, 19))  # Brown color
-                x = WINDOW_WIDTH // 2 - meteor_text.get_width() // 2
-                y = WINDOW_HEIGHT // 2 + 60
-                self.screen.blit(meteor_text, (x, y))
+        # Everything over the road, HUD last
+        display = self.display
+        display.clear()
+        queue_entities(display, sim, self.sprites, alpha)
+        profiler.lap('entities')
+        self.hud.queue(display, sim, self.high_score)
+        profiler.lap('hud')
+        profiler.queue(display, (self.screen.get_width() - GRAPH_WIDTH - 10, 10))
+        profiler.lap('overlay')
+        road_offset = sim.road_offset - sim.road_speed * (1.0 - alpha)
         
-        # Draw game over/win message
-        if self.game_state != GAME_RUNNING:
-            message = "YOU WIN!" if self.game_state == GAME_WIN else "GAME OVER!"
-            message_text = font.render(message, True, (0, 0, 0))
-            restart_text = font.render("Press R to restart", True, (0, 0, 0))
-            final_level_text = font.render(f"Final Level: {self.current_level}", True, (0, 0, 0))
+        if self.dirty_rects is not None:
+            # Restoring the background, redrawing and pushing all count as drawing
+            self.dirty_rects.present(self.screen, display, self.road, road_offset)
+            profiler.lap('draw')
+            return
+        # Draw road; the pre-rendered strip covers the whole screen
+        self.road.draw(self.screen, road_offset)
+        profiler.lap('road')
+        display.draw(self.screen)
+        profiler.lap('draw')
+        self.target.update()
+        profiler.lap('flip')
+    
+    def run(self):
+        if THREADED_SIMULATION:
+            self.run_threaded()
+            return
+        # Fixed-timestep loop: real time since the last frame is banked and
+        # spent in whole TICK_MS simulation steps, whatever the display rate
+        accumulator = 0.0
+        profiler = self.profiler
+        running = True
+        while running:
+            accumulator += self.clock.tick(FPS)
+            profiler.lap('idle')
+            running = self.handle_events()
+            self.poll_keys()
+            profiler.lap('input')
             
-            msg_x = WINDOW_WIDTH // 2 - message_text.get_width() // 2
-            msg_y = WINDOW_HEIGHT // 2 - message_text.get_height()
-            restart_x = WINDOW_WIDTH // 2 - restart_text.get_width() // 2
-            restart_y = WINDOW_HEIGHT // 2 + restart_text.get_height()
-            level_x = WINDOW_WIDTH // 2 - final_level_text.get_width() // 2
-            level_y = restart_y + restart_text.get_height() + 10
+            steps = 0
+            while accumulator >= TICK_MS:
+                if steps == MAX_CATCH_UP_STEPS:
+                    # After a stall, drop the backlog rather than spending
+                    # ever longer frames trying to catch up with it
+                    accumulator %= TICK_MS
+                    break
+                self.update()
+                accumulator -= TICK_MS
+                steps += 1
+            self.audio.update()
+            profiler.lap('audio')
             
-            self.screen.blit(message_text, (msg_x, msg_y))
-            self.screen.blit(restart_text, (restart_x, restart_y))
-            self.screen.blit(final_level_text, (level_x, level_y))
+            self.render(accumulator / TICK_MS)
+            profiler.end_frame()
         
-        pygame.display.flip()
+        self.quit()
     
-    def run(self):
+    def run_threaded(self):
+        # The simulation steps on its own thread at the fixed rate; this
+        # thread handles input, audio and events and draws the newest
+        # snapshot. The profiler isn't thread-safe, so the simulation's
+        # sections aren't timed in this mode
+        self.sim.profiler = NULL_PROFILER
+        self.sim_thread = SimulationThread(self)
+        self.sim_thread.start()
+        profiler = self.profiler
         running = True
         while running:
-            running = self.handle_events()
-            self.update()
-            self.render()
             self.clock.tick(FPS)
+            profiler.lap('idle')
+            running = self.handle_events()
+            self.poll_keys()
+            profiler.lap('input')
+            
+            self.view, events = self.sim_thread.take()
+            self.handle_sim_events(events)
+            profiler.lap('sim_events')
+            self.audio.update()
+            profiler.lap('audio')
+            
+            self.render(self.sim_thread.alpha(self.view))
+            profiler.end_frame()
         
+        self.sim_thread.stop()
+        self.sim_thread = None
+        self.view = self.sim
+        self.sim.profiler = profiler
+        self.quit()
+    
+    def quit(self):
+        self.audio.shutdown()
+        if self.leaderboard is not None:
+            self.leaderboard.close()
         pygame.quit()
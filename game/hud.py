@@ -0,0 +1,117 @@
+from collections import OrderedDict
+import pygame
+from config.settings import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, BLACK, RED, BROWN, GAME_RUNNING, GAME_WIN,
+    TEXT_CACHE_SIZE
+)
+
+# Shared fonts by point size; pygame.font.Font(None, size) is only ever built once per size
+_fonts = {}
+
+# Rendered text surfaces keyed by (font size, string, color), least recently used first
+_text_cache = OrderedDict()
+
+
+def get_font(size):
+    font = _fonts.get(size)
+    if font is None:
+        # The font module is only started once some text is first drawn
+        if not pygame.font.get_init():
+            pygame.font.init()
+        font = _fonts[size] = pygame.font.Font(None, size)
+    return font
+
+
+def render_text(size, text, color):
+    key = (size, text, color)
+    surface = _text_cache.get(key)
+    if surface is None:
+        surface = _text_cache[key] = get_font(size).render(text, True, color)
+        if len(_text_cache) > TEXT_CACHE_SIZE:
+            _text_cache.popitem(last=False)
+    else:
+        _text_cache.move_to_end(key)
+    return surface
+
+
+def centered(surface, y, width=WINDOW_WIDTH):
+    # (surface, position) blit centered horizontally on a screen this wide
+    return surface, (width // 2 - surface.get_width() // 2, y)
+
+
+class Hud:
+    """Score, high score, level and time readout drawn from a cached overlay.
+
+    Each line remembers the string it was last rendered with and is only
+    re-rendered when that string changes; the overlay is recomposed only on
+    those frames, so a steady HUD costs one blit. queue() adds the HUD to a
+    frame's DisplayList. Text and layout are scale times their size on an
+    unscaled screen.
+    """
+
+    font_size = 36
+    line_height = 30
+    origin = (10, 10)
+
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        self.width = round(WINDOW_WIDTH * scale)
+        self.height = round(WINDOW_HEIGHT * scale)
+        self.font_size = round(Hud.font_size * scale)
+        self.line_height = round(Hud.line_height * scale)
+        self.origin = (round(Hud.origin[0] * scale), round(Hud.origin[1] * scale))
+        self.lines = []
+        self.overlay = None
+
+    def text(self, size, text, color):
+        return render_text(round(size * self.scale), text, color)
+
+    def _compose(self, lines):
+        surfaces = [render_text(self.font_size, line, BLACK) for line in lines]
+        width = max(surface.get_width() for surface in surfaces)
+        height = self.line_height * (len(surfaces) - 1) + surfaces[-1].get_height()
+        self.overlay = pygame.Surface((width, height), pygame.SRCALPHA)
+        for i, surface in enumerate(surfaces):
+            self.overlay.blit(surface, (0, i * self.line_height))
+        if pygame.display.get_surface() is not None:
+            self.overlay = self.overlay.convert_alpha()
+        self.lines = lines
+
+    def queue(self, display, sim, high_score):
+        items = display.items
+        lines = [
+            f'Score: {sim.current_score}',
+            f'High Score: {high_score}',
+            f'Level: {sim.current_level}',
+            f'Time: {sim.time_left()}s',
+        ]
+        if lines != self.lines:
+            self._compose(lines)
+        items.append((self.overlay, self.origin))
+
+        # Draw level up message
+        if sim.show_level_up:
+            scale = self.scale
+            middle = self.height // 2
+            level_up_text = self.text(72, 'LEVEL UP!', RED)
+            level_num_text = self.text(72, f'Level {sim.current_level}', RED)
+            items.append(centered(level_up_text, middle - level_up_text.get_height(), self.width))
+            items.append(centered(level_num_text, middle + round(20 * scale), self.width))
+
+            # Add "Meteor Time!" message at level 5
+            if sim.current_level == 5:
+                items.append(centered(self.text(60, 'Meteor Time!', BROWN), middle + round(60 * scale), self.width))
+
+        # Draw game over/win message
+        if sim.game_state != GAME_RUNNING:
+            middle = self.height // 2
+            message = "YOU WIN!" if sim.game_state == GAME_WIN else "GAME OVER!"
+            message_text = render_text(self.font_size, message, BLACK)
+            restart_text = render_text(self.font_size, "Press R to restart", BLACK)
+            final_level_text = render_text(self.font_size, f"Final Level: {sim.current_level}", BLACK)
+
+            restart_y = middle + restart_text.get_height()
+            items.append(centered(message_text, middle - message_text.get_height(), self.width))
+            items.append(centered(restart_text, restart_y, self.width))
+            final_level_y = restart_y + restart_text.get_height() + round(10 * self.scale)
+            items.append(centered(final_level_text, final_level_y, self.width))
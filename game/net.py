@@ -0,0 +1,344 @@
+import asyncio
+import secrets
+import struct
+import sys
+import time
+from collections import OrderedDict, deque
+from config.settings import (
+    GAME_RUNNING, ACTION_SHOOT, MAX_CATCH_UP_STEPS, NET_HISTORY_TICKS, NET_MAX_BUFFERED,
+    NET_ROUND_RESTART_MS, NET_LATENCY_SAMPLES, SIMULATION_RATE
+)
+from game.simulation import Simulation, TICK_MS
+from game.net_state import capture, encode_state, decode_state, TrackView, TABLE_WIDTHS
+
+# Every message is its payload length and type, then the payload
+HEADER = struct.Struct('<IB')
+MSG_HELLO = 0  # client: role
+MSG_WELCOME = 1  # server: track count, the client's track, tick rate
+MSG_SNAPSHOT = 2  # server: tick, base tick, send time, then the encoded state
+MSG_ACK = 3  # client: tick received, its send time echoed
+MSG_INPUT = 4  # client: held ACTION_* flags, plus ACTION_SHOOT for a new shot
+MSG_RESYNC = 5  # client: couldn't decode a snapshot, send the next one in full
+
+HELLO = struct.Struct('<B')
+WELCOME = struct.Struct('<BBH')
+SNAPSHOT = struct.Struct('<IId')
+ACK = struct.Struct('<Id')
+INPUT = struct.Struct('<B')
+
+ROLE_WATCH = 0
+ROLE_PLAY = 1
+NO_TRACK = 255
+
+
+async def read_message(reader):
+    length, kind = HEADER.unpack(await reader.readexactly(HEADER.size))
+    return kind, await reader.readexactly(length)
+
+
+def message(kind, payload):
+    return HEADER.pack(len(payload), kind) + payload
+
+
+class Client:
+    # The server's view of one connection
+    def __init__(self, writer, track):
+        self.writer = writer
+        self.track = track
+        self.acked = 0  # Newest tick the client has confirmed; its delta baseline
+        self.bytes_sent = 0
+        self.snapshots_sent = 0
+        self.skipped = 0
+        self.rtt_ms = None
+
+
+class GameServer:
+    """Authoritative races streamed to any number of clients over TCP.
+
+    One Simulation per track, all started from the same seed each round,
+    so head-to-head players meet the same traffic. Players are given a
+    track and send their inputs; spectators only watch. policies can fill
+    tracks with bots: {track: policy(sim) -> ACTION_* flags}. A round starts
+    once every track has a player or bot, and the next one
+    NET_ROUND_RESTART_MS after every track has finished.
+
+    Every tick each client gets the state of all tracks as a delta against
+    the last tick it acknowledged (see net_state.encode_state); clients on
+    the same baseline share one encoding. A client whose socket is backed
+    up is skipped for the tick instead of queueing more, and catches up
+    with a delta from its older baseline.
+    """
+
+    def __init__(self, tracks=1, tuning=None, policies=None, host='', port=0):
+        self.sims = [Simulation(tuning=tuning) for _ in range(tracks)]
+        self.policies = dict(policies or {})
+        self.players = [None] * tracks  # Client playing each track
+        self.held = [0] * tracks
+        self.shots = [False] * tracks
+        self.clients = set()
+        self.handlers = set()  # Task serving each connection
+        self.host = host
+        self.port = port
+        self.tick = 0
+        self.history = OrderedDict()  # tick -> state, newest last
+        self.in_round = False
+        self.next_round = 0.0
+        self.server = None
+        self.ticker = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._serve_client, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        self.ticker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self.ticker.cancel()
+        self.server.close()
+        for handler in list(self.handlers):
+            handler.cancel()
+        await asyncio.gather(self.ticker, *self.handlers, return_exceptions=True)
+        await self.server.wait_closed()
+
+    def stats(self):
+        # Totals since start, per client
+        return [
+            {
+                'track': None if client.track == NO_TRACK else client.track,
+                'snapshots': client.snapshots_sent,
+                'skipped': client.skipped,
+                'bytes_per_tick': client.bytes_sent / client.snapshots_sent if client.snapshots_sent else 0.0,
+                'rtt_ms': client.rtt_ms,
+            }
+            for client in self.clients
+        ]
+
+    async def _serve_client(self, reader, writer):
+        client = None
+        handler = asyncio.current_task()
+        self.handlers.add(handler)
+        try:
+            kind, payload = await read_message(reader)
+            if kind != MSG_HELLO:
+                return
+            role, = HELLO.unpack(payload)
+            track = NO_TRACK
+            if role == ROLE_PLAY:
+                free = [i for i, player in enumerate(self.players) if player is None and i not in self.policies]
+                if free:
+                    track = free[0]
+            client = Client(writer, track)
+            if track != NO_TRACK:
+                self.players[track] = client
+            writer.write(message(MSG_WELCOME, WELCOME.pack(len(self.sims), track, SIMULATION_RATE)))
+            self.clients.add(client)
+
+            while True:
+                kind, payload = await read_message(reader)
+                if kind == MSG_ACK:
+                    tick, sent = ACK.unpack(payload)
+                    client.acked = max(client.acked, tick)
+                    client.rtt_ms = (time.monotonic() - sent) * 1000
+                elif kind == MSG_RESYNC:
+                    # Nothing the client holds is a usable baseline any more
+                    client.acked = 0
+                elif kind == MSG_INPUT and track != NO_TRACK:
+                    actions, = INPUT.unpack(payload)
+                    self.held[track] = actions & ~ACTION_SHOOT
+                    if actions & ACTION_SHOOT:
+                        self.shots[track] = True
+        except (asyncio.IncompleteReadError, ConnectionError, struct.error, asyncio.CancelledError):
+            # Cancelled only by stop(); the connection just ends
+            pass
+        finally:
+            self.handlers.discard(handler)
+            if client is not None:
+                self.clients.discard(client)
+                if client.track != NO_TRACK:
+                    self.players[client.track] = None
+                    self.held[client.track] = 0
+            writer.close()
+
+    def _actions(self, track):
+        policy = self.policies.get(track)
+        if policy is not None:
+            return policy(self.sims[track])
+        actions = self.held[track]
+        if self.shots[track]:
+            actions |= ACTION_SHOOT
+            self.shots[track] = False
+        return actions
+
+    def _step(self):
+        now = time.monotonic()
+        if not self.in_round:
+            ready = all(player is not None or i in self.policies for i, player in enumerate(self.players))
+            if not ready or now < self.next_round:
+                return
+            seed = secrets.randbits(64)
+            for sim in self.sims:
+                sim.reset(seed)
+            self.in_round = True
+        for track, sim in enumerate(self.sims):
+            sim.step(self._actions(track) if sim.game_state == GAME_RUNNING else 0, TICK_MS)
+        if all(sim.game_state != GAME_RUNNING for sim in self.sims):
+            self.in_round = False
+            self.next_round = now + NET_ROUND_RESTART_MS / 1000
+
+    def _broadcast(self):
+        self.tick += 1
+        state = capture(self.sims)
+        self.history[self.tick] = state
+        while len(self.history) > NET_HISTORY_TICKS:
+            self.history.popitem(last=False)
+
+        encoded = {}  # base tick -> message
+        sent = time.monotonic()
+        for client in list(self.clients):
+            transport = client.writer.transport
+            if transport.is_closing():
+                continue
+            if transport.get_write_buffer_size() > NET_MAX_BUFFERED:
+                client.skipped += 1
+                continue
+            base = client.acked if client.acked in self.history else 0
+            data = encoded.get(base)
+            if data is None:
+                payload = SNAPSHOT.pack(self.tick, base, sent) + encode_state(self.history.get(base), state)
+                data = encoded[base] = message(MSG_SNAPSHOT, payload)
+            client.writer.write(data)
+            client.bytes_sent += len(data)
+            client.snapshots_sent += 1
+
+    async def _run(self):
+        # Fixed rate, like the local game loop: catch up a few steps after a stall, then drop the rest
+        tick = TICK_MS / 1000
+        next_tick = time.monotonic()
+        while True:
+            now = time.monotonic()
+            if now < next_tick:
+                await asyncio.sleep(next_tick - now)
+                continue
+            steps = 0
+            while now >= next_tick:
+                if steps == MAX_CATCH_UP_STEPS:
+                    next_tick = now
+                    break
+                self._step()
+                next_tick += tick
+                steps += 1
+            self._broadcast()
+
+
+class GameClient:
+    """Connection to a GameServer that keeps every track's latest state.
+
+    receive() runs until the connection closes, decoding each snapshot
+    against the state it was based on and acknowledging it. A snapshot that
+    can't be decoded is reported and dropped along with every state held,
+    and the server is asked for a full one to start again from. views holds a
+    TrackView per track, ready to draw. bytes_received and latencies_ms
+    (server send to decode, meaningful only when both run on one machine,
+    where they share a monotonic clock) are kept for reporting; only the
+    latest latency_samples latencies are, or all of them with None.
+    """
+
+    def __init__(self, role=ROLE_WATCH, latency_samples=NET_LATENCY_SAMPLES):
+        self.role = role
+        self.reader = None
+        self.writer = None
+        self.track = None
+        self.views = []
+        self.states = OrderedDict()  # tick -> decoded state, newest last
+        self.tick = 0
+        self.received_at = 0.0
+        self.snapshots = 0
+        self.bytes_received = 0
+        self.latencies_ms = deque(maxlen=latency_samples)
+        self.sent_actions = 0
+        self.resyncing = False  # Waiting for a full snapshot after a bad one
+
+    async def connect(self, host, port):
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(message(MSG_HELLO, HELLO.pack(self.role)))
+        kind, payload = await read_message(self.reader)
+        if kind != MSG_WELCOME:
+            raise ConnectionError("unexpected reply from server")
+        tracks, track, rate = WELCOME.unpack(payload)
+        if rate != SIMULATION_RATE:
+            raise ConnectionError(f"server runs at {rate} ticks per second, this game at {SIMULATION_RATE}")
+        self.track = None if track == NO_TRACK else track
+        self.views = [TrackView() for _ in range(tracks)]
+
+    async def receive(self):
+        tracks = len(self.views)
+        width = len(TABLE_WIDTHS)
+        try:
+            while True:
+                kind, payload = await read_message(self.reader)
+                if kind != MSG_SNAPSHOT:
+                    continue
+                tick, base, sent = SNAPSHOT.unpack_from(payload)
+                if base and self.resyncing:
+                    # Still a delta sent before the server saw the request
+                    continue
+                try:
+                    if base and base not in self.states:
+                        raise ValueError(f"snapshot {tick} is based on {base}, which this client doesn't have")
+                    state = decode_state(self.states.get(base) if base else None, payload[SNAPSHOT.size:], tracks)
+                except (ValueError, IndexError) as e:
+                    # A missing baseline, or a corrupt snapshot
+                    print(f"net: dropped snapshot {tick} ({e}); asking for a full one", file=sys.stderr)
+                    self.states.clear()
+                    self.resyncing = True
+                    self.writer.write(message(MSG_RESYNC, b''))
+                    continue
+                self.resyncing = False
+                self.states[tick] = state
+                while len(self.states) > NET_HISTORY_TICKS:
+                    self.states.popitem(last=False)
+                for i, view in enumerate(self.views):
+                    view.apply(state[i * width:(i + 1) * width])
+                self.tick = tick
+                self.received_at = time.monotonic()
+                self.snapshots += 1
+                self.bytes_received += HEADER.size + len(payload)
+                self.latencies_ms.append((self.received_at - sent) * 1000)
+                self.writer.write(message(MSG_ACK, ACK.pack(tick, sent)))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def alpha(self):
+        # How far the display is past the latest snapshot, in ticks (0 to 1)
+        return min(max((time.monotonic() - self.received_at) * 1000 / TICK_MS, 0.0), 1.0)
+
+    def send_input(self, held, shoot=False):
+        # Only changes and shots are sent
+        if self.track is None or (held == self.sent_actions and not shoot):
+            return
+        self.sent_actions = held
+        self.writer.write(message(MSG_INPUT, INPUT.pack(held | (ACTION_SHOOT if shoot else 0))))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+async def serve(tracks, port, report_seconds=5.0):
+    # Run a GameServer until cancelled, printing traffic every report_seconds
+    server = GameServer(tracks, port=port)
+    await server.start()
+    print(f"serving {tracks} track(s) on port {server.port}")
+    try:
+        while True:
+            await asyncio.sleep(report_seconds)
+            stats = server.stats()
+            if not stats:
+                continue
+            per_tick = sum(client['bytes_per_tick'] for client in stats) / len(stats)
+            rtts = [client['rtt_ms'] for client in stats if client['rtt_ms'] is not None]
+            line = f"tick {server.tick}: {len(stats)} client(s), {per_tick:.0f} bytes per tick each"
+            if rtts:
+                line += f", round trip {min(rtts):.1f}-{max(rtts):.1f} ms"
+            print(line)
+    finally:
+        await server.stop()
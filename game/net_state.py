@@ -0,0 +1,262 @@
+import numpy as np
+from config.settings import WINDOW_WIDTH, GAME_RUNNING, GAME_OVER, GAME_WIN, NET_POSITION_SCALE
+from models.player import Player
+from models.cpu_car import CPUCar
+from models.bullet import Bullet
+from models.power_up import PowerUp
+from models.meteor import Meteor
+from models.explosion import Explosion
+
+# Game state sent over the network, as tables of integer rows keyed by
+# entity id. Each track (one Simulation) is a table holding one row of
+# game-wide values, then one table per kind of entity. Positions and speeds
+# are quantized to 1/NET_POSITION_SCALE px; meteor fire trails aren't sent
+# at all, clients grow their own from the meteors.
+GAME_STATES = (GAME_RUNNING, GAME_OVER, GAME_WIN)
+TRACK_FIELDS = (
+    'game_state', 'time', 'current_score', 'current_level', 'show_level_up', 'seconds_left',
+    'road_offset', 'road_speed', 'player_x', 'player_y', 'player_prev_x', 'player_prev_y',
+    'has_power_up', 'power_up_time',
+)
+MOVER_KINDS = ('cpu_cars', 'bullets', 'power_ups', 'meteors')
+MOVER_FIELDS = ('x', 'y', 'vx', 'vy')
+EXPLOSION_FIELDS = ('x', 'y', 'max_radius', 'blue', 'frame')
+TABLE_WIDTHS = (len(TRACK_FIELDS),) + (len(MOVER_FIELDS),) * len(MOVER_KINDS) + (len(EXPLOSION_FIELDS),)
+
+
+def _quantize(values):
+    return np.rint(np.asarray(values, dtype=np.float64) * NET_POSITION_SCALE).astype(np.int64)
+
+
+def empty_table(width):
+    return np.zeros(0, dtype=np.int64), np.zeros((0, width), dtype=np.int64)
+
+
+def empty_state(tracks):
+    return [empty_table(width) for _ in range(tracks) for width in TABLE_WIDTHS]
+
+
+def capture(sims):
+    """The current state of every simulation as a list of (ids, rows) tables.
+
+    ids is sorted and rows is an (n, fields) int64 array, so two states can
+    be compared and diffed with array operations.
+    """
+    tables = []
+    for sim in sims:
+        player = sim.player
+        moving = _quantize((
+            sim.road_offset, sim.road_speed, player.x, player.y, player.prev_x, player.prev_y
+        )).tolist()
+        row = [
+            GAME_STATES.index(sim.game_state), round(sim.time), sim.current_score, sim.current_level,
+            int(sim.show_level_up), sim.time_left(),
+        ] + moving + [int(player.has_power_up), round(player.power_up_time)]
+        tables.append((np.zeros(1, dtype=np.int64), np.array([row], dtype=np.int64)))
+
+        for name in MOVER_KINDS:
+            store = getattr(sim, name)
+            n = store.count
+            order = np.argsort(store.id[:n])
+            columns = np.column_stack([store.x[:n], store.y[:n], store.vx[:n], store.vy[:n]])
+            tables.append((store.id[:n][order], _quantize(columns)[order]))
+
+        explosions = sim.explosions
+        n = explosions.count
+        order = np.argsort(explosions.id[:n])
+        rows = np.column_stack([
+            _quantize(explosions.x[:n]), _quantize(explosions.y[:n]),
+            np.rint(explosions.max_radius[:n]).astype(np.int64),
+            explosions.blue[:n].astype(np.int64), explosions.frame[:n].astype(np.int64),
+        ])
+        tables.append((explosions.id[:n][order], rows[order]))
+    return tables
+
+
+# Wire format: one flat run of LEB128 varints. Counts, id gaps and change
+# masks are unsigned; field changes are zigzag-coded so small negative
+# changes stay one byte too.
+
+def _zigzag(values):
+    values = values.astype(np.int64)
+    return ((values << 1) ^ (values >> 63)).astype(np.uint64)
+
+
+def _unzigzag(values):
+    return (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+
+
+def encode_varints(values):
+    # Every value of an unsigned array as LEB128, in one pass over all of them
+    values = np.asarray(values, dtype=np.uint64)
+    if not len(values):
+        return b''
+    lengths = np.ones(len(values), dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        lengths += rest > 0
+        rest >>= np.uint64(7)
+    index = np.arange(int(lengths.max()))
+    groups = (values[:, None] >> (index.astype(np.uint64) * np.uint64(7))) & np.uint64(0x7F)
+    groups |= (index < lengths[:, None] - 1).astype(np.uint64) << np.uint64(7)
+    return groups[index < lengths[:, None]].astype(np.uint8).tobytes()
+
+
+def decode_varints(data):
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if not len(raw):
+        return np.zeros(0, dtype=np.uint64)
+    if raw[-1] & 0x80:
+        raise ValueError("truncated varint")
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    position = np.arange(len(raw)) - np.repeat(starts, ends - starts + 1)
+    parts = (raw & 0x7F).astype(np.uint64) << (position * 7).astype(np.uint64)
+    return np.add.reduceat(parts, starts)
+
+
+def _base_rows(base, ids):
+    # Rows of base for ids it has, zeros for the rest, plus which ids it had
+    base_ids, base_rows = base
+    rows = np.zeros((len(ids), base_rows.shape[1]), dtype=np.int64)
+    if not len(base_ids):
+        return rows, np.zeros(len(ids), dtype=bool)
+    pos = np.minimum(np.searchsorted(base_ids, ids), len(base_ids) - 1)
+    present = base_ids[pos] == ids
+    rows[present] = base_rows[pos[present]]
+    return rows, present
+
+
+def _encode_table(parts, base, table):
+    # Removed ids, then every new or changed row as its id, a mask of
+    # changed fields and the changes, field by field
+    ids, rows = table
+    removed = base[0][~np.isin(base[0], ids)]
+    old, present = _base_rows(base, ids)
+    diff = rows - old
+    changed = diff != 0
+    send = ~present | changed.any(axis=1)
+    sent_ids = ids[send]
+    changed = changed[send]
+    masks = (changed.astype(np.uint64) << np.arange(rows.shape[1], dtype=np.uint64)).sum(axis=1)
+    parts.append(np.array([len(removed)], dtype=np.uint64))
+    parts.append(np.diff(removed, prepend=0).astype(np.uint64))
+    parts.append(np.array([len(sent_ids)], dtype=np.uint64))
+    parts.append(np.diff(sent_ids, prepend=0).astype(np.uint64))
+    parts.append(masks)
+    parts.append(_zigzag(diff[send].T[changed.T]))
+
+
+def _decode_table(values, at, base, width):
+    count = int(values[at])
+    removed = np.cumsum(values[at + 1:at + 1 + count]).astype(np.int64)
+    at += 1 + count
+    count = int(values[at])
+    ids = np.cumsum(values[at + 1:at + 1 + count]).astype(np.int64)
+    masks = values[at + 1 + count:at + 1 + 2 * count]
+    at += 1 + 2 * count
+    changed = ((masks[:, None] >> np.arange(width, dtype=np.uint64)) & np.uint64(1)).astype(bool)
+    n = int(changed.sum())
+    diff = np.zeros((count, width), dtype=np.int64)
+    diff.T[changed.T] = _unzigzag(values[at:at + n])
+    at += n
+
+    rows = _base_rows(base, ids)[0] + diff
+    base_ids, base_rows = base
+    keep = ~np.isin(base_ids, removed) & ~np.isin(base_ids, ids)
+    all_ids = np.concatenate([base_ids[keep], ids])
+    order = np.argsort(all_ids)
+    return (all_ids[order], np.concatenate([base_rows[keep], rows])[order]), at
+
+
+def encode_state(base, state):
+    """state as a delta against base, an earlier state the receiver holds.
+
+    With base None the delta is against an empty state, i.e. everything.
+    Rows that didn't change since base cost nothing.
+    """
+    if base is None:
+        base = [empty_table(width) for width in TABLE_WIDTHS * (len(state) // len(TABLE_WIDTHS))]
+    parts = []
+    for base_table, table in zip(base, state):
+        _encode_table(parts, base_table, table)
+    return encode_varints(np.concatenate(parts))
+
+
+def decode_state(base, data, tracks):
+    # Inverse of encode_state(), given the same base
+    if base is None:
+        base = empty_state(tracks)
+    values = decode_varints(data)
+    state = []
+    at = 0
+    for i, base_table in enumerate(base):
+        table, at = _decode_table(values, at, base_table, TABLE_WIDTHS[i % len(TABLE_WIDTHS)])
+        state.append(table)
+    if at != len(values):
+        raise ValueError("snapshot has trailing data")
+    return state
+
+
+class TrackView:
+    """One track rebuilt from received tables, shaped like a Simulation for drawing.
+
+    queue_entities() and Hud.queue() take it in place of a Simulation.
+    Meteor fire trails are grown here from the meteors with a local random
+    generator, since they're only decoration and would be most of the data.
+    """
+
+    def __init__(self):
+        self.player = Player(WINDOW_WIDTH)
+        self.cpu_cars = CPUCar.create_store()
+        self.bullets = Bullet.create_store()
+        self.power_ups = PowerUp.create_store()
+        self.meteors = Meteor.create_store()
+        self.explosions = Explosion.create_store()
+        self.meteor_trails = Meteor.create_trail_store()
+        self.rng = np.random.default_rng()
+        self.game_state = GAME_RUNNING
+        self.time = 0
+        self.current_score = 0
+        self.current_level = 1
+        self.show_level_up = False
+        self.seconds_left = 0
+        self.road_offset = 0
+        self.road_speed = 0
+
+    def time_left(self):
+        return self.seconds_left
+
+    def apply(self, tables):
+        # tables: this track's slice of a decoded state
+        scale = NET_POSITION_SCALE
+        row = tables[0][1][0].tolist()
+        (state, self.time, self.current_score, self.current_level, show_level_up, self.seconds_left,
+         road_offset, road_speed, x, y, prev_x, prev_y, has_power_up, power_up_time) = row
+        self.game_state = GAME_STATES[state]
+        self.show_level_up = bool(show_level_up)
+        self.road_offset = road_offset / scale
+        self.road_speed = road_speed / scale
+        player = self.player
+        player.x = x / scale
+        player.y = y / scale
+        player.prev_x = prev_x / scale
+        player.prev_y = prev_y / scale
+        player.has_power_up = bool(has_power_up)
+        player.power_up_time = power_up_time
+
+        for name, (ids, rows) in zip(MOVER_KINDS, tables[1:]):
+            if name == 'meteors':
+                # Trails of meteors that are gone go with them
+                gone = self.meteors.id[:self.meteors.count]
+                self.meteor_trails.kill_owners(gone[~np.isin(gone, ids)])
+            rows = rows / scale
+            getattr(self, name).load(ids, x=rows[:, 0], y=rows[:, 1], vx=rows[:, 2], vy=rows[:, 3])
+        ids, rows = tables[-1]
+        self.explosions.load(
+            ids, x=rows[:, 0] / scale, y=rows[:, 1] / scale,
+            max_radius=rows[:, 2], blue=rows[:, 3].astype(bool), frame=rows[:, 4]
+        )
+
+        Meteor.update_trail(self.meteors, self.meteor_trails, self.rng)
+        self.meteor_trails.compact()
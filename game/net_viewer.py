@@ -0,0 +1,86 @@
+import asyncio
+import time
+import pygame
+from config.settings import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, FPS, ACTION_UP, ACTION_DOWN, ACTION_LEFT, ACTION_RIGHT
+)
+from game.sprite_cache import SpriteCache
+from game.hud import Hud
+from game.renderer import RoadLayer, DisplayList, queue_entities
+
+
+class NetViewer:
+    """Window showing every track of a GameServer side by side.
+
+    Each track is drawn like the local game, from the client's latest
+    snapshot and moved on by the time since it arrived. When the client is
+    playing, the keyboard drives its track. The HUD's high score shows the
+    leading score of the race.
+    """
+
+    def __init__(self, client):
+        self.client = client
+        pygame.display.init()
+        tracks = len(client.views)
+        self.screen = pygame.display.set_mode((WINDOW_WIDTH * tracks, WINDOW_HEIGHT))
+        caption = "2D Car Racing - spectating"
+        if client.track is not None:
+            caption = f"2D Car Racing - track {client.track + 1} of {tracks}"
+        pygame.display.set_caption(caption)
+        self.surfaces = [
+            self.screen.subsurface((i * WINDOW_WIDTH, 0, WINDOW_WIDTH, WINDOW_HEIGHT)) for i in range(tracks)
+        ]
+        self.sprites = SpriteCache()
+        self.roads = [RoadLayer() for _ in range(tracks)]
+        self.huds = [Hud() for _ in range(tracks)]
+        self.display = DisplayList()
+        self.shoot_pressed = False
+
+    def handle_events(self):
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
+                self.shoot_pressed = True
+        return True
+
+    def send_input(self):
+        keys = pygame.key.get_pressed()
+        held = 0
+        if keys[pygame.K_UP]:
+            held |= ACTION_UP
+        if keys[pygame.K_DOWN]:
+            held |= ACTION_DOWN
+        if keys[pygame.K_LEFT]:
+            held |= ACTION_LEFT
+        if keys[pygame.K_RIGHT]:
+            held |= ACTION_RIGHT
+        self.client.send_input(held, self.shoot_pressed)
+        self.shoot_pressed = False
+
+    def render(self):
+        views = self.client.views
+        alpha = self.client.alpha()
+        leader = max(view.current_score for view in views)
+        display = self.display
+        for view, surface, road, hud in zip(views, self.surfaces, self.roads, self.huds):
+            display.clear()
+            queue_entities(display, view, self.sprites, alpha)
+            hud.queue(display, view, leader)
+            road.draw(surface, view.road_offset - view.road_speed * (1.0 - alpha))
+            display.draw(surface)
+        pygame.display.flip()
+
+    async def run(self):
+        # Frames are paced with asyncio.sleep() so snapshots keep arriving in between
+        receiving = asyncio.create_task(self.client.receive())
+        frame = 1 / FPS
+        next_frame = time.monotonic()
+        while not receiving.done() and self.handle_events():
+            self.send_input()
+            self.render()
+            next_frame = max(next_frame + frame, time.monotonic())
+            await asyncio.sleep(next_frame - time.monotonic())
+        self.client.close()
+        receiving.cancel()
+        pygame.quit()
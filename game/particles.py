@@ -0,0 +1,58 @@
+import numpy as np
+from game.entity_store import EntityStore
+from config.settings import MAX_PARTICLES, PARTICLE_LIFE_BUCKETS
+
+
+class ParticleSystem(EntityStore):
+    """Fixed-size pool of short-lived particles shared by every emitter.
+
+    Rows are zero-size boxes, so x, y is a particle's center. The pool never
+    grows: emissions that don't fit are dropped, which keeps memory flat no
+    matter how many emitters are on screen. owner ties particles to the id
+    of the entity that emitted them.
+    """
+
+    def __init__(self, capacity=MAX_PARTICLES):
+        super().__init__(capacity, life=np.float64, size=np.float64, owner=np.int64)
+
+    def _grow(self):
+        raise OverflowError("particle pool is full")
+
+    def emit(self, x, y, size, owner):
+        # Append a batch of fresh particles; arrays are trimmed to the free space
+        start = self.count
+        n = min(len(x), self.capacity - start)
+        end = start + n
+        self.id[start:end] = np.arange(self.next_id, self.next_id + n)
+        self.x[start:end] = x[:n]
+        self.y[start:end] = y[:n]
+        self.vx[start:end] = 0
+        self.vy[start:end] = 0
+        self.w[start:end] = 0
+        self.h[start:end] = 0
+        self.alive[start:end] = True
+        self.life[start:end] = 1.0
+        self.size[start:end] = size[:n]
+        self.owner[start:end] = owner[:n]
+        self.next_id += n
+        self.count = end
+
+    def fade(self, amount, min_life=0.0):
+        # Age every particle and kill the ones at or below min_life
+        n = self.count
+        if not n:
+            return
+        life = self.life[:n]
+        life -= amount
+        self.alive[:n] &= life > min_life
+
+    def kill_owners(self, owner_ids):
+        if self.count and len(owner_ids):
+            self.kill(np.isin(self.view('owner'), owner_ids))
+
+    def buckets(self):
+        # Sprite keys for rendering: whole-pixel size and life quantized to PARTICLE_LIFE_BUCKETS steps
+        n = self.count
+        sizes = self.size[:n].astype(np.int64)
+        lives = np.rint(self.life[:n] * PARTICLE_LIFE_BUCKETS).astype(np.int64)
+        return sizes, lives
@@ -0,0 +1,153 @@
+import csv
+import json
+import time
+import numpy as np
+import pygame
+from config.settings import PROFILER_FRAMES, FPS, WHITE
+from game.hud import render_text
+from game.renderer import DrawCall
+
+# Timed sections of a frame, in the order they run. Simulation sections are
+# summed over every step run in the frame; idle is time spent waiting in
+# clock.tick() for the next frame.
+PHASES = (
+    'idle', 'input',
+    'player', 'power_ups', 'spawning', 'bullets', 'cars', 'meteors', 'collisions', 'explosions', 'cleanup',
+    'savestate', 'sim_events', 'audio',
+    'entities', 'hud', 'overlay', 'road', 'draw', 'flip',
+)
+PHASE_INDEX = {name: i for i, name in enumerate(PHASES)}
+SIMULATION_PHASES = PHASES[PHASE_INDEX['player']:PHASE_INDEX['cleanup'] + 1]
+RENDER_PHASES = PHASES[PHASE_INDEX['entities']:]
+
+# Overlay graph: one column per frame, stacked simulation / render / other
+GRAPH_WIDTH = 240
+GRAPH_HEIGHT = 100
+GRAPH_MS = 25  # Frame time at the top of the graph
+GRAPH_BACKGROUND = (40, 40, 40)
+SIMULATION_COLOR = (80, 200, 80)
+RENDER_COLOR = (80, 140, 255)
+OTHER_COLOR = (255, 170, 60)
+BUDGET_COLOR = (255, 60, 60)
+SUMMARY_FRAMES = 30
+
+
+class NullProfiler:
+    # Stand-in when nothing is being profiled, e.g. a headless Simulation
+    def lap(self, phase):
+        pass
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class FrameProfiler:
+    """Per-phase frame timings kept in a fixed-size ring buffer.
+
+    lap(phase) charges the time since the previous lap to phase, so timed
+    sections are consecutive and cost one perf_counter() call each.
+    end_frame() stores the frame's row in the buffer, which keeps the last
+    capacity frames. toggle() shows or hides the overlay graph, and
+    export() writes the buffer as CSV or JSON.
+    """
+
+    def __init__(self, capacity=PROFILER_FRAMES):
+        self.capacity = capacity
+        self.samples = np.zeros((capacity, len(PHASES)))
+        self.frames = 0  # Frames recorded since start; the newest row is (frames - 1) % capacity
+        self.current = [0.0] * len(PHASES)
+        self.last = time.perf_counter()
+        self.visible = False
+        self.summary = None
+        self.graph = None
+        self.graph_frames = 0  # Value of frames when the graph was last drawn
+
+    def lap(self, phase):
+        now = time.perf_counter()
+        self.current[PHASE_INDEX[phase]] += (now - self.last) * 1000
+        self.last = now
+
+    def end_frame(self):
+        self.samples[self.frames % self.capacity] = self.current
+        self.frames += 1
+        self.current = [0.0] * len(PHASES)
+
+    def history(self):
+        # Recorded rows, oldest first
+        if self.frames <= self.capacity:
+            return self.samples[:self.frames]
+        return np.roll(self.samples, -(self.frames % self.capacity), axis=0)
+
+    def toggle(self):
+        self.visible = not self.visible
+
+    def export(self, path):
+        # Format follows the file extension: .json, anything else is CSV
+        rows = self.history()
+        first = self.frames - len(rows)
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump({
+                    'phases': list(PHASES),
+                    'first_frame': first,
+                    'frames_ms': np.round(rows, 4).tolist(),
+                }, f)
+            return
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(('frame',) + PHASES + ('total',))
+            for i, row in enumerate(rows):
+                writer.writerow([first + i] + [f'{ms:.4f}' for ms in row] + [f'{row.sum():.4f}'])
+
+    def _draw_column(self, x, row):
+        # One frame as a stacked column of simulation, render and everything else (idle excluded)
+        graph = self.graph
+        pygame.draw.line(graph, GRAPH_BACKGROUND, (x, 0), (x, GRAPH_HEIGHT - 1))
+        sim = row[PHASE_INDEX['player']:PHASE_INDEX['cleanup'] + 1].sum()
+        render = row[PHASE_INDEX['entities']:].sum()
+        other = row.sum() - sim - render - row[PHASE_INDEX['idle']]
+        scale = GRAPH_HEIGHT / GRAPH_MS
+        bottom = GRAPH_HEIGHT
+        for ms, color in ((sim, SIMULATION_COLOR), (render, RENDER_COLOR), (other, OTHER_COLOR)):
+            top = max(bottom - int(ms * scale), 0)
+            if top < bottom:
+                pygame.draw.line(graph, color, (x, top), (x, bottom - 1))
+            bottom = top
+        # Frame budget line
+        graph.set_at((x, GRAPH_HEIGHT - int(1000 / FPS * scale)), BUDGET_COLOR)
+
+    def _update_graph(self):
+        # Scroll the graph left and draw only the frames recorded since the last update
+        if self.graph is None:
+            self.graph = pygame.Surface((GRAPH_WIDTH, GRAPH_HEIGHT))
+            self.graph_frames = 0
+        new = min(self.frames - self.graph_frames, GRAPH_WIDTH)
+        if not new:
+            return
+        rows = self.history()[-new:]
+        self.graph.scroll(-new, 0)
+        for i, row in enumerate(rows):
+            self._draw_column(GRAPH_WIDTH - new + i, row)
+        self.graph_frames = self.frames
+
+    def _summary_text(self):
+        # Averages over the last SUMMARY_FRAMES frames, refreshed as often
+        if self.summary is None or self.frames % SUMMARY_FRAMES == 0:
+            means = self.history()[-SUMMARY_FRAMES:].mean(axis=0)
+            sim = sum(means[PHASE_INDEX[p]] for p in SIMULATION_PHASES)
+            render = sum(means[PHASE_INDEX[p]] for p in RENDER_PHASES)
+            busy = means.sum() - means[PHASE_INDEX['idle']]
+            self.summary = f'sim {sim:.2f} render {render:.2f} busy {busy:.2f} ms'
+        return render_text(20, self.summary, WHITE)
+
+    def queue(self, display, origin):
+        # Add the graph overlay to a DisplayList; redrawn every frame it's visible
+        if not self.visible or not self.frames:
+            return
+        self._update_graph()
+        x, y = origin
+        display.items.append(DrawCall(
+            (x, y, GRAPH_WIDTH, GRAPH_HEIGHT), ('profiler', self.frames),
+            lambda screen: screen.blit(self.graph, (x, y))
+        ))
+        display.items.append((self._summary_text(), (x + 4, y + 4)))
@@ -1,100 +1,323 @@
 import pygame
 from config.settings import (
-    WINDOW_WIDTH, WINDOW_HEIGHT, WHITE, GRAY, BLACK, YELLOW,
-    GAME_RUNNING, GAME_OVER, GAME_WIN, ROAD_WIDTH
+    WINDOW_WIDTH, WINDOW_HEIGHT, WHITE, GRAY, YELLOW, RED, ROAD_WIDTH, GAME_RUNNING,
+    RENDER_SCALE, DISPLAY_SCALING, DISPLAY_SIZE, SCALING_MODES
 )
+from game.sprite_cache import PLAYER, CPU_CAR, BULLET, POWER_UP, METEOR, queue_store, queue_particles
+from models.cpu_car import CPUCar
+from models.bullet import Bullet
+from models.power_up import PowerUp
+from models.explosion import Explosion
+from models.blue_explosion import BlueExplosion
+from models.meteor import Meteor
+
+# Road lines with fixed parameters
+LINE_WIDTH = 10
+LINE_HEIGHT = 50
+LINE_GAP = 40
+ROAD_PATTERN = LINE_HEIGHT + LINE_GAP  # The road repeats every 90 px
+EDGE_WIDTH = 5
+
+def scale_rect(rect, scale):
+    # A world-space (x, y, width, height) in render target pixels
+    x, y, width, height = rect
+    return (round(x * scale), round(y * scale), round(width * scale), round(height * scale))
+
+def draw_road_strip(surface, scale=1.0):
+    # Background, road, center dashes and edges for the whole surface, scale
+    # render target pixels to a world pixel
+    width, height = surface.get_size()
+    road_width = round(ROAD_WIDTH * scale)
+    edge_width = max(round(EDGE_WIDTH * scale), 1)
+    road_x = (width - road_width) // 2
+    surface.fill(WHITE)
 
-def draw_road(screen, offset):
-    road_x = (WINDOW_WIDTH - ROAD_WIDTH) // 2
-    
     # Draw road background
-    pygame.draw.rect(screen, GRAY, (road_x, 0, ROAD_WIDTH, WINDOW_HEIGHT))
-    
-    # Draw road lines with fixed parameters
-    line_width = 10
-    line_height = 50
-    line_gap = 40
-    total_pattern = line_height + line_gap
-    line_x = WINDOW_WIDTH // 2 - line_width // 2
-    
-    # Calculate number of lines needed to fill screen plus one extra to prevent gaps
-    num_lines = WINDOW_HEIGHT // total_pattern + 2
-    
-    # Draw yellow center lines
-    for i in range(num_lines):
-        y = -line_height + (offset % total_pattern) + (i * total_pattern)
-        if y < WINDOW_HEIGHT:  # Only draw if line is on screen
-            pygame.draw.rect(screen, YELLOW, (line_x, y, line_width, line_height))
-    
+    pygame.draw.rect(surface, GRAY, (road_x, 0, road_width, height))
+
+    # Draw yellow center lines, starting with one cut off by the top edge
+    line_width = max(round(LINE_WIDTH * scale), 1)
+    line_x = width // 2 - line_width // 2
+    for y in range(-LINE_HEIGHT, round(height / scale), ROAD_PATTERN):
+        top = round(y * scale)
+        pygame.draw.rect(surface, YELLOW, (line_x, top, line_width, round((y + LINE_HEIGHT) * scale) - top))
+
     # Draw road edges
-    edge_width = 5
-    pygame.draw.rect(screen, WHITE, (road_x, 0, edge_width, WINDOW_HEIGHT))
-    pygame.draw.rect(screen, WHITE, (road_x + ROAD_WIDTH - edge_width, 0, edge_width, WINDOW_HEIGHT))
-    
-def draw_game(screen, game_manager):
-    # Fill background
-    screen.fill(BLACK)
-    
-    # Draw road with offset
-    draw_road(screen, game_manager.road_offset)
-    
-    # Draw power-ups
-    for power_up in game_manager.power_ups:
-        power_up.draw(screen)
-    
-    # Draw bullets
-    for bullet in game_manager.bullets:
-        bullet.draw(screen)
-    
-    # Draw CPU cars
-    for car in game_manager.cpu_cars:
-        car.draw(screen)
-    
-    # Draw player
-    game_manager.player.draw(screen)
-    
-    # Draw explosions
-    for explosion in game_manager.explosions:
-        explosion.draw(screen)
-    
-    # Draw score
-    font = pygame.font.Font(None, 36)
-    score_text = font.render(f"Score: {game_manager.current_score}", True, WHITE)
-    high_score_text = font.render(f"High Score: {game_manager.high_score}", True, WHITE)
-    level_text = font.render(f"Level: {game_manager.current_level}", True, WHITE)
-    
-    screen.blit(score_text, (10, 10))
-    screen.blit(high_score_text, (10, 50))
-    screen.blit(level_text, (WINDOW_WIDTH - 150, 10))
-    
-    # Draw game over or level up text
-    if game_manager.game_state == GAME_OVER:
-        game_over_text = font.render("Game Over! Press R to restart", True, WHITE)
-        text_rect = game_over_text.get_rect(center=(WINDOW_WIDTH/2, WINDOW_HEIGHT/2))
-        screen.blit(game_over_text, text_rect)
-    elif game_manager.show_level_up:
-        if pygame.time.get_ticks() - game_manager.level_up_time < 2000:  # Show for 2 seconds
-            level_up_text = font.render(f"Level {game_manager.current_level}!", True, WHITE)
-            text_rect = level_up_text.get_rect(center=(WINDOW_WIDTH/2, WINDOW_HEIGHT/2))
-            screen.blit(level_up_text, text_rect)
-            
-            # Show power-up unlock message at level 3
-            if game_manager.current_level == 3:
-                unlock_text = font.render("Power-ups Unlocked! Collect red circles to shoot!", True, WHITE)
-                unlock_rect = unlock_text.get_rect(center=(WINDOW_WIDTH/2, WINDOW_HEIGHT/2 + 40))
-                screen.blit(unlock_text, unlock_rect)
+    pygame.draw.rect(surface, WHITE, (road_x, 0, edge_width, height))
+    pygame.draw.rect(surface, WHITE, (road_x + road_width - edge_width, 0, edge_width, height))
+
+class RoadLayer:
+    """Scrolling background drawn from one pre-rendered strip.
+
+    The strip is one road pattern taller than the screen, so any scroll
+    offset is a single blit of a window into it. It is rebuilt only when the
+    target surface changes size. scale is render target pixels per world
+    pixel; offsets are in world pixels.
+    """
+
+    def __init__(self, scale=1.0):
+        self.scale = scale
+        self.strip = None
+        self.size = None
+
+    def build(self, size):
+        width, height = size
+        strip = pygame.Surface((width, height + round(ROAD_PATTERN * self.scale)))
+        draw_road_strip(strip, self.scale)
+        if pygame.display.get_surface() is not None:
+            strip = strip.convert()
+        self.strip = strip
+        self.size = size
+
+    def top(self, offset):
+        # Moving the window up the strip scrolls the road down the screen
+        return round(ROAD_PATTERN * self.scale) - int(offset % ROAD_PATTERN * self.scale)
+
+    def road_rect(self, size):
+        # The part of a target of this size that scrolls
+        road_width = round(ROAD_WIDTH * self.scale)
+        return pygame.Rect((size[0] - road_width) // 2, 0, road_width, size[1])
+
+    def draw(self, screen, offset):
+        size = screen.get_size()
+        if size != self.size:
+            self.build(size)
+        screen.blit(self.strip, (0, 0), (0, self.top(offset), size[0], size[1]))
+
+    def restore(self, screen, rect, offset):
+        # Repaint one screen rectangle with the background at this scroll offset
+        screen.blit(self.strip, rect, (rect[0], rect[1] + self.top(offset), rect[2], rect[3]))
+
+class DrawCall:
+    # A display list item that isn't a plain blit: draws itself inside rect.
+    # key identifies its appearance, so an unchanged call isn't redrawn.
+    __slots__ = ('rect', 'key', 'draw')
+
+    def __init__(self, rect, key, draw):
+        self.rect = rect
+        self.key = key
+        self.draw = draw
+
+class DisplayList:
+    """Everything drawn over the road in one frame, in drawing order.
+
+    Items are (surface, position) blits or DrawCalls. Runs of blits go out
+    through a single Surface.blits() call.
+    """
+
+    def __init__(self):
+        self.items = []
+
+    def clear(self):
+        self.items.clear()
+
+    def draw(self, screen):
+        batch = []
+        for item in self.items:
+            if isinstance(item, DrawCall):
+                if batch:
+                    screen.blits(batch, doreturn=False)
+                    batch = []
+                item.draw(screen)
+            else:
+                batch.append(item)
+        if batch:
+            screen.blits(batch, doreturn=False)
+
+    def signatures(self):
+        # (rect, appearance) per item. Surfaces are never drawn on once queued
+        # (cached sprites, or a new overlay when the HUD changes), so the
+        # surface object itself stands for its appearance. It's the object,
+        # not its id(): a presenter holding last frame's signatures keeps
+        # those surfaces alive, so a new one can't be mistaken for them
+        result = []
+        for item in self.items:
+            if isinstance(item, DrawCall):
+                result.append((tuple(item.rect), item.key))
+            else:
+                surface, (x, y) = item
+                result.append(((int(x), int(y)) + surface.get_size(), surface))
+        return result
+
+class DirtyRectPresenter:
+    """Redraws and pushes only the parts of the screen that changed.
+
+    An item is dirty when its rectangle or appearance differs from last
+    frame; both its old and new rectangles are repainted from the cached
+    road strip. Unchanged items that overlap a repainted area are redrawn
+    too, whole, so nothing is blended over itself. When nothing changed,
+    nothing is drawn or pushed. Changed areas are pushed with
+    update(rects), or update() for the whole screen.
+    """
+
+    def __init__(self, update=pygame.display.update):
+        self.update = update
+        self.previous = {}
+        self.previous_offset = None
+        self.previous_size = None
+
+    def present(self, screen, display, road, offset):
+        size = screen.get_size()
+        signatures = display.signatures()
+        current = {}
+        for signature in signatures:
+            current[signature] = current.get(signature, 0) + 1
+
+        if size != self.previous_size:
+            # First frame, or the target changed: everything is dirty
+            road.draw(screen, offset)
+            display.draw(screen)
+            self.update()
+            self.previous = current
+            self.previous_offset = offset
+            self.previous_size = size
+            return
+
+        dirty = []
+        if offset != self.previous_offset:
+            dirty.append(road.road_rect(size))
+        for signature, count in self.previous.items():
+            if current.get(signature, 0) != count:
+                dirty.append(pygame.Rect(signature[0]))
+        for signature, count in current.items():
+            if self.previous.get(signature, 0) != count:
+                dirty.append(pygame.Rect(signature[0]))
+        self.previous = current
+        self.previous_offset = offset
+        if not dirty:
+            return
+
+        # Grow the dirty set by every item that touches it until it stops growing
+        rects = [pygame.Rect(signature[0]) for signature in signatures]
+        redraw = [False] * len(rects)
+        grown = True
+        while grown:
+            grown = False
+            for i, rect in enumerate(rects):
+                if not redraw[i] and rect.collidelist(dirty) != -1:
+                    redraw[i] = True
+                    dirty.append(rect)
+                    grown = True
+
+        screen_rect = screen.get_rect()
+        dirty = [rect.clip(screen_rect) for rect in dirty]
+        dirty = [rect for rect in dirty if rect.width and rect.height]
+        for rect in dirty:
+            road.restore(screen, rect, offset)
+        partial = DisplayList()
+        partial.items = [item for item, needed in zip(display.items, redraw) if needed]
+        partial.draw(screen)
+        self.update(dirty)
+
+
+class RenderTarget:
+    """The surface a frame is drawn into, and how it gets to the screen.
+
+    The target is scale times the world size; see DISPLAY_SCALING in
+    config/settings.py for the modes. With None or 'scaled' the target is
+    the display surface itself. With 'integer' or 'smooth' it's an
+    offscreen surface that update() scales into the window, letterboxed.
+    Where SDL has no renderer for 'scaled', integer scaling is used instead.
+    """
+
+    def __init__(self, scale=RENDER_SCALE, mode=DISPLAY_SCALING, display_size=DISPLAY_SIZE):
+        if mode not in SCALING_MODES:
+            raise ValueError(f"unknown display scaling {mode!r}, expected one of {SCALING_MODES}")
+        self.scale = scale
+        self.mode = mode
+        self.size = (round(WINDOW_WIDTH * scale), round(WINDOW_HEIGHT * scale))
+        if mode == 'scaled':
+            try:
+                self.window = self.surface = pygame.display.set_mode(self.size, pygame.SCALED | pygame.RESIZABLE)
+                return
+            except pygame.error:
+                self.mode = mode = 'integer'
+        if mode is None:
+            self.window = self.surface = pygame.display.set_mode(self.size)
         else:
-            game_manager.show_level_up = False
-    
-    # Draw power-up timer bar
-    if game_manager.power_up_active:
-        power_up_bar_width = 200
-        power_up_bar_height = 20
-        power_up_bar_x = WINDOW_WIDTH - power_up_bar_width - 10
-        power_up_bar_y = 10
-        power_up_bar_fill = (game_manager.power_up_time - (pygame.time.get_ticks() - game_manager.power_up_start_time)) / game_manager.power_up_time
-        
-        pygame.draw.rect(screen, WHITE, (power_up_bar_x, power_up_bar_y, power_up_bar_width, power_up_bar_height), 2)
-        pygame.draw.rect(screen, WHITE, (power_up_bar_x, power_up_bar_y, power_up_bar_width * power_up_bar_fill, power_up_bar_height))
-    
-    pygame.display.flip()
+            self.window = pygame.display.set_mode(display_size)
+            self.surface = pygame.Surface(self.size).convert()
+            width, height = self.size
+            factor = min(display_size[0] // width, display_size[1] // height)
+            if not factor:
+                # A target bigger than the window can only be shrunk smoothly
+                self.mode = mode = 'smooth'
+            if mode == 'integer':
+                fitted = (width * factor, height * factor)
+            else:
+                factor = min(display_size[0] / width, display_size[1] / height)
+                fitted = (round(width * factor), round(height * factor))
+            self.factor = factor
+            self.output = pygame.Rect(
+                (display_size[0] - fitted[0]) // 2, (display_size[1] - fitted[1]) // 2, fitted[0], fitted[1]
+            )
+            self.window.fill((0, 0, 0))
+
+    def update(self, rects=None):
+        # Push the whole frame, or just rects of it (render target pixels)
+        if self.surface is self.window:
+            if rects is None:
+                pygame.display.flip()
+            else:
+                pygame.display.update(rects)
+            return
+        output = self.output
+        if self.mode == 'integer' and rects is not None:
+            # Scaling by a whole number keeps every pixel in its own block, so only changed areas are redone
+            factor = self.factor
+            pushed = []
+            for rect in rects:
+                block = pygame.Rect(
+                    output.x + rect[0] * factor, output.y + rect[1] * factor, rect[2] * factor, rect[3] * factor
+                )
+                pygame.transform.scale(self.surface.subsurface(rect), block.size, self.window.subsurface(block))
+                pushed.append(block)
+            pygame.display.update(pushed)
+            return
+        if self.mode == 'integer':
+            pygame.transform.scale(self.surface, output.size, self.window.subsurface(output))
+        else:
+            pygame.transform.smoothscale(self.surface, output.size, self.window.subsurface(output))
+        pygame.display.flip()
+
+
+def queue_entities(display, sim, sprites, alpha=1.0):
+    """Queue every entity, drawn alpha of the way from the previous step to the latest.
+
+    Stores keep the last step's displacement in vx, vy, so the previous
+    position is x - vx. Once the game is over nothing moves and the latest
+    positions are drawn as they are. Positions are mapped from world to
+    render target pixels with the sprite cache's scale.
+    """
+    # Player, CPU cars, bullets, power-ups and meteors come from the sprite cache
+    items = display.items
+    scale = sprites.scale
+    lag = 1.0 - alpha if sim.game_state == GAME_RUNNING else 0.0
+    player = sim.player
+    px = player.x - (player.x - player.prev_x) * lag
+    py = player.y - (player.y - player.prev_y) * lag
+    surface, (ox, oy) = sprites.get(PLAYER, player.width, player.height, player.has_power_up, player)
+    items.append((surface, (px * scale + ox, py * scale + oy)))
+    queue_store(items, sprites.get(CPU_CAR, CPUCar.width, CPUCar.height), sim.cpu_cars, lag, scale)
+    queue_store(items, sprites.get(BULLET, Bullet.radius * 2, Bullet.radius * 2), sim.bullets, lag, scale)
+    queue_store(items, sprites.get(POWER_UP, PowerUp.radius * 2, PowerUp.radius * 2), sim.power_ups, lag, scale)
+
+    bar = player.power_up_bar_rect(sim.time, px, py)
+    if bar is not None:
+        bar = scale_rect(bar, scale)
+        items.append(DrawCall(bar, bar, lambda screen: pygame.draw.rect(screen, RED, bar)))
+
+    # Explosions play back pre-rendered frames; frame is one ahead of the one to show
+    explosions = sim.explosions
+    n = explosions.count
+    explosion = sprites.explosion
+    for blue, max_radius, frame, x, y in zip(
+        explosions.blue[:n].tolist(), explosions.max_radius[:n].tolist(), explosions.frame[:n].tolist(),
+        (explosions.x[:n] * scale).astype(int).tolist(), (explosions.y[:n] * scale).astype(int).tolist()
+    ):
+        surface, (ox, oy) = explosion(BlueExplosion if blue else Explosion, max_radius, frame - 1)
+        items.append((surface, (x + ox, y + oy)))
+
+    # Fire trail particles, then the meteors on top of them
+    queue_particles(items, sprites, sim.meteor_trails)
+    queue_store(items, sprites.get(METEOR, Meteor.size * 2, Meteor.size * 2), sim.meteors, lag, scale)
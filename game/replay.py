@@ -0,0 +1,77 @@
+import struct
+from config.settings import SIMULATION_RATE, GAME_RUNNING
+from game.simulation import Simulation, TICK_MS
+
+# File layout, all little-endian:
+#   header: magic, format version, simulation rate, seed, number of steps
+#   body:   runs of (actions bitmask, repeat count), one per change of input
+MAGIC = b'RPLY'
+VERSION = 1
+_HEADER = struct.Struct('<4sBHQI')
+_RUN = struct.Struct('<BH')
+_MAX_RUN = 0xFFFF
+
+
+class Replay:
+    """A recorded game: the simulation seed and the input bitmask of every step.
+
+    Steps are TICK_MS long, so replaying the inputs into a Simulation
+    created with the same seed reproduces the game bit for bit, whether
+    it's driven by the game loop or fast-forwarded with run().
+    """
+
+    def __init__(self, seed, inputs=None):
+        self.seed = seed
+        self.inputs = inputs if inputs is not None else []
+
+    def record(self, actions):
+        self.inputs.append(actions)
+
+    def truncate(self, steps):
+        # Forget every input after the first steps, e.g. when the game is rewound
+        del self.inputs[steps:]
+
+    def encode(self):
+        runs = []
+        for actions in self.inputs:
+            if runs and runs[-1][0] == actions and runs[-1][1] < _MAX_RUN:
+                runs[-1][1] += 1
+            else:
+                runs.append([actions, 1])
+        header = _HEADER.pack(MAGIC, VERSION, SIMULATION_RATE, self.seed, len(self.inputs))
+        return header + b''.join(_RUN.pack(actions, count) for actions, count in runs)
+
+    @classmethod
+    def decode(cls, data):
+        magic, version, rate, seed, steps = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a replay file")
+        if rate != SIMULATION_RATE:
+            raise ValueError(f"replay was recorded at {rate} steps per second, not {SIMULATION_RATE}")
+        inputs = []
+        for actions, count in _RUN.iter_unpack(data[_HEADER.size:]):
+            inputs.extend([actions] * count)
+        if len(inputs) != steps:
+            raise ValueError("replay file is truncated")
+        return cls(seed, inputs)
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            f.write(self.encode())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.decode(f.read())
+
+    def run(self, sim=None):
+        # Fast-forward the whole replay headless and return the finished simulation
+        if sim is None:
+            sim = Simulation(self.seed)
+        else:
+            sim.reset(self.seed)
+        for actions in self.inputs:
+            if sim.game_state != GAME_RUNNING:
+                break
+            sim.step(actions, TICK_MS)
+        return sim
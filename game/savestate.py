@@ -0,0 +1,240 @@
+import struct
+import zlib
+from collections import deque
+import numpy as np
+from config.settings import (
+    GAME_RUNNING, GAME_OVER, GAME_WIN, DEATH_CPU_CAR, DEATH_METEOR, DEATH_METEOR_BLAST,
+    SIMULATION_RATE, REWIND_SECONDS, REWIND_BUDGET_BYTES, REWIND_KEYFRAME_INTERVAL
+)
+from game.simulation import Simulation
+
+# Savestate layout, all little-endian:
+#   header:  magic, format version
+#   game:    timers, road, difficulty knobs, score, level, state, seed
+#   player:  position, speed and power-up
+#   rng:     the PCG64 generator's 128-bit state and increment, and its cached half-word
+#   stores:  per store, in STORES order: row count, next id, then each
+#            column's live rows as raw array bytes, in the store's column order
+MAGIC = b'SAVE'
+VERSION = 1
+_HEADER = struct.Struct('<4sB')
+_GAME = struct.Struct('<13dqiBBBQ')
+_PLAYER = struct.Struct('<5dBdd')
+_RNG = struct.Struct('<16s16sBI')
+_STORE = struct.Struct('<Iq')
+GAME_STATES = (GAME_RUNNING, GAME_OVER, GAME_WIN)
+DEATH_CAUSES = (None, DEATH_CPU_CAR, DEATH_METEOR, DEATH_METEOR_BLAST)
+STORES = ('cpu_cars', 'explosions', 'bullets', 'power_ups', 'meteors', 'meteor_trails')
+
+
+def save_state(sim):
+    """Everything that decides how sim plays on from here, as bytes.
+
+    Restoring it with load_state() and stepping with the same inputs gives
+    exactly the same game as stepping the original.
+    """
+    player = sim.player
+    rng = sim.rng.bit_generator.state
+    parts = [
+        _HEADER.pack(MAGIC, VERSION),
+        _GAME.pack(
+            sim.time, sim.start_time, sim.last_spawn_time, sim.last_power_up_spawn, sim.last_meteor_spawn,
+            sim.last_difficulty_increase, sim.level_up_time, sim.road_offset, sim.road_speed,
+            sim.world_speed_multiplier, sim.spawn_rate, sim.meteor_spawn_rate, sim.power_up_spawn_rate,
+            sim.current_score, sim.current_level, GAME_STATES.index(sim.game_state), sim.show_level_up,
+            DEATH_CAUSES.index(sim.death_cause), sim.seed,
+        ),
+        _PLAYER.pack(
+            player.x, player.y, player.prev_x, player.prev_y, player.speed,
+            player.has_power_up, player.power_up_time, player.power_up_duration,
+        ),
+        _RNG.pack(
+            rng['state']['state'].to_bytes(16, 'little'), rng['state']['inc'].to_bytes(16, 'little'),
+            rng['has_uint32'], rng['uinteger'],
+        ),
+    ]
+    for name in STORES:
+        store = getattr(sim, name)
+        n = store.count
+        parts.append(_STORE.pack(n, store.next_id))
+        parts.extend(store.columns[column][:n].tobytes() for column in store.dtypes)
+    return b''.join(parts)
+
+
+def load_state(sim, data):
+    # Put sim in the state save_state() recorded; sim must use the same settings
+    magic, version = _HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a savestate")
+    at = _HEADER.size
+    (sim.time, sim.start_time, sim.last_spawn_time, sim.last_power_up_spawn, sim.last_meteor_spawn,
+     sim.last_difficulty_increase, sim.level_up_time, sim.road_offset, sim.road_speed,
+     sim.world_speed_multiplier, sim.spawn_rate, sim.meteor_spawn_rate, sim.power_up_spawn_rate,
+     sim.current_score, sim.current_level, game_state, show_level_up, death_cause, sim.seed) = _GAME.unpack_from(data, at)
+    sim.game_state = GAME_STATES[game_state]
+    sim.show_level_up = bool(show_level_up)
+    sim.death_cause = DEATH_CAUSES[death_cause]
+    sim.events = []
+    at += _GAME.size
+
+    player = sim.player
+    (player.x, player.y, player.prev_x, player.prev_y, player.speed,
+     has_power_up, player.power_up_time, player.power_up_duration) = _PLAYER.unpack_from(data, at)
+    player.has_power_up = bool(has_power_up)
+    at += _PLAYER.size
+
+    state, inc, has_uint32, uinteger = _RNG.unpack_from(data, at)
+    sim.rng = np.random.default_rng()
+    sim.rng.bit_generator.state = {
+        'bit_generator': 'PCG64',
+        'state': {'state': int.from_bytes(state, 'little'), 'inc': int.from_bytes(inc, 'little')},
+        'has_uint32': has_uint32,
+        'uinteger': uinteger,
+    }
+    at += _RNG.size
+
+    for name in STORES:
+        store = getattr(sim, name)
+        n, store.next_id = _STORE.unpack_from(data, at)
+        at += _STORE.size
+        store.reserve(n)
+        for column, dtype in store.dtypes.items():
+            size = n * np.dtype(dtype).itemsize
+            store.columns[column][:n] = np.frombuffer(data, dtype=dtype, count=n, offset=at)
+            at += size
+        store.count = n
+    if at != len(data):
+        raise ValueError("savestate has trailing data")
+
+
+def fork(sim):
+    # Independent copy of sim at this point, e.g. to try other inputs without touching it
+    copy = Simulation(sim.seed, sim.tuning)
+    load_state(copy, save_state(sim))
+    return copy
+
+
+def _xor(a, b):
+    # Byte-wise XOR of two savestates, the shorter one padded with zeros
+    size = max(len(a), len(b))
+    result = np.zeros(size, dtype=np.uint8)
+    result[:len(a)] = np.frombuffer(a, dtype=np.uint8)
+    result[:len(b)] ^= np.frombuffer(b, dtype=np.uint8)
+    return result.tobytes()
+
+
+_DELTA = struct.Struct('<II')
+
+
+class RewindBuffer:
+    """The most recent savestates, oldest first, within a fixed memory budget.
+
+    Every keyframe_interval-th state is kept whole; the ones in between
+    are kept as the XOR against the state before, which is mostly zeros,
+    and everything is zlib-compressed. The newest state is also kept
+    uncompressed, so stepping back is one decompress and XOR per step.
+    Once more than capacity states or budget bytes are held, the oldest
+    are dropped a keyframe at a time.
+
+    Each state is stored with a tick, which the caller chooses.
+    """
+
+    def __init__(self, capacity=REWIND_SECONDS * SIMULATION_RATE, budget=REWIND_BUDGET_BYTES,
+                 keyframe_interval=REWIND_KEYFRAME_INTERVAL):
+        self.capacity = capacity
+        self.budget = budget
+        self.keyframe_interval = keyframe_interval
+        self.entries = deque()  # (tick, is keyframe, compressed bytes)
+        self.bytes = 0
+        self.newest = None  # Uncompressed state of the last entry
+        self.since_keyframe = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.bytes = 0
+        self.newest = None
+
+    def push(self, tick, state):
+        keyframe = self.newest is None or self.since_keyframe >= self.keyframe_interval - 1
+        if keyframe:
+            blob = zlib.compress(state, 1)
+            self.since_keyframe = 0
+        else:
+            blob = _DELTA.pack(len(state), len(self.newest)) + zlib.compress(_xor(self.newest, state), 1)
+            self.since_keyframe += 1
+        self.entries.append((tick, keyframe, blob))
+        self.bytes += len(blob)
+        self.newest = state
+
+        while len(self.entries) > self.capacity or (self.bytes > self.budget and len(self.entries) > 1):
+            self._drop_oldest()
+            # Deltas whose keyframe is gone can't be decoded any more
+            while self.entries and not self.entries[0][1]:
+                self._drop_oldest()
+        if not self.entries:
+            self.newest = None
+
+    def _drop_oldest(self):
+        _, _, blob = self.entries.popleft()
+        self.bytes -= len(blob)
+
+    def _rebuild_newest(self):
+        # Decode the last entry from the keyframe it follows
+        start = len(self.entries) - 1
+        while not self.entries[start][1]:
+            start -= 1
+        state = zlib.decompress(self.entries[start][2])
+        for i in range(start + 1, len(self.entries)):
+            blob = self.entries[i][2]
+            size, _ = _DELTA.unpack_from(blob)
+            state = _xor(state, zlib.decompress(blob[_DELTA.size:]))[:size]
+        self.newest = state
+
+    def latest(self):
+        # (tick, state) of the newest entry, or None when empty
+        if not self.entries:
+            return None
+        return self.entries[-1][0], self.newest
+
+    def _count_since_keyframe(self):
+        # Deltas after the last keyframe, which the next push continues from
+        count = 0
+        for _, keyframe, _ in reversed(self.entries):
+            if keyframe:
+                break
+            count += 1
+        self.since_keyframe = count
+
+    def pop(self):
+        """Drop the newest state and return (tick, state) of the one before.
+
+        The oldest state is never dropped, so holding rewind stops there.
+        Returns None when the buffer is empty.
+        """
+        if len(self.entries) < 2:
+            return self.latest()
+        _, keyframe, blob = self.entries.pop()
+        self.bytes -= len(blob)
+        if keyframe:
+            self._rebuild_newest()
+        else:
+            _, base_size = _DELTA.unpack_from(blob)
+            self.newest = _xor(self.newest, zlib.decompress(blob[_DELTA.size:]))[:base_size]
+        self._count_since_keyframe()
+        return self.latest()
+
+    def discard_after(self, tick):
+        # Forget every state newer than tick, e.g. after going back to an earlier point
+        if not self.entries or self.entries[-1][0] <= tick:
+            return
+        while self.entries and self.entries[-1][0] > tick:
+            _, _, blob = self.entries.pop()
+            self.bytes -= len(blob)
+        if not self.entries:
+            self.clear()
+            return
+        self._rebuild_newest()
+        self._count_since_keyframe()
@@ -0,0 +1,125 @@
+import threading
+import time
+from config.settings import MAX_CATCH_UP_STEPS
+from game.simulation import TICK_MS
+
+# Store columns the renderer reads, per store; snapshots copy nothing else
+RENDER_COLUMNS = {
+    'cpu_cars': ('x', 'y', 'vx', 'vy'),
+    'bullets': ('x', 'y', 'vx', 'vy'),
+    'power_ups': ('x', 'y', 'vx', 'vy'),
+    'meteors': ('x', 'y', 'vx', 'vy'),
+    'explosions': ('x', 'y', 'blue', 'max_radius', 'frame'),
+    'meteor_trails': ('x', 'y', 'size', 'life'),
+}
+
+
+class Snapshot:
+    """Read-only copy of what drawing needs from a Simulation, taken after a step.
+
+    Stores are cut down to their live rows and the RENDER_COLUMNS, and the
+    player is a detached copy, so a snapshot can be drawn while the
+    simulation moves on. It stands in for the Simulation in queue_entities()
+    and Hud.queue(). tick_time is the perf_counter() time the step was due.
+    """
+
+    def __init__(self, sim, tick_time):
+        self.tick_time = tick_time
+        self.game_state = sim.game_state
+        self.time = sim.time
+        self.current_score = sim.current_score
+        self.current_level = sim.current_level
+        self.show_level_up = sim.show_level_up
+        self.road_offset = sim.road_offset
+        self.road_speed = sim.road_speed
+        self.seconds_left = sim.time_left()
+        self.player = sim.player.copy()
+        for name, columns in RENDER_COLUMNS.items():
+            setattr(self, name, getattr(sim, name).snapshot(columns))
+
+    def time_left(self):
+        return self.seconds_left
+
+
+class SimulationThread:
+    """Steps a GameManager's simulation at the fixed tick rate on its own thread.
+
+    After each batch of steps the thread publishes a Snapshot by swapping
+    one reference under the lock; take() hands the render thread the newest
+    one, so neither side ever waits on the other for more than that swap.
+    Events raised by steps pile up until take() collects them, so none are
+    lost when fewer frames are drawn than steps are run. Requests (resets,
+    rewinds) go the other way and are carried out before the next step.
+
+    Only this thread touches the Simulation, the replay and playback once
+    start() has been called.
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.lock = threading.Lock()
+        self.latest = Snapshot(game.sim, time.perf_counter())
+        self.events = []
+        self.requests = []
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name='simulation', daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def request(self, action):
+        # Call action() on this thread before the next step; it may leave events in sim.events
+        with self.lock:
+            self.requests.append(action)
+
+    def take(self):
+        # Newest snapshot and every event since the last take()
+        with self.lock:
+            events = self.events
+            self.events = []
+            return self.latest, events
+
+    def alpha(self, snapshot):
+        # How far the display is past the snapshot's step, in steps (0 to 1)
+        return min(max((time.perf_counter() - snapshot.tick_time) * 1000 / TICK_MS, 0.0), 1.0)
+
+    def _run(self):
+        game = self.game
+        sim = game.sim
+        tick = TICK_MS / 1000
+        next_tick = time.perf_counter()
+        while self.running:
+            now = time.perf_counter()
+            if now < next_tick:
+                time.sleep(next_tick - now)
+                continue
+            events = []
+            steps = 0
+            while now >= next_tick:
+                if steps == MAX_CATCH_UP_STEPS:
+                    # Same as the single-threaded loop: drop the backlog after a stall
+                    next_tick = now
+                    break
+                with self.lock:
+                    requests = self.requests
+                    self.requests = []
+                for action in requests:
+                    sim.events = []
+                    action()
+                    events.extend(sim.events)
+                game.step_simulation()
+                events.extend(sim.events)
+                next_tick += tick
+                steps += 1
+            snapshot = Snapshot(sim, next_tick - tick)
+            with self.lock:
+                self.latest = snapshot
+                self.events.extend(events)
@@ -0,0 +1,362 @@
+import secrets
+import numpy as np
+from config.settings import (
+    WINDOW_WIDTH, WINDOW_HEIGHT, SIMULATION_RATE, BASE_CPU_SPEED,
+    INITIAL_SPAWN_RATE, DIFFICULTY_INCREASE_RATE, GAME_DURATION,
+    GAME_RUNNING, GAME_OVER, GAME_WIN, ROAD_SPEED,
+    WORLD_SPEED_MULTIPLIER, PLAYER_SPEED_MULTIPLIER, PLAYER_SPEED,
+    METEOR_SPAWN_RATE, POWER_UP_SPAWN_RATE, ACTION_SHOOT,
+    EVENT_LEVEL_UP, EVENT_GAME_OVER, EVENT_WIN,
+    DEATH_CPU_CAR, DEATH_METEOR, DEATH_METEOR_BLAST
+)
+from game.collision import swept_bounds, sweep_pairs, sweep_against_box
+from game.spatial_hash import SpatialHash, circle_hits_box
+from game.profiler import NULL_PROFILER
+from models.player import Player
+from models.bullet import Bullet
+from models.cpu_car import CPUCar
+from models.explosion import Explosion
+from models.blue_explosion import BlueExplosion
+from models.power_up import PowerUp
+from models.meteor import Meteor
+
+# Length of one fixed simulation step in milliseconds
+TICK_MS = 1000 / SIMULATION_RATE
+
+# Kinds of hit handled by Simulation.resolve_collisions
+HIT_BULLET_CAR = 0
+HIT_BULLET_METEOR = 1
+HIT_CAR_PLAYER = 2
+HIT_METEOR_PLAYER = 3
+
+# Difficulty settings a Simulation can override per game, and the attribute each one sets
+TUNABLE_SETTINGS = {
+    'WORLD_SPEED_MULTIPLIER': 'world_speed_multiplier',
+    'INITIAL_SPAWN_RATE': 'spawn_rate',
+    'METEOR_SPAWN_RATE': 'meteor_spawn_rate',
+    'POWER_UP_SPAWN_RATE': 'power_up_spawn_rate',
+}
+
+
+class Simulation:
+    """Headless game core: owns all game state and advances it one step at a time.
+
+    Nothing here opens a window, plays audio or reads the keyboard. Time only
+    moves when step() is called, so callers decide whether a step is a real
+    frame or one of thousands of fast-forwarded ones.
+    """
+
+    def __init__(self, seed=None, tuning=None):
+        # tuning overrides difficulty settings by name, e.g. {'METEOR_SPAWN_RATE': 2000}
+        tuning = dict(tuning or {})
+        unknown = set(tuning) - set(TUNABLE_SETTINGS)
+        if unknown:
+            raise ValueError(f"can't tune {', '.join(sorted(unknown))}")
+        self.tuning = tuning
+        # Front-ends can swap in a FrameProfiler to time the sections of step()
+        self.profiler = NULL_PROFILER
+        self.reset(seed)
+
+    def reset(self, seed=None):
+        # Every random draw in a game comes from this generator, so a seed plus
+        # the inputs of each step reproduce the game exactly
+        if seed is None:
+            seed = secrets.randbits(64)
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        # Simulation clock in milliseconds, replaces pygame.time.get_ticks()
+        self.time = 0
+        self.player = Player(WINDOW_WIDTH)
+        self.cpu_cars = CPUCar.create_store()
+        self.explosions = Explosion.create_store()
+        self.bullets = Bullet.create_store()
+        self.power_ups = PowerUp.create_store()
+        self.meteors = Meteor.create_store()
+        self.meteor_trails = Meteor.create_trail_store()
+        self.car_hash = SpatialHash()
+        self.bullet_hash = SpatialHash()
+        self.meteor_hash = SpatialHash()
+        self.last_spawn_time = self.time
+        self.last_power_up_spawn = self.time
+        self.last_meteor_spawn = self.time
+        self.last_difficulty_increase = self.time
+        self.game_state = GAME_RUNNING
+        self.start_time = self.time
+        self.current_score = 0
+        self.road_offset = 0
+        self.road_speed = 0  # How far the road moved in the last step
+        self.current_level = 1
+        self.level_up_time = 0
+        self.show_level_up = False
+        self.events = []
+        self.death_cause = None
+        
+        # Difficulty knobs: settings values unless this game's tuning overrides them
+        self.world_speed_multiplier = WORLD_SPEED_MULTIPLIER
+        self.spawn_rate = INITIAL_SPAWN_RATE
+        self.meteor_spawn_rate = METEOR_SPAWN_RATE
+        self.power_up_spawn_rate = POWER_UP_SPAWN_RATE
+        for name, value in self.tuning.items():
+            setattr(self, TUNABLE_SETTINGS[name], value)
+
+    def end_game(self, cause):
+        if self.game_state == GAME_OVER:
+            return
+        self.game_state = GAME_OVER
+        self.death_cause = cause
+        self.events.append(EVENT_GAME_OVER)
+
+    def step(self, actions, dt_ms=TICK_MS):
+        """Advance the game by one step of dt_ms milliseconds.
+
+        actions is a bitmask of ACTION_* flags. Events raised during the step
+        (level up, game over, win) are left in self.events for the front-end.
+
+        Only the clock (spawn timers, power-ups, level length) honours dt_ms;
+        movement is per step, so pass TICK_MS to play at the speed the game
+        was tuned for.
+        """
+        self.events = []
+        self.road_speed = 0
+        if self.game_state != GAME_RUNNING:
+            return
+
+        self.time += dt_ms
+        current_time = self.time
+        profiler = self.profiler
+
+        # Update player and power-up status
+        if actions & ACTION_SHOOT:
+            self.player.shoot(self.bullets)
+        self.player.move(actions, WINDOW_WIDTH)
+        self.player.update_power_up(current_time)
+        player = self.player
+        profiler.lap('player')
+        player_box = (player.x, player.y, player.x + player.width, player.y + player.height)
+        
+        # Only handle power-ups after level 3
+        bullets = self.bullets
+        cars = self.cpu_cars
+        meteors = self.meteors
+        power_ups = self.power_ups
+        if self.current_level >= 3:
+            # Spawn power-ups if none active
+            if not player.has_power_up and current_time - self.last_power_up_spawn >= self.power_up_spawn_rate:
+                PowerUp.spawn(power_ups, self.rng)
+                self.last_power_up_spawn = current_time
+            
+            # Update power-ups
+            if power_ups.count:
+                power_ups.integrate()
+                power_ups.kill(PowerUp.off_screen(power_ups, WINDOW_HEIGHT))
+                collected = power_ups.overlaps(*player_box)
+                if collected.any():
+                    player.has_power_up = True
+                    player.power_up_time = current_time
+                    power_ups.kill(collected)
+                power_ups.compact()
+        else:
+            # Clear any existing power-ups if below level 3
+            power_ups.clear()
+            bullets.clear()
+            player.has_power_up = False
+        profiler.lap('power_ups')
+        
+        elapsed_time = current_time - self.start_time
+        
+        # Check for level completion
+        if elapsed_time >= GAME_DURATION:
+            self.current_level += 1
+            self.start_time = current_time
+            self.show_level_up = True
+            self.level_up_time = current_time
+            self.events.append(EVENT_LEVEL_UP)
+            
+            # Clear existing CPU cars for the next level
+            cars.clear()
+            # Update player speed for new level
+            player.speed = PLAYER_SPEED * (PLAYER_SPEED_MULTIPLIER ** (self.current_level - 1))
+            return
+        
+        # Calculate level-based speeds
+        world_multiplier = self.world_speed_multiplier ** (self.current_level - 1)
+        current_road_speed = ROAD_SPEED * world_multiplier
+        current_cpu_speed = BASE_CPU_SPEED * world_multiplier
+        
+        # Spawn new CPU cars
+        if current_time - self.last_spawn_time >= self.spawn_rate:
+            speed = current_cpu_speed + (elapsed_time // DIFFICULTY_INCREASE_RATE) * 0.5
+            CPUCar.spawn(cars, self.rng, WINDOW_WIDTH, speed)
+            self.last_spawn_time = current_time
+        
+        # Spawn meteors after level 5
+        if self.current_level >= 5:
+            if current_time - self.last_meteor_spawn >= self.meteor_spawn_rate:
+                Meteor.spawn(meteors, self.rng)
+                self.last_meteor_spawn = current_time
+        profiler.lap('spawning')
+        
+        # Move everything first, then resolve the step's collisions along each
+        # entity's path so fast cars can't tunnel through bullets or the player
+        bullets.integrate()
+        profiler.lap('bullets')
+        cars.integrate()
+        profiler.lap('cars')
+        if meteors.count:
+            Meteor.move(meteors, self.meteor_trails, self.rng, current_time)
+        profiler.lap('meteors')
+        self.car_hash.build(cars, swept=True)
+        self.bullet_hash.build(bullets, swept=True)
+        self.meteor_hash.build(meteors, swept=True)
+        self.resolve_collisions()
+        
+        # Check for road explosions
+        if meteors.count:
+            self.explode_meteors(current_time)
+        profiler.lap('collisions')
+        
+        # Remove everything that left the screen; every car that gets past scores a point
+        bullets.kill(Bullet.off_screen(bullets))
+        passed = cars.view('alive') & CPUCar.off_screen(cars)
+        self.current_score += int(np.count_nonzero(passed))
+        cars.kill(passed)
+        meteors.kill(Meteor.off_screen(meteors, WINDOW_HEIGHT))
+        profiler.lap('cleanup')
+        
+        # Update explosions
+        Explosion.update(self.explosions)
+        profiler.lap('explosions')
+        
+        # Drop everything that died this step in one pass per kind
+        bullets.compact()
+        cars.compact()
+        Meteor.compact(meteors, self.meteor_trails)
+        self.explosions.compact()
+        
+        # Update road offset with fixed speed
+        self.road_offset = (self.road_offset + current_road_speed) % 90
+        self.road_speed = current_road_speed
+        profiler.lap('cleanup')
+        
+        # Update level up display
+        if self.show_level_up and current_time - self.level_up_time >= 2000:  # Show for 2 seconds
+            self.show_level_up = False
+        
+        # Check win condition
+        if elapsed_time >= GAME_DURATION:
+            self.game_state = GAME_WIN
+            self.events.append(EVENT_WIN)
+    
+    def resolve_collisions(self):
+        """Apply this step's hits in time-of-impact order, so the first hit wins.
+        
+        Every moving store is already at its end-of-step position and the
+        spatial hashes hold the area each row swept through. Candidates from
+        the broadphase get an exact swept test; the player holds still at its
+        new position for the step.
+        """
+        bullets = self.bullets
+        cars = self.cpu_cars
+        meteors = self.meteors
+        player = self.player
+        player_box = (player.x, player.y, player.x + player.width, player.y + player.height)
+        kinds = []
+        
+        # Bullets against cars
+        if bullets.count and cars.count:
+            live = np.flatnonzero(bullets.alive[:bullets.count])
+            query, car_rows = self.car_hash.candidate_pairs(*swept_bounds(bullets, live))
+            bullet_rows = live[query]
+            kinds.append((HIT_BULLET_CAR, bullet_rows, car_rows, sweep_pairs(bullets, bullet_rows, cars, car_rows)))
+        
+        # Meteors against bullets
+        if bullets.count and meteors.count:
+            live = np.flatnonzero(meteors.alive[:meteors.count])
+            query, bullet_rows = self.bullet_hash.candidate_pairs(*swept_bounds(meteors, live))
+            meteor_rows = live[query]
+            kinds.append((HIT_BULLET_METEOR, bullet_rows, meteor_rows, sweep_pairs(bullets, bullet_rows, meteors, meteor_rows)))
+        
+        # Cars and meteors against the player
+        for kind, store, spatial_hash in ((HIT_CAR_PLAYER, cars, self.car_hash), (HIT_METEOR_PLAYER, meteors, self.meteor_hash)):
+            if store.count:
+                _, rows = spatial_hash.candidate_pairs([player_box[0]], [player_box[1]], [player_box[2]], [player_box[3]])
+                toi = sweep_against_box(store, rows, player.x, player.y, player.width, player.height)
+                kinds.append((kind, rows, rows, toi))
+        
+        if not kinds:
+            return
+        kind = np.concatenate([np.full(len(toi), k) for k, _, _, toi in kinds])
+        first = np.concatenate([a for _, a, _, _ in kinds])
+        second = np.concatenate([b for _, _, b, _ in kinds])
+        toi = np.concatenate([t for _, _, _, t in kinds])
+        hit = np.flatnonzero(np.isfinite(toi))
+        order = hit[np.argsort(toi[hit], kind='stable')]
+        
+        for i in order:
+            a = first[i]
+            b = second[i]
+            t = toi[i]
+            if kind[i] == HIT_BULLET_CAR:
+                if not bullets.alive[a] or not cars.alive[b]:
+                    continue
+                # Explode where the car was at the moment of impact, sized to the car
+                w = cars.w[b]
+                h = cars.h[b]
+                x = cars.x[b] - cars.vx[b] * (1 - t)
+                y = cars.y[b] - cars.vy[b] * (1 - t)
+                Explosion.spawn(self.explosions, x + w // 2, y + h // 2, max(w, h))
+                cars.kill(b)
+                bullets.kill(a)
+                self.current_score += 2  # More points for shooting a car
+            elif kind[i] == HIT_BULLET_METEOR:
+                if not bullets.alive[a] or not meteors.alive[b]:
+                    continue
+                x = meteors.x[b] - meteors.vx[b] * (1 - t) + Meteor.size
+                y = meteors.y[b] - meteors.vy[b] * (1 - t) + Meteor.size
+                BlueExplosion.spawn(self.explosions, x, y, 60)
+                meteors.kill(b)
+                bullets.kill(a)
+                self.current_score += 100  # More points for shooting meteors
+            elif kind[i] == HIT_CAR_PLAYER:
+                if not cars.alive[b]:
+                    continue
+                # Use car size for explosion
+                Explosion.spawn(
+                    self.explosions,
+                    player.x + player.width // 2,
+                    player.y + player.height // 2,
+                    max(cars.w[b], cars.h[b])
+                )
+                self.end_game(DEATH_CPU_CAR)
+                return
+            else:
+                if not meteors.alive[b]:
+                    continue
+                x = meteors.x[b] - meteors.vx[b] * (1 - t) + Meteor.size
+                y = meteors.y[b] - meteors.vy[b] * (1 - t) + Meteor.size
+                BlueExplosion.spawn(self.explosions, x, y, 70)  # Bigger explosion
+                meteors.kill(b)
+                self.end_game(DEATH_METEOR)
+                return
+    
+    def explode_meteors(self, current_time):
+        meteors = self.meteors
+        cars = self.cpu_cars
+        player = self.player
+        cx, cy = Meteor.centers(meteors)
+        for meteor in Meteor.ready_to_explode(meteors, current_time):
+            x = cx[meteor]
+            y = cy[meteor]
+            BlueExplosion.spawn(self.explosions, x, y, 80)  # Even bigger explosion
+            meteors.kill(meteor)
+            # Check if any cars or the player are caught in the blast
+            if cars.count:
+                caught = self.car_hash.query_radius(x, y, 80)
+                self.current_score += 30 * len(caught)
+                cars.kill(caught)
+            player_rect = (player.x, player.y, player.x + player.width, player.y + player.height)
+            if circle_hits_box(x, y, 80, *player_rect):
+                self.end_game(DEATH_METEOR_BLAST)
+    
+    def time_left(self):
+        return int(max(0, (GAME_DURATION - (self.time - self.start_time)) // 1000))
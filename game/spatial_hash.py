@@ -0,0 +1,140 @@
+import numpy as np
+from game.collision import swept_bounds
+from config.settings import SPATIAL_HASH_CELL_SIZE, SPATIAL_HASH_MIN_ENTITIES
+
+# Cell coordinates are offset and packed into one int64 key per cell
+_CELL_BIAS = 1 << 20
+_CELL_STRIDE = 1 << 21
+
+
+def _cell_keys(left, top, right, bottom, cell_size):
+    # Expand each box into the keys of every cell it touches.
+    # Returns (owner, key) where owner indexes into the input arrays.
+    x0 = np.floor_divide(left, cell_size).astype(np.int64)
+    y0 = np.floor_divide(top, cell_size).astype(np.int64)
+    nx = np.floor_divide(right, cell_size).astype(np.int64) - x0 + 1
+    ny = np.floor_divide(bottom, cell_size).astype(np.int64) - y0 + 1
+    per_box = nx * ny
+    owner = np.repeat(np.arange(len(per_box)), per_box)
+    starts = np.cumsum(per_box) - per_box
+    local = np.arange(len(owner)) - starts[owner]
+    cell_x = x0[owner] + local % nx[owner]
+    cell_y = y0[owner] + local // nx[owner]
+    return owner, (cell_x + _CELL_BIAS) * _CELL_STRIDE + (cell_y + _CELL_BIAS)
+
+
+def circle_hits_box(cx, cy, radius, left, top, right, bottom):
+    # Exact circle-vs-box test; works element-wise on arrays too
+    nearest_x = np.clip(cx, left, right)
+    nearest_y = np.clip(cy, top, bottom)
+    return (nearest_x - cx) ** 2 + (nearest_y - cy) ** 2 <= radius * radius
+
+
+class SpatialHash:
+    """Uniform-grid broadphase over the live rows of one EntityStore.
+
+    build() hashes every box into the cells it covers and sorts the cell
+    keys, so a query only looks at rows that share a cell with it. Queries
+    return row indices sorted ascending, after an exact test against the
+    store's current boxes; rows killed since the build are skipped.
+
+    Stores with fewer than min_entities live rows skip the hashing and are
+    scanned linearly, which is cheaper at that size.
+
+    A swept build hashes the area each row covered while moving during the
+    last step, for continuous collision queries through candidate_pairs().
+    """
+
+    def __init__(self, cell_size=SPATIAL_HASH_CELL_SIZE, min_entities=SPATIAL_HASH_MIN_ENTITIES):
+        self.cell_size = cell_size
+        self.min_entities = min_entities
+        self.store = None
+        self.live = np.empty(0, dtype=np.int64)
+        self.keys = None
+        self.rows = None
+
+    def build(self, store, swept=False):
+        self.store = store
+        n = store.count
+        live = np.flatnonzero(store.alive[:n])
+        self.live = live
+        if len(live) < self.min_entities:
+            self.keys = None
+            return
+        if swept:
+            owner, keys = _cell_keys(*swept_bounds(store, live), self.cell_size)
+        else:
+            x = store.x[live]
+            y = store.y[live]
+            owner, keys = _cell_keys(x, y, x + store.w[live], y + store.h[live], self.cell_size)
+        order = np.argsort(keys, kind='stable')
+        self.keys = keys[order]
+        self.rows = live[owner[order]]
+
+    def _candidates(self, left, top, right, bottom):
+        # (query, row) pairs sharing at least one cell, without duplicates
+        owner, keys = _cell_keys(left, top, right, bottom, self.cell_size)
+        lo = np.searchsorted(self.keys, keys, side='left')
+        hi = np.searchsorted(self.keys, keys, side='right')
+        counts = hi - lo
+        pair_owner = np.repeat(owner, counts)
+        starts = np.cumsum(counts) - counts
+        slots = np.arange(len(pair_owner)) - np.repeat(starts, counts) + np.repeat(lo, counts)
+        pair_rows = self.rows[slots]
+        # A box spanning several cells can meet the same row more than once
+        pairs = np.unique(pair_owner * (self.store.capacity + 1) + pair_rows)
+        return pairs // (self.store.capacity + 1), pairs % (self.store.capacity + 1)
+
+    def candidate_pairs(self, left, top, right, bottom):
+        """(query index, row) pairs of live rows sharing a cell with each query box.
+
+        No exact test is done, so callers run their own narrowphase. Pairs
+        are sorted by query index, then by row.
+        """
+        left = np.asarray(left, dtype=np.float64)
+        top = np.asarray(top, dtype=np.float64)
+        right = np.asarray(right, dtype=np.float64)
+        bottom = np.asarray(bottom, dtype=np.float64)
+        if not len(self.live) or not len(left):
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty
+        if self.keys is None:
+            # Linear scan: every query against every live row
+            query = np.repeat(np.arange(len(left)), len(self.live))
+            rows = np.tile(self.live, len(left))
+        else:
+            query, rows = self._candidates(left, top, right, bottom)
+        alive = self.store.alive[rows]
+        return query[alive], rows[alive]
+
+    def query_pairs(self, left, top, right, bottom):
+        """Overlapping (query index, row) pairs for a batch of query boxes.
+
+        Pairs are sorted by query index, then by row.
+        """
+        left = np.asarray(left, dtype=np.float64)
+        top = np.asarray(top, dtype=np.float64)
+        right = np.asarray(right, dtype=np.float64)
+        bottom = np.asarray(bottom, dtype=np.float64)
+        query, rows = self.candidate_pairs(left, top, right, bottom)
+        store = self.store
+        x = store.x[rows]
+        y = store.y[rows]
+        hit = (
+            (x < right[query]) & (left[query] < x + store.w[rows])
+            & (y < bottom[query]) & (top[query] < y + store.h[rows])
+        )
+        return query[hit], rows[hit]
+
+    def query_aabb(self, left, top, right, bottom):
+        # Rows whose box overlaps the given box
+        _, rows = self.query_pairs([left], [top], [right], [bottom])
+        return rows
+
+    def query_radius(self, cx, cy, radius):
+        # Rows whose box intersects the circle of the given radius
+        rows = self.query_aabb(cx - radius, cy - radius, cx + radius, cy + radius)
+        store = self.store
+        x = store.x[rows]
+        y = store.y[rows]
+        return rows[circle_hits_box(cx, cy, radius, x, y, x + store.w[rows], y + store.h[rows])]
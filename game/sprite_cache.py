@@ -0,0 +1,156 @@
+from collections import OrderedDict
+import numpy as np
+import pygame
+from models.cpu_car import CPUCar
+from models.bullet import Bullet
+from models.power_up import PowerUp
+from models.meteor import Meteor
+from models.explosion import Explosion
+from config.settings import PARTICLE_LIFE_BUCKETS, EXPLOSION_CACHE_BYTES
+
+# Transparent border around every sprite so strokes that poke out of the
+# entity's box (gun barrels, circle edges) aren't clipped
+SPRITE_PADDING = 4
+
+PLAYER = 'player'
+CPU_CAR = 'cpu_car'
+BULLET = 'bullet'
+POWER_UP = 'power_up'
+METEOR = 'meteor'
+PARTICLE = 'particle'
+
+# Explosion frames are opaque circles, so they're colorkeyed RLE surfaces
+# rather than per-pixel alpha ones, which blit several times faster. No
+# explosion palette contains this color.
+EXPLOSION_COLORKEY = (255, 0, 255)
+
+
+class SpriteCache:
+    """Pre-rendered entity appearances, drawn once with the model's draw code.
+
+    Sprites are keyed by (kind, width, height, state) and returned with the
+    offset from the entity's top-left corner to the sprite's top-left, ready
+    to be queued for a single Surface.blits() call. Sizes are asked for in
+    world pixels; sprites and offsets come back scale times that, in render
+    target pixels.
+    """
+
+    def __init__(self, explosion_bytes=EXPLOSION_CACHE_BYTES, scale=1.0):
+        self.scale = scale
+        self.sprites = {}
+        # Explosion animations by (kind, target size), least recently used first;
+        # each is a list of per-frame sprites filled in as frames are first shown
+        self.explosions = OrderedDict()
+        self.explosion_bytes = 0
+        self.explosion_cap = explosion_bytes
+
+    def get(self, kind, width, height, state=None, player=None):
+        key = (kind, width, height, state)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            sprite = self.sprites[key] = self._render(kind, width, height, state, player)
+        return sprite
+
+    def particle(self, size, life_bucket):
+        # Fire trail particle of a whole-pixel size, in render target pixels, at a quantized life
+        key = (PARTICLE, size, life_bucket)
+        sprite = self.sprites.get(key)
+        if sprite is None:
+            surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            Meteor.draw_particle(surface, size, life_bucket / PARTICLE_LIFE_BUCKETS)
+            if pygame.display.get_surface() is not None:
+                surface = surface.convert_alpha()
+            sprite = self.sprites[key] = surface
+        return sprite
+
+    def explosion(self, kind, max_radius, frame):
+        # Sprite for one frame of an explosion animation, offset from the explosion's center
+        key = (kind, max_radius)
+        frames = self.explosions.get(key)
+        if frames is None:
+            frames = self.explosions[key] = [None] * kind.duration_frames
+        else:
+            self.explosions.move_to_end(key)
+        sprite = frames[frame]
+        if sprite is None:
+            sprite = frames[frame] = self._render_explosion(kind, max_radius, frame)
+            surface = sprite[0]
+            self.explosion_bytes += surface.get_width() * surface.get_height() * surface.get_bytesize()
+            self._evict_explosions()
+        return sprite
+
+    def _render_explosion(self, kind, max_radius, frame):
+        radius = Explosion.radius(frame, max_radius) * self.scale
+        r = int(radius) + 1
+        surface = pygame.Surface((r * 2 + 1, r * 2 + 1))
+        surface.fill(EXPLOSION_COLORKEY)
+        kind.draw(surface, r, r, radius, kind.palettes()[frame])
+        surface.set_colorkey(EXPLOSION_COLORKEY, pygame.RLEACCEL)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        return surface, (-r, -r)
+
+    def _evict_explosions(self):
+        # Drop whole animations, oldest first, but never the one just used
+        while self.explosion_bytes > self.explosion_cap and len(self.explosions) > 1:
+            _, frames = self.explosions.popitem(last=False)
+            for sprite in frames:
+                if sprite is not None:
+                    surface = sprite[0]
+                    self.explosion_bytes -= surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def _render(self, kind, width, height, state, player):
+        pad = SPRITE_PADDING
+        surface = pygame.Surface((int(width) + pad * 2, int(height) + pad * 2), pygame.SRCALPHA)
+        if kind == PLAYER:
+            player.draw_car(surface, pad, pad, state)
+        elif kind == CPU_CAR:
+            CPUCar.draw(surface, pad, pad)
+        elif kind == BULLET:
+            Bullet.draw(surface, pad, pad)
+        elif kind == POWER_UP:
+            PowerUp.draw(surface, pad, pad)
+        elif kind == METEOR:
+            Meteor.draw(surface, pad, pad)
+        offset = -pad
+        if self.scale != 1.0:
+            # The models draw at world size; shrinking or growing the result keeps their look
+            width, height = surface.get_size()
+            surface = pygame.transform.smoothscale(surface, (round(width * self.scale), round(height * self.scale)))
+            offset = -pad * self.scale
+        # convert_alpha needs a display mode; headless callers keep the plain surface
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert_alpha()
+        return surface, (offset, offset)
+
+    def clear(self):
+        self.sprites.clear()
+        self.explosions.clear()
+        self.explosion_bytes = 0
+
+
+def queue_particles(batch, sprites, particles):
+    # Append a blit for every live particle, centered on its position
+    sizes, lives = particles.buckets()
+    n = particles.count
+    scale = sprites.scale
+    if scale != 1.0:
+        sizes = np.maximum(np.rint(sizes * scale), 1).astype(sizes.dtype)
+    half = sizes // 2
+    xs = (particles.x[:n] * scale - half).tolist()
+    ys = (particles.y[:n] * scale - half).tolist()
+    particle = sprites.particle
+    batch.extend(
+        (particle(size, life), (x, y))
+        for size, life, x, y in zip(sizes.tolist(), lives.tolist(), xs, ys)
+    )
+
+
+def queue_store(batch, sprite, store, lag=0.0, scale=1.0):
+    # Append a blit for every live row of a store that shares one sprite,
+    # drawn lag of a step behind its current position
+    surface, (ox, oy) = sprite
+    n = store.count
+    xs = ((store.x[:n] - store.vx[:n] * lag) * scale + ox).tolist()
+    ys = ((store.y[:n] - store.vy[:n] * lag) * scale + oy).tolist()
+    batch.extend(zip([surface] * n, zip(xs, ys)))
@@ -3,10 +3,15 @@ from models.explosion import Explosion
 from config.settings import METEOR_BLUE
 
 class BlueExplosion(Explosion):
-    def draw(self, screen):
-        # Calculate progress (0 to 1)
-        progress = (self.radius - self.min_radius) / (self.max_radius - self.min_radius)
-        
+    # Meteor explosions share the Explosion store, flagged by its blue column
+    _palettes = None
+    
+    @staticmethod
+    def spawn(store, x, y, target_size):
+        return Explosion.spawn(store, x, y, target_size, blue=True)
+    
+    @staticmethod
+    def palette(progress):
         if progress < 0.3:  # First phase: white to light blue
             p = progress * 3.33
             r = 255 - (p * 75)  # 255 to 180
@@ -23,11 +28,17 @@ class BlueExplosion(Explosion):
             g = 100 - (p * 70)  # 100 to 30
             b = 255 - (p * 55)  # 255 to 200
         
-        # Draw main explosion circle
+        # Main explosion circle and its inner glow
         color = (int(r), int(g), int(b))
-        pygame.draw.circle(screen, color, (int(self.x), int(self.y)), int(self.radius))
+        inner_color = (min(r + 50, 255), min(g + 50, 255), min(b + 50, 255))
+        return color, inner_color
+    
+    @staticmethod
+    def draw(screen, x, y, radius, palette):
+        color, inner_color = palette
+        # Draw main explosion circle
+        pygame.draw.circle(screen, color, (int(x), int(y)), int(radius))
         
         # Draw inner glow
-        inner_radius = max(self.radius * 0.6, self.min_radius)
-        inner_color = (min(r + 50, 255), min(g + 50, 255), min(b + 50, 255))
-        pygame.draw.circle(screen, inner_color, (int(self.x), int(self.y)), int(inner_radius))
+        inner_radius = max(radius * 0.6, Explosion.min_radius)
+        pygame.draw.circle(screen, inner_color, (int(x), int(y)), int(inner_radius))
@@ -1,22 +1,28 @@
 import pygame
+from game.entity_store import EntityStore
 
 class Bullet:
-    def __init__(self, x, y):
-        self.radius = 5
-        self.x = x
-        self.y = y
-        self.speed = 7
-        self.color = (255, 0, 0)  # Red color
-    
-    def move(self):
-        self.y -= self.speed
-    
-    def draw(self, screen):
-        pygame.draw.circle(screen, self.color, (self.x, self.y), self.radius)
-    
-    def get_rect(self):
-        return pygame.Rect(self.x - self.radius, self.y - self.radius, 
-                         self.radius * 2, self.radius * 2)
-    
-    def is_off_screen(self):
-        return self.y < -self.radius
+    # Bullets live as rows of an EntityStore; x, y is the top-left of the bounding box
+    radius = 5
+    speed = 7
+    color = (255, 0, 0)  # Red color
+
+    @staticmethod
+    def create_store():
+        return EntityStore()
+
+    @staticmethod
+    def spawn(store, x, y):
+        # x, y is the bullet's center
+        r = Bullet.radius
+        return store.spawn(x - r, y - r, 0, -Bullet.speed, r * 2, r * 2)
+
+    @staticmethod
+    def off_screen(store):
+        # Bottom of the bounding box above the window
+        return store.view('y') < -Bullet.radius * 2
+
+    @staticmethod
+    def draw(screen, x, y):
+        r = Bullet.radius
+        pygame.draw.circle(screen, Bullet.color, (x + r, y + r), r)
@@ -1,44 +1,48 @@
-import random
 import pygame
 from config.settings import WINDOW_HEIGHT, ROAD_WIDTH, CAR_WIDTH, CAR_HEIGHT, RED, DARK_RED, WINDOW_BLUE
+from game.entity_store import EntityStore
 
 class CPUCar:
-    def __init__(self, window_width, speed):
-        self.width = CAR_WIDTH
-        self.height = CAR_HEIGHT
+    # CPU cars live as rows of an EntityStore; this class holds their spawn and draw logic
+    width = CAR_WIDTH
+    height = CAR_HEIGHT
+
+    @staticmethod
+    def create_store():
+        return EntityStore()
+
+    @staticmethod
+    def spawn(store, rng, window_width, speed):
         road_left = (window_width - ROAD_WIDTH) // 2
-        road_right = road_left + ROAD_WIDTH - self.width
-        self.x = random.randint(road_left, road_right)
-        self.y = -self.height
-        self.speed = speed
-    
-    def move(self):
-        self.y += self.speed
-    
-    def is_off_screen(self):
-        return self.y > WINDOW_HEIGHT
-    
-    def draw(self, screen):
+        road_right = road_left + ROAD_WIDTH - CPUCar.width
+        x = int(rng.integers(road_left, road_right, endpoint=True))
+        return store.spawn(x, -CPUCar.height, 0, speed, CPUCar.width, CPUCar.height)
+
+    @staticmethod
+    def off_screen(store):
+        return store.view('y') > WINDOW_HEIGHT
+
+    @staticmethod
+    def draw(screen, x, y):
+        width = CPUCar.width
+        height = CPUCar.height
         # Draw car body
-        pygame.draw.rect(screen, RED, (self.x, self.y, self.width, self.height))
+        pygame.draw.rect(screen, RED, (x, y, width, height))
         
         # Draw windows
-        window_width = self.width * 0.7
-        window_height = self.height * 0.2
-        window_x = self.x + (self.width - window_width) / 2
-        window_y = self.y + self.height * 0.2
+        window_width = width * 0.7
+        window_height = height * 0.2
+        window_x = x + (width - window_width) / 2
+        window_y = y + height * 0.2
         pygame.draw.rect(screen, WINDOW_BLUE, (window_x, window_y, window_width, window_height))
         
         # Draw wheels
         wheel_radius = 5
         wheel_positions = [
-            (self.x + wheel_radius + 2, self.y + wheel_radius + 2),
-            (self.x + self.width - wheel_radius - 2, self.y + wheel_radius + 2),
-            (self.x + wheel_radius + 2, self.y + self.height - wheel_radius - 2),
-            (self.x + self.width - wheel_radius - 2, self.y + self.height - wheel_radius - 2)
+            (x + wheel_radius + 2, y + wheel_radius + 2),
+            (x + width - wheel_radius - 2, y + wheel_radius + 2),
+            (x + wheel_radius + 2, y + height - wheel_radius - 2),
+            (x + width - wheel_radius - 2, y + height - wheel_radius - 2)
         ]
         for pos in wheel_positions:
             pygame.draw.circle(screen, DARK_RED, pos, wheel_radius)
-    
-    def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
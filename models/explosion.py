@@ -1,29 +1,42 @@
+import numpy as np
 import pygame
+from game.entity_store import EntityStore
 
 class Explosion:
-    def __init__(self, x, y, target_size):
-        self.x = x
-        self.y = y
-        self.min_radius = 5
-        self.max_radius = target_size
-        self.radius = self.min_radius
-        self.duration_frames = 60  # 60 frames = 2 seconds at 30 FPS
-        self.current_frame = 0
-        
-    def update(self):
-        if self.current_frame >= self.duration_frames:
-            return False
-        
-        # Calculate progress (0 to 1)
-        progress = self.current_frame / self.duration_frames
-        self.radius = self.min_radius + (self.max_radius - self.min_radius) * progress
-        self.current_frame += 1
-        return True
+    # Explosions live as rows of an EntityStore with a zero-size box, so x, y is the center.
+    # An explosion's look depends only on its frame and target size, so it's drawn from
+    # pre-rendered frames (see SpriteCache.explosion) rather than per explosion.
+    min_radius = 5
+    duration_frames = 60  # 60 frames = 2 seconds at 30 FPS
+    _palettes = None
+    
+    @staticmethod
+    def create_store():
+        return EntityStore(frame=np.int32, max_radius=np.float64, blue=np.bool_)
+    
+    @staticmethod
+    def spawn(store, x, y, target_size, blue=False):
+        return store.spawn(x, y, max_radius=target_size, blue=blue)
+    
+    @staticmethod
+    def update(store):
+        # Advance every explosion one frame and kill the finished ones
+        n = store.count
+        if not n:
+            return
+        frame = store.frame[:n]
+        store.kill(frame >= Explosion.duration_frames)
+        frame += 1
     
-    def draw(self, screen):
+    @staticmethod
+    def radius(frame, max_radius):
+        # Radius shown on an animation frame (0 .. duration_frames - 1): grows linearly to max_radius
+        progress = frame / Explosion.duration_frames
+        return Explosion.min_radius + (max_radius - Explosion.min_radius) * progress
+    
+    @staticmethod
+    def palette(progress):
         # Create gradient colors from yellow to orange to red
-        progress = (self.radius - self.min_radius) / (self.max_radius - self.min_radius)
-        
         if progress < 0.5:
             # Yellow to orange
             p = progress * 2
@@ -37,5 +50,15 @@ class Explosion:
             g = 90 - (p * 90)  # 90 to 0
             b = 0
         
-        color = (int(r), int(g), int(b))
-        pygame.draw.circle(screen, color, (int(self.x), int(self.y)), int(self.radius))
+        return ((int(r), int(g), int(b)),)
+    
+    @classmethod
+    def palettes(cls):
+        # Color lookup table: the palette of every animation frame, shared by all sizes
+        if cls.__dict__.get('_palettes') is None:
+            cls._palettes = [cls.palette(frame / cls.duration_frames) for frame in range(cls.duration_frames)]
+        return cls._palettes
+    
+    @staticmethod
+    def draw(screen, x, y, radius, palette):
+        pygame.draw.circle(screen, palette[0], (int(x), int(y)), int(radius))
@@ -1,117 +1,143 @@
+import numpy as np
 import pygame
-import random
-import math
 from config.settings import (
     WINDOW_WIDTH, METEOR_SIZE, BROWN, METEOR_MIN_SPEED,
     METEOR_MAX_SPEED, ROAD_WIDTH, WINDOW_HEIGHT
 )
+from game.entity_store import EntityStore
+from game.particles import ParticleSystem
 
 class Meteor:
-    def __init__(self):
-        self.size = METEOR_SIZE
+    # Meteors live as rows of an EntityStore; METEOR_SIZE is the radius, so the box is 2*size wide.
+    # Their fire trails live in a shared ParticleSystem.
+    size = METEOR_SIZE
+    
+    # Fire trail parameters
+    particles_per_frame = 3  # Create 3 particles per frame for even denser effect
+    max_trail_particles = 25  # Increased from 15
+    particle_fade = 0.05  # Even slower fade for longer trails
+    
+    @staticmethod
+    def create_store():
+        # Road contact explosion timing: contact_time is NaN until the meteor touches the road
+        return EntityStore(contact_time=np.float64, explosion_delay=np.float64, has_exploded=np.bool_)
+    
+    @staticmethod
+    def create_trail_store():
+        return ParticleSystem()
+    
+    @staticmethod
+    def spawn(store, rng):
+        size = Meteor.size
         road_left = (WINDOW_WIDTH - ROAD_WIDTH) // 2
         road_right = road_left + ROAD_WIDTH
         
         # Randomly choose left or right side of the road
-        self.from_left = random.choice([True, False])
+        from_left = bool(rng.integers(2))
         
-        if self.from_left:
-            self.x = road_left - self.size
-            self.dx = random.uniform(1, 2)  # Diagonal movement to the right
+        if from_left:
+            x = road_left - size
+            dx = rng.uniform(1, 2)  # Diagonal movement to the right
         else:
-            self.x = road_right + self.size
-            self.dx = random.uniform(-2, -1)  # Diagonal movement to the left
+            x = road_right + size
+            dx = rng.uniform(-2, -1)  # Diagonal movement to the left
             
-        self.y = -self.size
-        self.speed = random.uniform(METEOR_MIN_SPEED, METEOR_MAX_SPEED)
-        
-        # Fire trail parameters
-        self.trail_particles = []
-        self.max_trail_particles = 25  # Increased from 15
-        
-        # Road contact explosion timing
-        self.road_contact_time = None
-        self.explosion_delay = random.uniform(1000, 2000)  # 1-2 seconds in milliseconds
-        self.should_explode = False
-        self.has_exploded = False  # New flag to track explosion state
-        
-    def move(self):
-        self.x += self.dx
-        self.y += self.speed
-        
-        # Update fire trail
-        for _ in range(3):  # Create 3 particles per frame for even denser effect
-            spread_x = random.uniform(-15, 15)  # Increased spread
-            spread_y = random.uniform(0, 40)    # Increased trail length
-            self.trail_particles.append({
-                'x': self.x + spread_x,
-                'y': self.y - spread_y,
-                'size': random.uniform(15, 35),  # Increased particle size
-                'life': 1.0
-            })
-        
-        # Update and remove old particles
-        updated_particles = []
-        for particle in self.trail_particles:
-            particle['life'] -= 0.05  # Even slower fade for longer trails
-            if particle['life'] > 0:
-                updated_particles.append(particle)
+        speed = rng.uniform(METEOR_MIN_SPEED, METEOR_MAX_SPEED)
+        explosion_delay = rng.uniform(1000, 2000)  # 1-2 seconds in milliseconds
+        return store.spawn(
+            x - size, -size * 2, dx, speed, size * 2, size * 2,
+            contact_time=np.nan, explosion_delay=explosion_delay
+        )
+    
+    @staticmethod
+    def centers(store):
+        n = store.count
+        return store.x[:n] + Meteor.size, store.y[:n] + Meteor.size
+    
+    @staticmethod
+    def move(store, trail, rng, current_time):
+        store.integrate()
+        Meteor.update_trail(store, trail, rng)
         
-        self.trail_particles = updated_particles
-        if len(self.trail_particles) > self.max_trail_particles:
-            self.trail_particles = self.trail_particles[-self.max_trail_particles:]
-            
         # Check for road contact
+        cx, cy = Meteor.centers(store)
         road_left = (WINDOW_WIDTH - ROAD_WIDTH) // 2
         road_right = road_left + ROAD_WIDTH
-        if road_left <= self.x <= road_right and self.y >= WINDOW_HEIGHT - 100:  # Increased detection area
-            if not self.road_contact_time:
-                self.road_contact_time = pygame.time.get_ticks()
+        contact_time = store.view('contact_time')
+        touching = (road_left <= cx) & (cx <= road_right) & (cy >= WINDOW_HEIGHT - 100)  # Increased detection area
+        contact_time[touching & np.isnan(contact_time)] = current_time
     
-    def should_create_explosion(self):
-        if self.road_contact_time and not self.has_exploded:
-            current_time = pygame.time.get_ticks()
-            if current_time - self.road_contact_time >= self.explosion_delay:
-                self.has_exploded = True
-                return True
-        return False
+    @staticmethod
+    def update_trail(store, trail, rng):
+        # Purely cosmetic, so a network client can run it on its own copy of the meteors
+        cx, cy = Meteor.centers(store)
+        
+        # Update fire trail; randomness is drawn a whole batch at a time
+        count = store.count * Meteor.particles_per_frame
+        owners = np.repeat(store.id[:store.count], Meteor.particles_per_frame)
+        spread_x = rng.uniform(-15, 15, count)  # Increased spread
+        spread_y = rng.uniform(0, 40, count)    # Increased trail length
+        trail.emit(
+            np.repeat(cx, Meteor.particles_per_frame) + spread_x,
+            np.repeat(cy, Meteor.particles_per_frame) - spread_y,
+            rng.uniform(15, 35, count),  # Increased particle size
+            owners
+        )
+        
+        # Fade particles; only the newest max_trail_particles of each meteor
+        # survive, which with a fixed emission rate is a cap on particle age
+        ticks_kept = Meteor.max_trail_particles // Meteor.particles_per_frame
+        min_life = max(1.0 - Meteor.particle_fade * ticks_kept, 0) - Meteor.particle_fade / 2
+        trail.fade(Meteor.particle_fade, min_life)
     
-    def draw(self, screen):
-        # Draw fire trail with more vibrant colors
-        for particle in self.trail_particles:
-            alpha = int(255 * particle['life'])
-            # Create more vibrant fire colors with yellow core
-            life_factor = particle['life']
-            if life_factor > 0.7:  # Inner core (yellow-white)
-                color = (
-                    255,                                    # Red
-                    255,                                    # Green
-                    int(255 * (life_factor - 0.7) * 3.3),  # Blue (fade in)
-                    alpha
-                )
-            else:  # Outer flame (orange-red)
-                color = (
-                    255,                                    # Red
-                    int(200 * life_factor),                # Green
-                    0,                                      # Blue
-                    alpha
-                )
-            
-            surf = pygame.Surface((particle['size'], particle['size']), pygame.SRCALPHA)
-            pygame.draw.circle(surf, color, 
-                             (particle['size']//2, particle['size']//2), 
-                             particle['size']//2)
-            screen.blit(surf, (particle['x'] - particle['size']//2, 
-                             particle['y'] - particle['size']//2))
-            
-        # Draw meteor
-        pygame.draw.circle(screen, BROWN, (int(self.x), int(self.y)), self.size)
+    @staticmethod
+    def ready_to_explode(store, current_time):
+        # Rows whose road-contact delay has elapsed; each meteor explodes only once
+        contact_time = store.view('contact_time')
+        ready = (
+            store.view('alive') & ~store.view('has_exploded') & ~np.isnan(contact_time)
+            & (current_time - contact_time >= store.view('explosion_delay'))
+        )
+        store.has_exploded[:store.count][ready] = True
+        return np.flatnonzero(ready)
+    
+    @staticmethod
+    def off_screen(store, height):
+        size = Meteor.size
+        cx, cy = Meteor.centers(store)
+        return (cy > height + size * 2) | (cx < -size * 2) | (cx > WINDOW_WIDTH + size * 2)
     
-    def get_rect(self):
-        return pygame.Rect(self.x - self.size, self.y - self.size, 
-                         self.size * 2, self.size * 2)
+    @staticmethod
+    def compact(store, trail):
+        # A meteor's trail disappears with it
+        n = store.count
+        trail.kill_owners(store.id[:n][~store.alive[:n]])
+        store.compact()
+        trail.compact()
     
-    def is_off_screen(self, height):
-        return (self.y > height + self.size * 2 or 
-                self.x < -self.size * 2 or 
-                self.x > WINDOW_WIDTH + self.size * 2)
+    @staticmethod
+    def draw_particle(surface, size, life_factor):
+        # Draw one fire trail particle filling a size x size surface
+        alpha = int(255 * life_factor)
+        # Create more vibrant fire colors with yellow core
+        if life_factor > 0.7:  # Inner core (yellow-white)
+            color = (
+                255,                                    # Red
+                255,                                    # Green
+                int(255 * (life_factor - 0.7) * 3.3),  # Blue (fade in)
+                alpha
+            )
+        else:  # Outer flame (orange-red)
+            color = (
+                255,                                    # Red
+                int(200 * life_factor),                # Green
+                0,                                      # Blue
+                alpha
+            )
+        pygame.draw.circle(surface, color, (size//2, size//2), size//2)
+    
+    @staticmethod
+    def draw(screen, x, y):
+        # Draw meteor
+        size = Meteor.size
+        pygame.draw.circle(screen, BROWN, (int(x + size), int(y + size)), size)
@@ -1,71 +1,93 @@
 import pygame
-from config.settings import WINDOW_HEIGHT, ROAD_WIDTH, CAR_WIDTH, CAR_HEIGHT, PLAYER_SPEED, BLACK, DARK_RED, WINDOW_BLUE
+from config.settings import (
+    WINDOW_HEIGHT, ROAD_WIDTH, CAR_WIDTH, CAR_HEIGHT, PLAYER_SPEED, BLACK, DARK_RED, WINDOW_BLUE,
+    ACTION_UP, ACTION_DOWN, ACTION_LEFT, ACTION_RIGHT
+)
 from models.bullet import Bullet
 
 class Player:
+    __slots__ = (
+        'width', 'height', 'x', 'y', 'prev_x', 'prev_y', 'speed',
+        'has_power_up', 'power_up_time', 'power_up_duration'
+    )
+    
     def __init__(self, window_width):
         self.width = CAR_WIDTH
         self.height = CAR_HEIGHT
         self.x = (window_width - self.width) // 2
         self.y = WINDOW_HEIGHT - self.height - 20
+        # Position before the last move, for drawing between simulation steps
+        self.prev_x = self.x
+        self.prev_y = self.y
         self.speed = PLAYER_SPEED
         self.has_power_up = False
         self.power_up_time = 0
         self.power_up_duration = 5000  # 5 seconds in milliseconds
     
-    def move(self, keys, window_width):
+    def copy(self):
+        # Detached copy, e.g. for drawing on another thread while this one moves on
+        player = Player.__new__(Player)
+        for name in Player.__slots__:
+            setattr(player, name, getattr(self, name))
+        return player
+    
+    def move(self, actions, window_width):
+        self.prev_x = self.x
+        self.prev_y = self.y
+        
         # Vertical movement
-        if keys[pygame.K_UP] and self.y > 0:
+        if actions & ACTION_UP and self.y > 0:
             self.y -= self.speed
-        if keys[pygame.K_DOWN] and self.y < WINDOW_HEIGHT - self.height:
+        if actions & ACTION_DOWN and self.y < WINDOW_HEIGHT - self.height:
             self.y += self.speed
         
         # Horizontal movement
         road_left = (window_width - ROAD_WIDTH) // 2
         road_right = road_left + ROAD_WIDTH - self.width
         
-        if keys[pygame.K_LEFT] and self.x > road_left:
+        if actions & ACTION_LEFT and self.x > road_left:
             self.x -= self.speed
-        if keys[pygame.K_RIGHT] and self.x < road_right:
+        if actions & ACTION_RIGHT and self.x < road_right:
             self.x += self.speed
     
-    def shoot(self):
+    def shoot(self, bullets):
         if not self.has_power_up:
-            return None
+            return False
         # Create two bullets side by side
-        bullet1 = Bullet(self.x + self.width * 0.25, self.y)
-        bullet2 = Bullet(self.x + self.width * 0.75, self.y)
-        return [bullet1, bullet2]
+        Bullet.spawn(bullets, self.x + self.width * 0.25, self.y)
+        Bullet.spawn(bullets, self.x + self.width * 0.75, self.y)
+        return True
     
     def update_power_up(self, current_time):
         if self.has_power_up:
             if current_time - self.power_up_time >= self.power_up_duration:
                 self.has_power_up = False
     
-    def draw(self, screen):
+    def draw_car(self, screen, x, y, has_guns):
+        # Drawn at x, y rather than the player's position so it can be pre-rendered into a sprite
         # Draw car body
-        pygame.draw.rect(screen, BLACK, (self.x, self.y, self.width, self.height))
+        pygame.draw.rect(screen, BLACK, (x, y, self.width, self.height))
         
         # Draw windows
         window_width = self.width * 0.7
         window_height = self.height * 0.2
-        window_x = self.x + (self.width - window_width) / 2
-        window_y = self.y + self.height * 0.2
+        window_x = x + (self.width - window_width) / 2
+        window_y = y + self.height * 0.2
         pygame.draw.rect(screen, WINDOW_BLUE, (window_x, window_y, window_width, window_height))
         
         # Draw wheels
         wheel_radius = 5
         wheel_positions = [
-            (self.x + wheel_radius + 2, self.y + wheel_radius + 2),
-            (self.x + self.width - wheel_radius - 2, self.y + wheel_radius + 2),
-            (self.x + wheel_radius + 2, self.y + self.height - wheel_radius - 2),
-            (self.x + self.width - wheel_radius - 2, self.y + self.height - wheel_radius - 2)
+            (x + wheel_radius + 2, y + wheel_radius + 2),
+            (x + self.width - wheel_radius - 2, y + wheel_radius + 2),
+            (x + wheel_radius + 2, y + self.height - wheel_radius - 2),
+            (x + self.width - wheel_radius - 2, y + self.height - wheel_radius - 2)
         ]
         for pos in wheel_positions:
             pygame.draw.circle(screen, DARK_RED, pos, wheel_radius)
         
         # Draw guns when power-up is active
-        if self.has_power_up:
+        if has_guns:
             # Gun dimensions
             gun_width = 6  # Increased to accommodate two lines
             gun_height = 30
@@ -76,43 +98,50 @@ class Player:
             # Left gun
             # Gun vertical lines
             pygame.draw.line(screen, BLACK, 
-                (self.x - gun_offset, self.y + 2),
-                (self.x - gun_offset, self.y + gun_height + 2),
+                (x - gun_offset, y + 2),
+                (x - gun_offset, y + gun_height + 2),
                 2)  # Line thickness
             pygame.draw.line(screen, BLACK, 
-                (self.x - gun_offset + line_spacing, self.y + 2),
-                (self.x - gun_offset + line_spacing, self.y + gun_height + 2),
+                (x - gun_offset + line_spacing, y + 2),
+                (x - gun_offset + line_spacing, y + gun_height + 2),
                 2)  # Line thickness
             # Gun barrel
             pygame.draw.circle(screen, BLACK, (
-                int(self.x - gun_offset + line_spacing/2),
-                self.y + 2
+                int(x - gun_offset + line_spacing/2),
+                y + 2
             ), barrel_radius)
             
             # Right gun
             # Gun vertical lines
             pygame.draw.line(screen, BLACK, 
-                (self.x + self.width + gun_offset - gun_width, self.y + 2),
-                (self.x + self.width + gun_offset - gun_width, self.y + gun_height + 2),
+                (x + self.width + gun_offset - gun_width, y + 2),
+                (x + self.width + gun_offset - gun_width, y + gun_height + 2),
                 2)  # Line thickness
             pygame.draw.line(screen, BLACK, 
-                (self.x + self.width + gun_offset - gun_width + line_spacing, self.y + 2),
-                (self.x + self.width + gun_offset - gun_width + line_spacing, self.y + gun_height + 2),
+                (x + self.width + gun_offset - gun_width + line_spacing, y + 2),
+                (x + self.width + gun_offset - gun_width + line_spacing, y + gun_height + 2),
                 2)  # Line thickness
             # Gun barrel
             pygame.draw.circle(screen, BLACK, (
-                int(self.x + self.width + gun_offset - gun_width + line_spacing/2),
-                self.y + 2
+                int(x + self.width + gun_offset - gun_width + line_spacing/2),
+                y + 2
             ), barrel_radius)
-            
-            # Draw power-up timer bar
-            remaining_time = (self.power_up_duration - (pygame.time.get_ticks() - self.power_up_time)) / self.power_up_duration
-            if remaining_time > 0:
-                bar_width = 50
-                bar_height = 5
-                bar_x = self.x + (self.width - bar_width) / 2
-                bar_y = self.y - 10
-                pygame.draw.rect(screen, (255, 0, 0), (bar_x, bar_y, bar_width * remaining_time, bar_height))
     
-    def get_rect(self):
-        return pygame.Rect(self.x, self.y, self.width, self.height)
+    def power_up_bar_rect(self, current_time, x, y):
+        # Power-up timer bar above a car drawn at x, y, or None when there's nothing to show
+        if not self.has_power_up:
+            return None
+        remaining_time = (self.power_up_duration - (current_time - self.power_up_time)) / self.power_up_duration
+        if remaining_time <= 0:
+            return None
+        bar_width = 50
+        bar_height = 5
+        bar_x = x + (self.width - bar_width) / 2
+        bar_y = y - 10
+        return (int(bar_x), int(bar_y), int(bar_width * remaining_time), bar_height)
+    
+    def draw_power_up_bar(self, screen, current_time, x, y):
+        # Draw power-up timer bar
+        bar = self.power_up_bar_rect(current_time, x, y)
+        if bar is not None:
+            pygame.draw.rect(screen, (255, 0, 0), bar)
@@ -1,39 +1,45 @@
 import pygame
-import random
 from config.settings import WINDOW_WIDTH, ROAD_WIDTH
+from game.entity_store import EntityStore
+from game.hud import render_text
 
 class PowerUp:
-    def __init__(self):
-        self.radius = 15
+    # Power-ups live as rows of an EntityStore; x, y is the top-left of the bounding box
+    radius = 15
+    speed = 3
+    colors = {
+        'border': (255, 255, 0),  # Yellow
+        'fill': (0, 0, 0),       # Black
+        'text': (255, 0, 0)       # Red
+    }
+
+    @staticmethod
+    def create_store():
+        return EntityStore(capacity=4)
+
+    @staticmethod
+    def spawn(store, rng):
+        r = PowerUp.radius
         road_left = (WINDOW_WIDTH - ROAD_WIDTH) // 2
-        road_right = road_left + ROAD_WIDTH - self.radius * 2
-        self.x = random.randint(road_left + self.radius, road_right)
-        self.y = -self.radius
-        self.speed = 3
-        self.colors = {
-            'border': (255, 255, 0),  # Yellow
-            'fill': (0, 0, 0),       # Black
-            'text': (255, 0, 0)       # Red
-        }
-        self.font = pygame.font.Font(None, int(self.radius * 1.5))
-    
-    def move(self):
-        self.y += self.speed
-    
-    def draw(self, screen):
+        road_right = road_left + ROAD_WIDTH - r * 2
+        x = int(rng.integers(road_left + r, road_right, endpoint=True))
+        return store.spawn(x - r, -r * 2, 0, PowerUp.speed, r * 2, r * 2)
+
+    @staticmethod
+    def off_screen(store, height):
+        # Center below the bottom edge
+        return store.view('y') + PowerUp.radius > height
+
+    @staticmethod
+    def draw(screen, x, y):
+        r = PowerUp.radius
+        center = (x + r, y + r)
         # Draw black filled circle
-        pygame.draw.circle(screen, self.colors['fill'], (self.x, self.y), self.radius)
+        pygame.draw.circle(screen, PowerUp.colors['fill'], center, r)
         # Draw yellow border (slightly smaller radius to fit within the circle)
-        pygame.draw.circle(screen, self.colors['border'], (self.x, self.y), self.radius, 2)
+        pygame.draw.circle(screen, PowerUp.colors['border'], center, r, 2)
         
         # Draw red "L"
-        text = self.font.render("L", True, self.colors['text'])
-        text_rect = text.get_rect(center=(self.x, self.y))
+        text = render_text(int(r * 1.5), "L", PowerUp.colors['text'])
+        text_rect = text.get_rect(center=center)
         screen.blit(text, text_rect)
-    
-    def get_rect(self):
-        return pygame.Rect(self.x - self.radius, self.y - self.radius, 
-                         self.radius * 2, self.radius * 2)
-    
-    def is_off_screen(self, height):
-        return self.y > height
@@ -0,0 +1,20 @@
+import numpy as np
+from game.environment import VectorRacingEnv
+
+
+def test_finished_games_report_their_final_score():
+    env = VectorRacingEnv(4, seed=0, max_steps=300)
+    env.reset()
+    totals = np.zeros(env.n)
+    rng = np.random.default_rng(0)
+    finished = 0
+    for _ in range(1200):
+        _, rewards, terminated, truncated, info = env.step(rng.integers(env.action_count, size=env.n))
+        totals += rewards
+        done = terminated | truncated
+        # Rewards add up to the score the game ended with, not the new game's
+        np.testing.assert_array_equal(info['score'][done], totals[done])
+        assert (env.scores[done] == 0).all()
+        totals[done] = 0
+        finished += done.sum()
+    assert finished >= env.n
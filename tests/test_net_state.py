@@ -0,0 +1,26 @@
+import random
+import numpy as np
+from game.net_state import capture, encode_state, decode_state
+from game.simulation import Simulation, TICK_MS
+
+
+def _assert_same(a, b):
+    assert len(a) == len(b)
+    for (ids_a, rows_a), (ids_b, rows_b) in zip(a, b):
+        np.testing.assert_array_equal(ids_a, ids_b)
+        np.testing.assert_array_equal(rows_a, rows_b)
+
+
+def test_state_survives_encoding_full_and_as_delta():
+    moves = random.Random(3)
+    sims = [Simulation(seed) for seed in (1, 2)]
+    base = None
+    for _ in range(60):
+        for sim in sims:
+            for _ in range(20):
+                sim.step(moves.randrange(32), TICK_MS)
+        state = capture(sims)
+        _assert_same(decode_state(None, encode_state(None, state), len(sims)), state)
+        if base is not None:
+            _assert_same(decode_state(base, encode_state(base, state), len(sims)), state)
+        base = state
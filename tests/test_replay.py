@@ -0,0 +1,21 @@
+import random
+from config.settings import GAME_RUNNING
+from game.replay import Replay
+from game.savestate import save_state
+from game.simulation import Simulation, TICK_MS
+
+
+def test_decoded_replay_reproduces_the_game():
+    moves = random.Random(1)
+    sim = Simulation(42)
+    replay = Replay(42)
+    # Like the game loop, record until the game ends
+    while sim.game_state == GAME_RUNNING and len(replay.inputs) < 2000:
+        actions = moves.randrange(32)
+        replay.record(actions)
+        sim.step(actions, TICK_MS)
+
+    replayed = Replay.decode(replay.encode())
+    assert replayed.seed == 42
+    assert replayed.inputs == replay.inputs
+    assert save_state(replayed.run()) == save_state(sim)
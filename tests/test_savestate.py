@@ -0,0 +1,32 @@
+import random
+from game.savestate import save_state, load_state, fork
+from game.simulation import Simulation, TICK_MS
+
+
+def _play(sim, steps, seed):
+    moves = random.Random(seed)
+    for _ in range(steps):
+        sim.step(moves.randrange(32), TICK_MS)
+
+
+def test_loaded_state_matches_and_plays_on_the_same():
+    sim = Simulation(7)
+    _play(sim, 1500, 1)
+    data = save_state(sim)
+
+    loaded = Simulation(8)
+    load_state(loaded, data)
+    assert save_state(loaded) == data
+
+    _play(sim, 1500, 2)
+    _play(loaded, 1500, 2)
+    assert save_state(loaded) == save_state(sim)
+
+
+def test_fork_leaves_the_original_alone():
+    sim = Simulation(7)
+    _play(sim, 500, 1)
+    data = save_state(sim)
+    copy = fork(sim)
+    _play(copy, 500, 2)
+    assert save_state(sim) == data
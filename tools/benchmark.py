@@ -0,0 +1,332 @@
+"""
+Scenario benchmarks for the per-tick cost of GameManager.update() and render().
+
+Each scenario drives a real GameManager under the SDL dummy drivers for a
+fixed number of ticks with seeded inputs, so a given scenario is the same
+workload on every run. Startup is timed too: main.py is started a few
+times with --first-frame and its reported time to first frame recorded,
+along with how much of it went on imports.
+Results are printed as a table and written as JSON for comparing commits:
+
+    python -m tools.benchmark
+    python -m tools.benchmark --scenario meteor_storm --ticks 2000
+    python -m tools.benchmark --output new.json --compare old.json
+    python -m tools.benchmark --render-scale 0.5 --scaling integer
+    python -m tools.benchmark --check-dirty --startup-runs 0
+
+--check-dirty also renders every scenario tick with the dirty-rectangle
+presenter and checks its pixels against a full redraw of the same frame.
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import time
+
+# Headless: no window, no sound card
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+from config.settings import (
+    GAME_RUNNING, GAME_DURATION, WINDOW_HEIGHT, WINDOW_WIDTH, PLAYER_SPEED, PLAYER_SPEED_MULTIPLIER,
+    ACTION_UP, ACTION_DOWN, ACTION_LEFT, ACTION_RIGHT, ACTION_SHOOT, STARTUP_BUDGET_MS,
+    RENDER_SCALE, DISPLAY_SCALING, SCALING_MODES
+)
+from game.game_manager import GameManager
+from game.renderer import DirtyRectPresenter
+from game.replay import Replay
+from game.simulation import TICK_MS
+from models.cpu_car import CPUCar
+from models.meteor import Meteor
+from models.power_up import PowerUp
+
+DEFAULT_TICKS = 1200
+WARMUP_TICKS = 60
+PERCENTILES = (50, 95, 99)
+DEFAULT_STARTUP_RUNS = 5
+MAIN_SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'main.py')
+
+
+def random_inputs(seed, ticks):
+    # Held keys that change every few steps, with the occasional shot
+    rng = random.Random(seed)
+    moves = [0, ACTION_LEFT, ACTION_RIGHT, ACTION_UP, ACTION_DOWN, ACTION_LEFT | ACTION_UP, ACTION_RIGHT | ACTION_UP]
+    inputs = []
+    while len(inputs) < ticks:
+        held = rng.choice(moves)
+        for _ in range(rng.randint(5, 30)):
+            inputs.append(held | (ACTION_SHOOT if rng.random() < 0.3 else 0))
+    return inputs[:ticks]
+
+
+def start_at_level(sim, level):
+    sim.current_level = level
+    sim.player.speed = PLAYER_SPEED * (PLAYER_SPEED_MULTIPLIER ** (level - 1))
+
+
+def hold_level(sim):
+    # Keep the level timer from running out so the scenario stays on its level
+    if sim.time - sim.start_time >= GAME_DURATION - 2 * TICK_MS:
+        sim.start_time = sim.time
+
+
+class Scenario:
+    """A named workload: the level to start at and an optional per-tick hook.
+
+    The hook runs before every update() and is how scenarios add load the
+    normal spawn timers wouldn't produce.
+    """
+
+    def __init__(self, name, description, level, every_tick=None, seed=1):
+        self.name = name
+        self.description = description
+        self.level = level
+        self.every_tick = every_tick
+        self.seed = seed
+
+    def setup(self, sim):
+        start_at_level(sim, self.level)
+
+    def tick(self, sim):
+        hold_level(sim)
+        if self.every_tick is not None:
+            self.every_tick(sim)
+
+
+def meteor_storm(sim):
+    # A new meteor every quarter second on top of the normal ones
+    if int(sim.time / TICK_MS) % 15 == 0:
+        Meteor.spawn(sim.meteors, sim.rng)
+
+
+def power_up_spam(sim):
+    # Guns always on and a power-up falling every third of a second
+    sim.player.has_power_up = True
+    sim.player.power_up_time = sim.time
+    if int(sim.time / TICK_MS) % 20 == 0:
+        PowerUp.spawn(sim.power_ups, sim.rng)
+
+
+STRESS_CARS = 1000
+
+
+def car_stress(sim):
+    # Keep STRESS_CARS cars on screen; cars are removed before they can reach
+    # the player so the run isn't one restart after another
+    cars = sim.cpu_cars
+    danger = cars.y[:cars.count] + CPUCar.height >= sim.player.y - 40
+    if danger.any():
+        cars.kill(danger)
+        cars.compact()
+    for _ in range(STRESS_CARS - cars.count):
+        i = CPUCar.spawn(cars, sim.rng, WINDOW_WIDTH, 2.0)
+        cars.y[i] = sim.rng.uniform(-WINDOW_HEIGHT, sim.player.y - 200)
+
+
+SCENARIOS = [
+    Scenario('level1_light', "level 1, normal light traffic", 1),
+    Scenario('meteor_storm', "level 5 with an extra meteor every 15 ticks", 5, meteor_storm),
+    Scenario('power_up_spam', "level 12, permanent guns and constant power-up drops", 12, power_up_spam),
+    Scenario('car_stress', f"synthetic {STRESS_CARS} CPU cars on screen", 1, car_stress),
+]
+
+
+def summarize(samples_ms):
+    samples = np.asarray(samples_ms)
+    summary = {f'p{p}': round(float(np.percentile(samples, p)), 4) for p in PERCENTILES}
+    summary['mean'] = round(float(samples.mean()), 4)
+    return summary
+
+
+def run_scenario(scenario, ticks, render_scale=RENDER_SCALE, scaling=DISPLAY_SCALING):
+    inputs = random_inputs(scenario.seed, ticks + WARMUP_TICKS)
+    gm = GameManager(
+        playback=Replay(scenario.seed, inputs), persist=False, render_scale=render_scale, scaling=scaling
+    )
+    scenario.setup(gm.sim)
+
+    update_ms = []
+    render_ms = []
+    restarts = 0
+    clock = time.perf_counter
+    for tick in range(WARMUP_TICKS + ticks):
+        scenario.tick(gm.sim)
+        t0 = clock()
+        gm.update()
+        t1 = clock()
+        gm.render()
+        t2 = clock()
+        if tick >= WARMUP_TICKS:
+            update_ms.append((t1 - t0) * 1000)
+            render_ms.append((t2 - t1) * 1000)
+        if gm.sim.game_state != GAME_RUNNING:
+            # Same seed and inputs again, so restarts are part of the fixed workload
+            restarts += 1
+            gm.reset_game()
+            scenario.setup(gm.sim)
+    gm.audio.shutdown()
+
+    frame_ms = [u + r for u, r in zip(update_ms, render_ms)]
+    frame = summarize(frame_ms)
+    return {
+        'description': scenario.description,
+        'ticks': ticks,
+        'restarts': restarts,
+        'update_ms': summarize(update_ms),
+        'render_ms': summarize(render_ms),
+        'frame_ms': frame,
+        'fps': round(1000 / frame['mean'], 1),
+    }
+
+
+def check_dirty_rects(scenario, ticks, render_scale=RENDER_SCALE, scaling=DISPLAY_SCALING):
+    # Frames where drawing only the changed areas leaves different pixels than a full redraw
+    inputs = random_inputs(scenario.seed, ticks)
+    gm = GameManager(
+        playback=Replay(scenario.seed, inputs), persist=False, render_scale=render_scale, scaling=scaling
+    )
+    presenter = DirtyRectPresenter(gm.target.update)
+    scenario.setup(gm.sim)
+    mismatches = 0
+    for _ in range(ticks):
+        scenario.tick(gm.sim)
+        gm.update()
+        gm.dirty_rects = presenter
+        gm.render()
+        partial = pygame.surfarray.array3d(gm.screen)
+        # The full redraw leaves the screen as it should be, which is also what the presenter assumes next frame
+        gm.dirty_rects = None
+        gm.render()
+        if not np.array_equal(partial, pygame.surfarray.array3d(gm.screen)):
+            mismatches += 1
+        if gm.sim.game_state != GAME_RUNNING:
+            gm.reset_game()
+            scenario.setup(gm.sim)
+    gm.audio.shutdown()
+    return mismatches
+
+
+def measure_startup(runs):
+    # Fresh processes, so imports and first-time initialization are counted every run
+    samples = []
+    imports = []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, MAIN_SCRIPT, '--first-frame'], capture_output=True, text=True, check=True
+        ).stdout
+        match = re.search(r'first frame after ([\d.]+) ms \(imports ([\d.]+) ms\)', output)
+        samples.append(float(match.group(1)))
+        imports.append(float(match.group(2)))
+    startup = summarize(samples)
+    startup['imports'] = summarize(imports)
+    # The budget is for what runs after the imports
+    startup['after_imports'] = summarize([total - spent for total, spent in zip(samples, imports)])
+    startup['runs'] = runs
+    startup['budget_ms'] = STARTUP_BUDGET_MS
+    return startup
+
+
+def print_startup(startup, baseline=None):
+    row = f"{'startup':<16}{'first':<8}" + ''.join(f"{startup[f'p{p}']:>9.3f}" for p in PERCENTILES)
+    if baseline is not None:
+        row += f"   p50 {(startup['p50'] / baseline['p50'] - 1) * 100:+.1f}% vs baseline"
+    print(row)
+    print(f"{'':<16}{'imports':<8}" + ''.join(f"{startup['imports'][f'p{p}']:>9.3f}" for p in PERCENTILES))
+    after = startup['after_imports']
+    row = f"{'':<16}{'rest':<8}" + ''.join(f"{after[f'p{p}']:>9.3f}" for p in PERCENTILES)
+    row += '   within budget' if after['p50'] <= startup['budget_ms'] else f"   over {startup['budget_ms']} ms budget"
+    print(row)
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results, baseline=None):
+    print(f"{'scenario':<16}{'phase':<8}{'p50':>9}{'p95':>9}{'p99':>9}{'fps':>9}")
+    for name, result in results.items():
+        for phase in ('update', 'render', 'frame'):
+            stats = result[f'{phase}_ms']
+            row = f"{name if phase == 'update' else '':<16}{phase:<8}"
+            row += ''.join(f"{stats[f'p{p}']:>9.3f}" for p in PERCENTILES)
+            if phase == 'frame':
+                row += f"{result['fps']:>9.1f}"
+                old = (baseline or {}).get(name)
+                if old is not None:
+                    change = (stats['p50'] / old['frame_ms']['p50'] - 1) * 100
+                    row += f"   p50 {change:+.1f}% vs baseline"
+            print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scenario', action='append', choices=[s.name for s in SCENARIOS],
+                        help="run only this scenario (repeatable)")
+    parser.add_argument('--ticks', type=int, default=DEFAULT_TICKS, help="timed ticks per scenario")
+    parser.add_argument('--output', default='benchmark_results.json', help="where to write the JSON results")
+    parser.add_argument('--compare', help="earlier results JSON to show frame time changes against")
+    parser.add_argument('--startup-runs', type=int, default=DEFAULT_STARTUP_RUNS,
+                        help="times to start the game for the time to first frame (0 to skip)")
+    parser.add_argument('--render-scale', type=float, default=RENDER_SCALE,
+                        help="render target size, as a fraction of the world")
+    parser.add_argument('--scaling', choices=[mode for mode in SCALING_MODES if mode], default=DISPLAY_SCALING,
+                        help="how the render target is scaled to the window")
+    parser.add_argument('--check-dirty', action='store_true',
+                        help="also check dirty-rectangle rendering against full redraws")
+    args = parser.parse_args()
+
+    startup = measure_startup(args.startup_runs) if args.startup_runs else None
+    scenarios = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    results = {
+        scenario.name: run_scenario(scenario, args.ticks, args.render_scale, args.scaling) for scenario in scenarios
+    }
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_table(results, baseline and baseline['scenarios'])
+    if startup is not None:
+        print_startup(startup, baseline and baseline.get('startup_ms'))
+    dirty = None
+    if args.check_dirty:
+        dirty = {
+            scenario.name: check_dirty_rects(scenario, args.ticks, args.render_scale, args.scaling)
+            for scenario in scenarios
+        }
+        for name, mismatches in dirty.items():
+            print(f"{name:<16}dirty rects: {'match' if not mismatches else f'{mismatches} frame(s) differ'}")
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'numpy': np.__version__,
+        'tick_ms': TICK_MS,
+        'render_scale': args.render_scale,
+        'scaling': args.scaling,
+        'startup_ms': startup,
+        'scenarios': results,
+        'dirty_mismatches': dirty,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"results written to {args.output}")
+    pygame.quit()
+    return 1 if dirty and any(dirty.values()) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
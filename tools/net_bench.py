@@ -0,0 +1,115 @@
+"""
+Localhost load test for network races: bandwidth per tick and latency.
+
+Starts a GameServer with bots on every track and connects several
+spectator clients to it over TCP, all in this process, then reports per
+client the bytes received per tick (against what full states would cost),
+the one-way latency from the server sending a snapshot to the client
+decoding it, and the round trip the server measured from acknowledgements:
+
+    python -m tools.net_bench --clients 8 --seconds 10
+    python -m tools.net_bench --tracks 2 --param INITIAL_SPAWN_RATE=200 --output net.json
+
+Server and clients share one event loop and core here, so latencies are an
+upper bound for what separate machines would see on a fast network.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+
+# No window is opened, but the models import pygame
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+
+import numpy as np
+from game.net import GameServer, GameClient
+from game.net_state import encode_state
+from tools.sweep import POLICIES, parse_param
+
+PERCENTILES = (50, 95, 99)
+
+
+async def run(args):
+    tuning = {name: values[0] for name, values in args.param}
+    policies = {track: POLICIES[args.policy](random.Random(track)) for track in range(args.tracks)}
+    server = GameServer(args.tracks, tuning=tuning, policies=policies, host='127.0.0.1')
+    await server.start()
+    # Every latency is kept, so the warm-up can be cut off afterwards
+    clients = [GameClient(latency_samples=None) for _ in range(args.clients)]
+    for client in clients:
+        await client.connect('127.0.0.1', server.port)
+    receiving = [asyncio.create_task(client.receive()) for client in clients]
+
+    # Sample what a full state would have cost now and then, from the first client's copy
+    full_sizes = []
+    entities = []
+    for _ in range(int(args.seconds * 4)):
+        await asyncio.sleep(0.25)
+        state = clients[0].states.get(clients[0].tick)
+        if state is not None:
+            full_sizes.append(len(encode_state(None, state)))
+            entities.append(sum(len(ids) for ids, _ in state))
+
+    server_stats = server.stats()
+    for client in clients:
+        client.close()
+    await server.stop()
+    for task in receiving:
+        task.cancel()
+    await asyncio.gather(*receiving, return_exceptions=True)
+
+    results = []
+    for client in clients:
+        latencies = np.array(list(client.latencies_ms)[len(client.latencies_ms) // 10:])  # Skip connection warm-up
+        results.append({
+            'snapshots': client.snapshots,
+            'bytes_per_tick': client.bytes_received / client.snapshots if client.snapshots else 0.0,
+            'latency_ms': {f'p{p}': round(float(np.percentile(latencies, p)), 3) for p in PERCENTILES},
+        })
+    return {
+        'tracks': args.tracks,
+        'clients': args.clients,
+        'policy': args.policy,
+        'tuning': tuning,
+        'ticks': server.tick,
+        'mean_entities': float(np.mean(entities)) if entities else 0.0,
+        'full_state_bytes': float(np.mean(full_sizes)) if full_sizes else 0.0,
+        'server': server_stats,
+        'clients_received': results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--clients', type=int, default=4, help="spectator connections")
+    parser.add_argument('--tracks', type=int, default=2, help="tracks in the race, each driven by a bot")
+    parser.add_argument('--seconds', type=float, default=10, help="how long to stream")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='dodge', help="bot driving every track")
+    parser.add_argument('--param', action='append', type=parse_param, default=[],
+                        help="difficulty override NAME=value, e.g. INITIAL_SPAWN_RATE=200 for heavy traffic")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    print(f"{report['tracks']} track(s), {report['clients']} client(s), {report['ticks']} ticks, "
+          f"{report['mean_entities']:.0f} entities on average")
+    print(f"full state would be {report['full_state_bytes']:.0f} bytes per tick")
+    print(f"{'client':<8}{'bytes/tick':>12}{'snapshots':>11}" + ''.join(f"{f'p{p} ms':>9}" for p in PERCENTILES))
+    for i, client in enumerate(report['clients_received']):
+        row = f"{i:<8}{client['bytes_per_tick']:>12.1f}{client['snapshots']:>11}"
+        row += ''.join(f"{client['latency_ms'][f'p{p}']:>9.2f}" for p in PERCENTILES)
+        print(row)
+    rtts = [client['rtt_ms'] for client in report['server'] if client['rtt_ms'] is not None]
+    if rtts:
+        print(f"server-measured round trip: {min(rtts):.2f}-{max(rtts):.2f} ms")
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
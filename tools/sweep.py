@@ -0,0 +1,266 @@
+"""
+Headless difficulty and balance sweeps over a grid of settings.
+
+Plays many games per grid point across a process pool, one worker per core
+by default, with a scripted or bot input policy. Results are aggregated as
+batches finish, so memory stays flat however many games are played:
+
+    python -m tools.sweep --games 500 --policy dodge \\
+        --param WORLD_SPEED_MULTIPLIER=1.2,1.3,1.4 --param METEOR_SPAWN_RATE=2000,3000
+    python -m tools.sweep --games 2000 --output games.jsonl
+
+Only settings in game.simulation.TUNABLE_SETTINGS can be swept.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+import numpy as np
+from config import settings
+from config.settings import (
+    GAME_RUNNING, ACTION_UP, ACTION_DOWN, ACTION_LEFT, ACTION_RIGHT, ACTION_SHOOT,
+    ROAD_WIDTH, WINDOW_WIDTH, DEATH_CPU_CAR, DEATH_METEOR, DEATH_METEOR_BLAST
+)
+from game.simulation import Simulation, TUNABLE_SETTINGS, TICK_MS
+from models.meteor import Meteor
+
+TIMEOUT = 'timeout'
+OUTCOMES = (DEATH_CPU_CAR, DEATH_METEOR, DEATH_METEOR_BLAST, TIMEOUT)
+
+
+# Input policies: each game builds its own from the game's random.Random
+# (separate from the simulation's, which stays seed-driven) and calls it
+# once per step with the simulation
+
+class IdlePolicy:
+    def __init__(self, rng):
+        pass
+
+    def __call__(self, sim):
+        return 0
+
+
+class RandomPolicy:
+    # Mostly keeps the previous move, so moves are held like real key presses
+    def __init__(self, rng):
+        self.rng = rng
+        self.held = 0
+
+    def __call__(self, sim):
+        rng = self.rng
+        if rng.random() < 0.1:
+            self.held = rng.choice((0, ACTION_LEFT, ACTION_RIGHT, ACTION_UP, ACTION_DOWN))
+        if rng.random() < 0.2:
+            return self.held | ACTION_SHOOT
+        return self.held
+
+
+DODGE_LOOKAHEAD = 250  # Pixels above the player a threat is considered
+DODGE_STEPS = 10  # How many steps of sideways movement each choice is judged over
+
+
+class DodgePolicy:
+    # Steers toward whichever of stay / left / right has the least traffic ahead, shooting when armed
+    def __init__(self, rng):
+        pass
+
+    def __call__(self, sim):
+        player = sim.player
+        top = player.y - DODGE_LOOKAHEAD
+        bottom = player.y + player.height
+        lefts = []
+        rights = []
+        for store in (sim.cpu_cars, sim.meteors):
+            n = store.count
+            ahead = (store.y[:n] + store.h[:n] > top) & (store.y[:n] < bottom)
+            lefts.append(store.x[:n][ahead])
+            rights.append(store.x[:n][ahead] + store.w[:n][ahead])
+            # Meteors blast 80 px around where they land, so give them a wide berth
+            if store is sim.meteors:
+                lefts[-1] = lefts[-1] - 80 + Meteor.size
+                rights[-1] = rights[-1] + 80 - Meteor.size
+        lefts = np.concatenate(lefts)
+        rights = np.concatenate(rights)
+
+        road_left = (WINDOW_WIDTH - ROAD_WIDTH) // 2
+        road_right = road_left + ROAD_WIDTH - player.width
+        best_actions, best_threat = 0, None
+        for actions, direction in ((0, 0), (ACTION_LEFT, -1), (ACTION_RIGHT, 1)):
+            x = min(max(player.x + direction * player.speed * DODGE_STEPS, road_left), road_right)
+            threat = int(np.count_nonzero((lefts < x + player.width) & (rights > x)))
+            if best_threat is None or threat < best_threat:
+                best_actions, best_threat = actions, threat
+        if player.has_power_up and len(lefts):
+            best_actions |= ACTION_SHOOT
+        return best_actions
+
+
+POLICIES = {
+    'idle': IdlePolicy,
+    'random': RandomPolicy,
+    'dodge': DodgePolicy,
+}
+
+
+def play(seed, tuning, policy, max_steps):
+    sim = Simulation(seed, tuning)
+    policy = policy(random.Random(seed))
+    steps = 0
+    while sim.game_state == GAME_RUNNING and steps < max_steps:
+        sim.step(policy(sim), TICK_MS)
+        steps += 1
+    outcome = sim.death_cause if sim.game_state != GAME_RUNNING else TIMEOUT
+    return sim.current_level, sim.current_score, steps, outcome
+
+
+def play_batch(point, tuning, policy_name, seeds, max_steps):
+    # Worker task: a batch of games at one grid point, returned as small tuples
+    policy = POLICIES[policy_name]
+    return point, [(seed,) + play(seed, tuning, policy, max_steps) for seed in seeds]
+
+
+class PointSummary:
+    """Running totals for one grid point; constant size however many games are added."""
+
+    def __init__(self, tuning):
+        self.tuning = tuning
+        self.games = 0
+        self.levels = Counter()
+        self.score = 0
+        self.minutes = 0.0
+        self.outcomes = Counter()
+
+    def add(self, level, score, steps, outcome):
+        self.games += 1
+        self.levels[level] += 1
+        self.score += score
+        self.minutes += steps * TICK_MS / 60000
+        self.outcomes[outcome] += 1
+
+    def level_percentile(self, q):
+        target = q / 100 * self.games
+        seen = 0
+        for level in sorted(self.levels):
+            seen += self.levels[level]
+            if seen >= target:
+                return level
+        return 0
+
+    def as_dict(self):
+        return {
+            'tuning': self.tuning,
+            'games': self.games,
+            'levels': dict(sorted(self.levels.items())),
+            'mean_level': sum(level * count for level, count in self.levels.items()) / self.games,
+            'score_per_minute': self.score / self.minutes if self.minutes else 0.0,
+            'outcomes': {outcome: self.outcomes[outcome] for outcome in OUTCOMES},
+        }
+
+
+def parse_param(text):
+    # NAME=v1,v2,... with values parsed like the setting's current value
+    name, _, values = text.partition('=')
+    name = name.strip()
+    if name not in TUNABLE_SETTINGS:
+        raise argparse.ArgumentTypeError(
+            f"{name} can't be swept; choose from {', '.join(sorted(TUNABLE_SETTINGS))}"
+        )
+    kind = type(getattr(settings, name))
+    try:
+        return name, [kind(value) for value in values.split(',') if value]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"bad value in {text}")
+
+
+def print_table(points):
+    names = sorted({name for point in points for name in point.tuning})
+    header = ''.join(f'{name:>24}' for name in names)
+    header += f"{'games':>7}{'lvl p10':>8}{'p50':>5}{'p90':>5}{'mean':>6}{'pts/min':>9}"
+    header += ''.join(f'{outcome:>14}' for outcome in OUTCOMES)
+    print(header)
+    for point in points:
+        if not point.games:
+            continue
+        summary = point.as_dict()
+        row = ''.join(f'{point.tuning.get(name, getattr(settings, name))!s:>24}' for name in names)
+        row += f'{point.games:>7}'
+        row += ''.join(f'{point.level_percentile(q):>{w}}' for q, w in ((10, 8), (50, 5), (90, 5)))
+        row += f"{summary['mean_level']:>6.2f}{summary['score_per_minute']:>9.1f}"
+        row += ''.join(f'{point.outcomes[outcome] / point.games:>14.1%}' for outcome in OUTCOMES)
+        print(row)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--param', action='append', type=parse_param, default=[],
+                        help="setting to sweep, NAME=v1,v2,... (repeatable; the grid is every combination)")
+    parser.add_argument('--games', type=int, default=200, help="games per grid point")
+    parser.add_argument('--policy', choices=sorted(POLICIES), default='dodge')
+    parser.add_argument('--max-minutes', type=float, default=5, help="game time after which a game is cut off")
+    parser.add_argument('--seed', type=int, default=0, help="seed of the first game; game i uses seed + i")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument('--batch', type=int, default=16, help="games per worker task")
+    parser.add_argument('--output', help="also stream every game's result to this JSON lines file")
+    parser.add_argument('--summary', help="write the per-point summary to this JSON file")
+    args = parser.parse_args()
+
+    names = [name for name, _ in args.param]
+    grid = [dict(zip(names, values)) for values in itertools.product(*(values for _, values in args.param))]
+    points = [PointSummary(tuning) for tuning in grid]
+    max_steps = int(args.max_minutes * 60000 / TICK_MS)
+
+    def tasks():
+        # Same seeds at every grid point, so points differ only by their settings
+        for start in range(0, args.games, args.batch):
+            seeds = range(args.seed + start, args.seed + min(start + args.batch, args.games))
+            for point, tuning in enumerate(grid):
+                yield point, tuning, args.policy, list(seeds), max_steps
+
+    total = args.games * len(grid)
+    done = 0
+    started = time.perf_counter()
+    output = open(args.output, 'w') if args.output else None
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            # Keep only a couple of tasks per worker in flight; results are folded in as they land
+            queued = tasks()
+            pending = {pool.submit(play_batch, *task) for task in itertools.islice(queued, args.workers * 2)}
+            while pending:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    point, results = future.result()
+                    for seed, level, score, steps, outcome in results:
+                        points[point].add(level, score, steps, outcome)
+                        if output is not None:
+                            output.write(json.dumps({
+                                'tuning': grid[point], 'seed': seed, 'level': level,
+                                'score': score, 'steps': steps, 'outcome': outcome,
+                            }) + '\n')
+                    done += len(results)
+                    task = next(queued, None)
+                    if task is not None:
+                        pending.add(pool.submit(play_batch, *task))
+                elapsed = time.perf_counter() - started
+                print(f"\r{done}/{total} games, {done / elapsed:.0f} games/s", end='', file=sys.stderr)
+    finally:
+        if output is not None:
+            output.close()
+    print(file=sys.stderr)
+
+    print(f"policy {args.policy}, {args.games} games per point, cut off after {args.max_minutes:g} min")
+    print_table(points)
+    if args.summary:
+        with open(args.summary, 'w') as f:
+            json.dump([point.as_dict() for point in points], f, indent=2)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
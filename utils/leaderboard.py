@@ -0,0 +1,203 @@
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from config.settings import (
+    LEADERBOARD_FILE, SCORE_LOG_FILE, HIGH_SCORE_FILE, LEADERBOARD_SIZE, SCORE_LOG_COMPACT_EVERY,
+    SCORE_WRITE_RETRY_SECONDS
+)
+
+_STOP = object()
+
+
+def _fsync_dir(path):
+    # Make a rename durable; not every platform can open a directory
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_atomic(path, text):
+    # Write to a temporary file beside path, fsync it, then rename it over path
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(path)
+
+
+class Leaderboard:
+    """High score and top-N scores per level, saved without blocking the game.
+
+    Reads are served from memory. submit() updates that memory and queues
+    the score for a background writer thread, which appends queued scores
+    to an append-only log in batches and fsyncs once per batch. Every
+    compact_every scores, the writer rewrites the snapshot file atomically
+    (temporary file, fsync, rename) and empties the log.
+
+    Log records carry a sequence number and the snapshot remembers the
+    last one it includes, so a crash between those two steps can't count a
+    score twice. A torn last line from a crash mid-append is skipped.
+
+    If the disk refuses a write, the writer reports it and keeps the
+    scores, retrying every SCORE_WRITE_RETRY_SECONDS until it succeeds or
+    close() is called. Retried records may land in the log twice; loading
+    skips sequence numbers it has already seen.
+    """
+
+    def __init__(self, path=LEADERBOARD_FILE, log_path=SCORE_LOG_FILE,
+                 size=LEADERBOARD_SIZE, compact_every=SCORE_LOG_COMPACT_EVERY):
+        self.path = path
+        self.log_path = log_path
+        self.size = size
+        self.compact_every = compact_every
+        self.lock = threading.Lock()
+        self.best = 0
+        self.levels = {}  # level reached -> [(score, time)], best first
+        self.seq = 0  # Sequence number of the last score recorded
+        self.snapshot_seq = 0  # ... and of the last score in the snapshot file
+        self._load()
+
+        self.pending = queue.Queue()
+        self.writer = threading.Thread(target=self._write_loop, name='leaderboard-writer', daemon=True)
+        self.writer.start()
+
+    def _record(self, score, level, when):
+        self.best = max(self.best, score)
+        entries = self.levels.setdefault(level, [])
+        entries.append((score, when))
+        entries.sort(key=lambda entry: -entry[0])
+        del entries[self.size:]
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            # Missing or unreadable snapshot: start from the log alone
+            snapshot = None
+        if snapshot is not None:
+            self.best = snapshot['high_score']
+            self.snapshot_seq = self.seq = snapshot['seq']
+            for level, entries in snapshot['levels'].items():
+                self.levels[int(level)] = [tuple(entry) for entry in entries]
+        else:
+            self.best = self._legacy_high_score()
+
+        try:
+            # Binary, so the truncation below counts the bytes actually on disk
+            with open(self.log_path, 'rb') as f:
+                lines = f.readlines()
+        except FileNotFoundError:
+            lines = []
+        if lines and not lines[-1].endswith(b'\n'):
+            # A torn append from a crash: cut it off so new records start on a fresh line
+            lines.pop()
+            with open(self.log_path, 'r+b') as f:
+                f.truncate(sum(len(line) for line in lines))
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record['seq'] <= self.seq:
+                # In the snapshot already, or a retried append
+                continue
+            self._record(record['score'], record['level'], record['time'])
+            self.seq = max(self.seq, record['seq'])
+
+    def _legacy_high_score(self):
+        # The old single-score file, used once if there's no leaderboard yet
+        try:
+            with open(HIGH_SCORE_FILE) as f:
+                return int(json.load(f)['high_score'])
+        except (OSError, ValueError, KeyError, TypeError):
+            return 0
+
+    def high_score(self):
+        with self.lock:
+            return self.best
+
+    def top(self, level):
+        with self.lock:
+            return list(self.levels.get(level, ()))
+
+    def submit(self, score, level):
+        # Never touches the disk on the caller's thread
+        now = time.time()
+        with self.lock:
+            self.seq += 1
+            self._record(score, level, now)
+            record = {'seq': self.seq, 'score': score, 'level': level, 'time': now}
+        self.pending.put(record)
+
+    def _snapshot(self):
+        with self.lock:
+            return json.dumps({
+                'seq': self.seq,
+                'high_score': self.best,
+                'levels': {str(level): entries for level, entries in sorted(self.levels.items())},
+            })
+
+    def compact(self):
+        # Fold the log into the snapshot; only called on the writer thread
+        write_atomic(self.path, self._snapshot())
+        with open(self.log_path, 'w') as f:
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_loop(self):
+        since_compaction = 0
+        stopping = False
+        batch = []  # Records not yet safely in the log
+        failing = False
+        while not stopping:
+            # While a write is failing, wake up to retry even if no new scores come
+            try:
+                batch.append(self.pending.get(timeout=SCORE_WRITE_RETRY_SECONDS if failing else None))
+            except queue.Empty:
+                pass
+            while True:
+                try:
+                    batch.append(self.pending.get_nowait())
+                except queue.Empty:
+                    break
+            if _STOP in batch:
+                stopping = True
+                batch = [record for record in batch if record is not _STOP]
+            try:
+                if batch:
+                    with open(self.log_path, 'a') as f:
+                        f.writelines(json.dumps(record) + '\n' for record in batch)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    since_compaction += len(batch)
+                    batch = []
+                if since_compaction >= self.compact_every or (stopping and since_compaction):
+                    self.compact()
+                    since_compaction = 0
+            except OSError as e:
+                # The scores are still in memory and still queued here; only the disk is behind
+                if not failing:
+                    print(f"leaderboard: could not save scores to {self.log_path}: {e}", file=sys.stderr)
+                failing = True
+                continue
+            failing = False
+        if batch:
+            print(f"leaderboard: {len(batch)} score(s) were never saved", file=sys.stderr)
+
+    def close(self, timeout=5.0):
+        # Flush everything queued, compact, and stop the writer
+        self.pending.put(_STOP)
+        self.writer.join(timeout)